@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Office document validators on generated fixtures.
+
+Builds a synthetic .pptx with many slides or a .docx with many pages, unpacks it
+and runs each check of the validator in turn, reporting wall time per check and
+the peak resident set size of the process.
+
+Usage:
+    python benchmark_validation.py pptx [--slides 200]
+    python benchmark_validation.py docx [--pages 500]
+    python benchmark_validation.py pptx --skip validate_against_xsd
+"""
+
+import argparse
+import resource
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+from validation import DOCXSchemaValidator, PartCache, PPTXSchemaValidator
+
+NS_A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+NS_P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+NS_R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_PKG_RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+NS_CT = "http://schemas.openxmlformats.org/package/2006/content-types"
+REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PML_CT = "application/vnd.openxmlformats-officedocument.presentationml"
+
+PARAGRAPHS_PER_PAGE = 12
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua."
+)
+
+# Checks run by each validator's validate(), in order
+CHECKS = {
+    "pptx": [
+        "validate_xml",
+        "validate_namespaces",
+        "validate_unique_ids",
+        "validate_uuid_ids",
+        "validate_file_references",
+        "validate_slide_layout_ids",
+        "validate_content_types",
+        "validate_against_xsd",
+        "validate_notes_slide_references",
+        "validate_all_relationship_ids",
+        "validate_no_duplicate_slide_layouts",
+    ],
+    "docx": [
+        "validate_xml",
+        "validate_namespaces",
+        "validate_unique_ids",
+        "validate_file_references",
+        "validate_content_types",
+        "validate_against_xsd",
+        "validate_whitespace_preservation",
+        "validate_deletions",
+        "validate_insertions",
+        "validate_all_relationship_ids",
+        "compare_paragraph_counts",
+    ],
+}
+
+
+def _rels(relationships):
+    items = "".join(
+        f'<Relationship Id="{rid}" Type="{REL_TYPE}/{kind}" Target="{target}"/>'
+        for rid, kind, target in relationships
+    )
+    return f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{NS_PKG_RELS}">{items}</Relationships>'
+
+
+def _content_types(overrides):
+    items = "".join(
+        f'<Override PartName="/{part}" ContentType="{content_type}"/>'
+        for part, content_type in overrides
+    )
+    return (
+        f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Types xmlns="{NS_CT}">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f"{items}</Types>"
+    )
+
+
+def _shape(shape_id, text):
+    return (
+        f'<p:sp><p:nvSpPr><p:cNvPr id="{shape_id}" name="TextBox {shape_id}"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+        '<p:spPr><a:xfrm><a:off x="457200" y="457200"/><a:ext cx="8229600" cy="914400"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr>'
+        f'<p:txBody><a:bodyPr/><a:lstStyle/><a:p><a:r><a:rPr lang="en-US" dirty="0"/><a:t>{text}</a:t></a:r></a:p></p:txBody></p:sp>'
+    )
+
+
+def _sp_tree(shapes):
+    return (
+        '<p:cSld><p:spTree><p:nvGrpSpPr><p:cNvPr id="1" name=""/><p:cNvGrpSpPr/><p:nvPr/></p:nvGrpSpPr>'
+        f"<p:grpSpPr/>{shapes}</p:spTree></p:cSld>"
+    )
+
+
+def build_pptx(path, slides):
+    """Write a presentation with ``slides`` slides of a few text boxes each."""
+    header = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    ns = f'xmlns:a="{NS_A}" xmlns:r="{NS_R}" xmlns:p="{NS_P}"'
+    overrides = [
+        ("ppt/presentation.xml", f"{PML_CT}.presentation.main+xml"),
+        ("ppt/slideMasters/slideMaster1.xml", f"{PML_CT}.slideMaster+xml"),
+        ("ppt/slideLayouts/slideLayout1.xml", f"{PML_CT}.slideLayout+xml"),
+        ("ppt/theme/theme1.xml", "application/vnd.openxmlformats-officedocument.theme+xml"),
+    ] + [
+        (f"ppt/slides/slide{n}.xml", f"{PML_CT}.slide+xml")
+        for n in range(1, slides + 1)
+    ]
+    slide_ids = "".join(
+        f'<p:sldId id="{255 + n}" r:id="rId{n + 1}"/>' for n in range(1, slides + 1)
+    )
+    color = '<a:srgbClr val="000000"/>'
+    colors = "".join(
+        f"<a:{name}>{color}</a:{name}>"
+        for name in (
+            "dk1", "lt1", "dk2", "lt2", "accent1", "accent2", "accent3",
+            "accent4", "accent5", "accent6", "hlink", "folHlink",
+        )
+    )
+    fill = f"<a:solidFill>{color}</a:solidFill>"
+    font = '<a:latin typeface="Calibri"/><a:ea typeface=""/><a:cs typeface=""/>'
+    theme = (
+        f'{header}<a:theme xmlns:a="{NS_A}" name="Office"><a:themeElements>'
+        f'<a:clrScheme name="Office">{colors}</a:clrScheme>'
+        f'<a:fontScheme name="Office"><a:majorFont>{font}</a:majorFont><a:minorFont>{font}</a:minorFont></a:fontScheme>'
+        f'<a:fmtScheme name="Office"><a:fillStyleLst>{fill * 3}</a:fillStyleLst>'
+        f'<a:lnStyleLst>{("<a:ln>" + fill + "</a:ln>") * 3}</a:lnStyleLst>'
+        f'<a:effectStyleLst>{"<a:effectStyle><a:effectLst/></a:effectStyle>" * 3}</a:effectStyleLst>'
+        f"<a:bgFillStyleLst>{fill * 3}</a:bgFillStyleLst></a:fmtScheme>"
+        "</a:themeElements></a:theme>"
+    )
+    clr_map = (
+        'bg1="lt1" tx1="dk1" bg2="lt2" tx2="dk2" accent1="accent1" accent2="accent2" '
+        'accent3="accent3" accent4="accent4" accent5="accent5" accent6="accent6" '
+        'hlink="hlink" folHlink="folHlink"'
+    )
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _content_types(overrides))
+        zf.writestr("_rels/.rels", _rels([("rId1", "officeDocument", "ppt/presentation.xml")]))
+        zf.writestr(
+            "ppt/presentation.xml",
+            f'{header}<p:presentation {ns}><p:sldMasterIdLst><p:sldMasterId id="2147483648" r:id="rId1"/></p:sldMasterIdLst>'
+            f'<p:sldIdLst>{slide_ids}</p:sldIdLst><p:sldSz cx="9144000" cy="6858000"/><p:notesSz cx="6858000" cy="9144000"/></p:presentation>',
+        )
+        zf.writestr(
+            "ppt/_rels/presentation.xml.rels",
+            _rels(
+                [("rId1", "slideMaster", "slideMasters/slideMaster1.xml")]
+                + [(f"rId{n + 1}", "slide", f"slides/slide{n}.xml") for n in range(1, slides + 1)]
+                + [(f"rId{slides + 2}", "theme", "theme/theme1.xml")]
+            ),
+        )
+        zf.writestr(
+            "ppt/slideMasters/slideMaster1.xml",
+            f"{header}<p:sldMaster {ns}>{_sp_tree('')}<p:clrMap {clr_map}/>"
+            '<p:sldLayoutIdLst><p:sldLayoutId id="2147483649" r:id="rId1"/></p:sldLayoutIdLst></p:sldMaster>',
+        )
+        zf.writestr(
+            "ppt/slideMasters/_rels/slideMaster1.xml.rels",
+            _rels([("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml"), ("rId2", "theme", "../theme/theme1.xml")]),
+        )
+        zf.writestr("ppt/slideLayouts/slideLayout1.xml", f"{header}<p:sldLayout {ns}>{_sp_tree('')}</p:sldLayout>")
+        zf.writestr(
+            "ppt/slideLayouts/_rels/slideLayout1.xml.rels",
+            _rels([("rId1", "slideMaster", "../slideMasters/slideMaster1.xml")]),
+        )
+        zf.writestr("ppt/theme/theme1.xml", theme)
+        for n in range(1, slides + 1):
+            shapes = "".join(_shape(i, f"Slide {n}, box {i}: {LOREM}") for i in range(2, 8))
+            zf.writestr(f"ppt/slides/slide{n}.xml", f"{header}<p:sld {ns}>{_sp_tree(shapes)}</p:sld>")
+            zf.writestr(
+                f"ppt/slides/_rels/slide{n}.xml.rels",
+                _rels([("rId1", "slideLayout", "../slideLayouts/slideLayout1.xml")]),
+            )
+
+
+def build_docx(path, pages):
+    """Write a document of ``pages`` pages of plain paragraphs separated by page breaks."""
+    header = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    paragraphs = []
+    for page in range(1, pages + 1):
+        for n in range(1, PARAGRAPHS_PER_PAGE + 1):
+            paragraphs.append(
+                f'<w:p><w:pPr><w:pStyle w:val="Normal"/></w:pPr><w:r><w:t xml:space="preserve">Page {page}, paragraph {n}. {LOREM} </w:t></w:r>'
+                f'<w:bookmarkStart w:id="{page * 100 + n}" w:name="p{page}_{n}"/><w:bookmarkEnd w:id="{page * 100 + n}"/></w:p>'
+            )
+        paragraphs.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+    document = (
+        f'{header}<w:document xmlns:w="{NS_W}" xmlns:r="{NS_R}"><w:body>{"".join(paragraphs)}'
+        '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/></w:sectPr></w:body></w:document>'
+    )
+    styles = (
+        f'{header}<w:styles xmlns:w="{NS_W}"><w:style w:type="paragraph" w:default="1" w:styleId="Normal">'
+        '<w:name w:val="Normal"/></w:style></w:styles>'
+    )
+    wml_ct = "application/vnd.openxmlformats-officedocument.wordprocessingml"
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr(
+            "[Content_Types].xml",
+            _content_types([("word/document.xml", f"{wml_ct}.document.main+xml"), ("word/styles.xml", f"{wml_ct}.styles+xml")]),
+        )
+        zf.writestr("_rels/.rels", _rels([("rId1", "officeDocument", "word/document.xml")]))
+        zf.writestr("word/document.xml", document)
+        zf.writestr("word/_rels/document.xml.rels", _rels([("rId1", "styles", "styles.xml")]))
+        zf.writestr("word/styles.xml", styles)
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF):
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Office document validation")
+    parser.add_argument("format", choices=sorted(CHECKS), help="Fixture type to generate")
+    parser.add_argument("--slides", type=int, default=200, help="Slides in the pptx fixture")
+    parser.add_argument("--pages", type=int, default=500, help="Pages in the docx fixture")
+    parser.add_argument("--skip", action="append", default=[], help="Check to leave out (repeatable)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print each check's result")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = Path(temp_dir)
+        original = temp_path / f"fixture.{args.format}"
+        unpacked = temp_path / "unpacked"
+        if args.format == "pptx":
+            build_pptx(original, args.slides)
+            label = f"{args.slides} slides"
+            validator_class = PPTXSchemaValidator
+        else:
+            build_docx(original, args.pages)
+            label = f"{args.pages} pages"
+            validator_class = DOCXSchemaValidator
+        with zipfile.ZipFile(original) as zf:
+            zf.extractall(unpacked)
+
+        print(f"Fixture: {original.name}, {label}, {original.stat().st_size / 1024:.0f} KB")
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        validator = validator_class(
+            unpacked, original, verbose=args.verbose, parts=PartCache(unpacked)
+        )
+        timings = []
+        for check in CHECKS[args.format]:
+            if check in args.skip:
+                continue
+            check_start = time.perf_counter()
+            getattr(validator, check)()
+            timings.append((check, time.perf_counter() - check_start))
+        total = time.perf_counter() - start
+
+    print(f"\n{'Check':<40} {'Seconds':>8}")
+    for check, seconds in timings:
+        print(f"{check:<40} {seconds:>8.3f}")
+    print(f"{'Total':<40} {total:>8.3f}")
+    print(f"Peak RSS: {peak_rss_mb():.1f} MB (before validation: {rss_before:.1f} MB)")
+    if peak_rss_mb(resource.RUSAGE_CHILDREN):
+        print(f"Peak RSS of a worker process: {peak_rss_mb(resource.RUSAGE_CHILDREN):.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,46 @@ Tool to pack a directory into a .docx, .pptx, or .xlsx file with XML formatting
 
 Example usage:
     python pack.py <input_directory> <office_file> [--force]
+
+Parts can also be packed straight from memory, e.g. from XMLEditor.serialize():
+    pack_parts({"word/document.xml": xml_bytes, ...}, "output.docx")
 """
 
 import argparse
-import shutil
+import io
 import subprocess
 import sys
 import tempfile
-import defusedxml.minidom
+import time
 import zipfile
 from pathlib import Path
 
+import lxml.etree
+
+CONTENT_TYPES_PART = "[Content_Types].xml"
+
+# Media and embedded packages that are already compressed; deflating them again
+# costs time and saves nothing, so they are stored as-is
+PRECOMPRESSED_EXTENSIONS = {
+    ".docx",
+    ".docm",
+    ".gif",
+    ".jpeg",
+    ".jpg",
+    ".m4a",
+    ".m4v",
+    ".mov",
+    ".mp3",
+    ".mp4",
+    ".png",
+    ".pptx",
+    ".pptm",
+    ".wdp",
+    ".xlsx",
+    ".xlsm",
+    ".zip",
+}
+
 
 def main():
     parser = argparse.ArgumentParser(description="Pack a directory into an Office file")
@@ -45,6 +74,9 @@ def main():
 def pack_document(input_dir, output_file, validate=False):
     """Pack a directory into an Office file (.docx/.pptx/.xlsx).
 
+    The input directory is left untouched; each part is read, condensed and
+    written to the archive in one pass.
+
     Args:
         input_dir: Path to unpacked Office document directory
         output_file: Path to output Office file
@@ -54,39 +86,90 @@ def pack_document(input_dir, output_file, validate=False):
         bool: True if successful, False if validation failed
     """
     input_dir = Path(input_dir)
-    output_file = Path(output_file)
 
     if not input_dir.is_dir():
         raise ValueError(f"{input_dir} is not a directory")
+
+    return pack_parts(directory_parts(input_dir), output_file, validate=validate)
+
+
+def directory_parts(input_dir):
+    """Map each file under input_dir to its part name, e.g. {"word/document.xml": Path}."""
+    input_dir = Path(input_dir)
+    return {
+        f.relative_to(input_dir).as_posix(): f
+        for f in sorted(input_dir.rglob("*"))
+        if f.is_file()
+    }
+
+
+def pack_parts(parts, output_file, validate=False):
+    """Pack a map of part names to contents into an Office file (.docx/.pptx/.xlsx).
+
+    [Content_Types].xml is written first, the other parts in the order given.
+    XML parts are condensed on the way in; already-compressed media is stored
+    without recompression.
+
+    Args:
+        parts: Mapping of part name (e.g. "word/document.xml") to its contents,
+            as bytes, str, or a Path to read from
+        output_file: Path to output Office file
+        validate: If True, validates with soffice (default: False)
+
+    Returns:
+        bool: True if successful, False if validation failed
+    """
+    output_file = Path(output_file)
+
     if output_file.suffix.lower() not in {".docx", ".pptx", ".xlsx"}:
         raise ValueError(f"{output_file} must be a .docx, .pptx, or .xlsx file")
+    if CONTENT_TYPES_PART not in parts:
+        raise ValueError(f"{CONTENT_TYPES_PART} is missing from the parts to pack")
 
-    # Work in temporary directory to avoid modifying original
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_content_dir = Path(temp_dir) / "content"
-        shutil.copytree(input_dir, temp_content_dir)
-
-        # Process XML files to remove pretty-printing whitespace
-        for pattern in ["*.xml", "*.rels"]:
-            for xml_file in temp_content_dir.rglob(pattern):
-                condense_xml(xml_file)
-
-        # Create final Office file as zip archive
-        output_file.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
-            for f in temp_content_dir.rglob("*"):
-                if f.is_file():
-                    zf.write(f, f.relative_to(temp_content_dir))
-
-        # Validate if requested
-        if validate:
-            if not validate_document(output_file):
-                output_file.unlink()  # Delete the corrupt file
-                return False
+    names = [CONTENT_TYPES_PART] + [n for n in parts if n != CONTENT_TYPES_PART]
+
+    # Create final Office file as zip archive
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(output_file, "w", zipfile.ZIP_DEFLATED) as zf:
+        for name in names:
+            _write_part(zf, name, parts[name])
+
+    # Validate if requested
+    if validate:
+        if not validate_document(output_file):
+            output_file.unlink()  # Delete the corrupt file
+            return False
 
     return True
 
 
+def _write_part(zf, name, content):
+    """Add one part to the archive, condensing XML and storing precompressed media."""
+    suffix = Path(name).suffix.lower()
+    is_xml = name.endswith((".xml", ".rels"))
+    compress_type = (
+        zipfile.ZIP_STORED
+        if suffix in PRECOMPRESSED_EXTENSIONS
+        else zipfile.ZIP_DEFLATED
+    )
+
+    if isinstance(content, Path):
+        if not is_xml:
+            # Copied from disk in chunks, never held in memory
+            zf.write(content, name, compress_type=compress_type)
+            return
+        info = zipfile.ZipInfo.from_file(content, name)
+        data = condense_xml(content.read_bytes())
+    else:
+        info = zipfile.ZipInfo(name, time.localtime()[:6])
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        if is_xml:
+            data = condense_xml(data)
+
+    info.compress_type = compress_type
+    zf.writestr(info, data)
+
+
 def validate_document(doc_path):
     """Validate document by converting to HTML with soffice."""
     # Determine the correct filter based on file extension
@@ -130,29 +213,34 @@ def validate_document(doc_path):
             return False
 
 
-def condense_xml(xml_file):
-    """Strip unnecessary whitespace and remove comments."""
-    with open(xml_file, "r", encoding="utf-8") as f:
-        dom = defusedxml.minidom.parse(f)
-
-    # Process each element to remove whitespace and comments
-    for element in dom.getElementsByTagName("*"):
-        # Skip w:t elements and their processing
-        if element.tagName.endswith(":t"):
-            continue
-
-        # Remove whitespace-only text nodes and comment nodes
-        for child in list(element.childNodes):
-            if (
-                child.nodeType == child.TEXT_NODE
-                and child.nodeValue
-                and child.nodeValue.strip() == ""
-            ) or child.nodeType == child.COMMENT_NODE:
-                element.removeChild(child)
-
-    # Write back the condensed XML
-    with open(xml_file, "wb") as f:
-        f.write(dom.toxml(encoding="UTF-8"))
+def condense_xml(data):
+    """Strip unnecessary whitespace and remove comments from an XML part's bytes.
+
+    Whitespace-only text is dropped everywhere except inside text elements
+    (w:t, a:t, t, ...), where it is content. Elements are cleaned as the
+    parser closes them, so the part is walked only once.
+    """
+    context = lxml.etree.iterparse(
+        io.BytesIO(data),
+        events=("end",),
+        remove_comments=True,
+        resolve_entities=False,
+        no_network=True,
+        huge_tree=True,
+    )
+    for _, element in context:
+        if lxml.etree.QName(element).localname != "t":
+            if element.text is not None and element.text.strip() == "":
+                element.text = None
+        # A child's tail is text of this element, even when the child is a w:t
+        for child in element:
+            if child.tail is not None and child.tail.strip() == "":
+                child.tail = None
+
+    # Same declaration as before the switch from minidom
+    return b'<?xml version="1.0" encoding="UTF-8"?>' + lxml.etree.tostring(
+        context.root.getroottree(), encoding="UTF-8"
+    )
 
 
 if __name__ == "__main__":
@@ -2,28 +2,52 @@
 """Unpack and format XML contents of Office files (.docx, .pptx, .xlsx)"""
 
 import random
+import shutil
 import sys
 import defusedxml.minidom
 import zipfile
 from pathlib import Path
 
-# Get command line arguments
-assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
-input_file, output_dir = sys.argv[1], sys.argv[2]
-
-# Extract and format
-output_path = Path(output_dir)
-output_path.mkdir(parents=True, exist_ok=True)
-zipfile.ZipFile(input_file).extractall(output_path)
-
-# Pretty print all XML files
-xml_files = list(output_path.rglob("*.xml")) + list(output_path.rglob("*.rels"))
-for xml_file in xml_files:
-    content = xml_file.read_text(encoding="utf-8")
-    dom = defusedxml.minidom.parseString(content)
-    xml_file.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
-
-# For .docx files, suggest an RSID for tracked changes
-if input_file.endswith(".docx"):
-    suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
-    print(f"Suggested RSID for edit session: {suggested_rsid}")
+
+def unpack_document(input_file, output_dir):
+    """Extract an Office file, pretty-printing its XML parts as they are written.
+
+    Each member is read from the archive once; media is copied through in
+    chunks rather than loaded whole.
+    """
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    root = output_path.resolve()
+
+    with zipfile.ZipFile(input_file) as zf:
+        for info in zf.infolist():
+            target = (output_path / info.filename).resolve()
+            # Same rule as ZipFile.extractall: nothing outside output_dir
+            if not target.is_relative_to(root):
+                continue
+            if info.is_dir():
+                target.mkdir(parents=True, exist_ok=True)
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+
+            # Pretty print XML parts
+            if target.name.endswith((".xml", ".rels")):
+                dom = defusedxml.minidom.parseString(zf.read(info))
+                target.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
+            else:
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+
+
+if __name__ == "__main__":
+    # Get command line arguments
+    assert len(sys.argv) == 3, "Usage: python unpack.py <office_file> <output_dir>"
+    input_file, output_dir = sys.argv[1], sys.argv[2]
+
+    # Extract and format
+    unpack_document(input_file, output_dir)
+
+    # For .docx files, suggest an RSID for tracked changes
+    if input_file.endswith(".docx"):
+        suggested_rsid = "".join(random.choices("0123456789ABCDEF", k=8))
+        print(f"Suggested RSID for edit session: {suggested_rsid}")
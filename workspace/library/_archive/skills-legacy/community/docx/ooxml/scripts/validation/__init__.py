@@ -4,12 +4,14 @@ Validation modules for Word document processing.
 
 from .base import BaseSchemaValidator
 from .docx import DOCXSchemaValidator
+from .parts import PartCache
 from .pptx import PPTXSchemaValidator
 from .redlining import RedliningValidator
 
 __all__ = [
     "BaseSchemaValidator",
     "DOCXSchemaValidator",
+    "PartCache",
     "PPTXSchemaValidator",
     "RedliningValidator",
 ]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Benchmark XMLEditor against LxmlXMLEditor on a generated contract.
+
+Writes a pretty-printed word/document.xml with many pages and tracked
+insertions, then runs the same review session through each editor: for every
+tracked change, look it up by w:id, its paragraph by w14:paraId, by line
+number and by text, then insert a run after it. A second session runs
+through DocxXMLEditor and LxmlDocxXMLEditor (what Document uses with
+xml_backend="lxml"), rejecting every insertion and suggesting the deletion
+of each amended paragraph's first run. Reports load and session time per
+editor and checks that both found the same nodes and produced the same
+document.
+
+Usage (from the docx skill root):
+    python -m scripts.benchmark_editor [--pages 300] [--changes 500]
+"""
+
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import defusedxml.minidom
+import lxml.etree
+
+from .document import DocxXMLEditor, LxmlDocxXMLEditor
+from .utilities import LxmlXMLEditor, XMLEditor
+
+NS_W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+NS_W14 = "http://schemas.microsoft.com/office/word/2010/wordml"
+
+PARAGRAPHS_PER_PAGE = 12
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua."
+)
+
+
+def _para_id(n):
+    return f"{n + 1:08X}"
+
+
+def build_document(path, pages, changes):
+    """Write a document.xml of ``pages`` pages, the first ``changes`` paragraphs with a tracked insertion."""
+    paragraphs = []
+    for n in range(pages * PARAGRAPHS_PER_PAGE):
+        insertion = (
+            f'<w:ins w:id="{n}" w:author="Reviewer" w:date="2025-01-01T00:00:00Z">'
+            f"<w:r><w:t>Clause {n} as amended.</w:t></w:r></w:ins>"
+            if n < changes
+            else ""
+        )
+        paragraphs.append(
+            f'<w:p w14:paraId="{_para_id(n)}"><w:pPr><w:pStyle w:val="Normal"/></w:pPr>'
+            f'<w:r><w:t xml:space="preserve">Section {n}. {LOREM} </w:t></w:r>{insertion}</w:p>'
+        )
+    document = (
+        f'<w:document xmlns:w="{NS_W}" xmlns:w14="{NS_W14}"><w:body>{"".join(paragraphs)}'
+        '<w:sectPr><w:pgSz w:w="12240" w:h="15840"/></w:sectPr></w:body></w:document>'
+    )
+    # Pretty-printed the way unpack.py leaves it, so line numbers are meaningful
+    dom = defusedxml.minidom.parseString(document)
+    path.write_bytes(dom.toprettyxml(indent="  ", encoding="ascii"))
+
+
+def paragraph_lines(path):
+    """Line of each paragraph's start tag, keyed by w14:paraId."""
+    lines = {}
+    with open(path, encoding="ascii") as f:
+        for number, line in enumerate(f, start=1):
+            if "<w:p " in line and 'w14:paraId="' in line:
+                lines[line.split('w14:paraId="')[1][:8]] = number
+    return lines
+
+
+def describe(editor, node):
+    """Backend-independent description of a node: tag, original line, text."""
+    if isinstance(editor, LxmlXMLEditor):
+        return (
+            lxml.etree.QName(node).localname,
+            editor.get_line_number(node),
+            editor._get_element_text(node),
+        )
+    return (
+        node.localName,
+        getattr(node, "parse_position", (None,))[0],
+        editor._get_element_text(node),
+    )
+
+
+def review_session(editor, changes, lines):
+    """Look up and amend each tracked change; returns what every lookup found."""
+    found = []
+    for n in range(changes):
+        para_id = _para_id(n)
+        insertion = editor.get_node(tag="w:ins", attrs={"w:id": str(n)})
+        paragraph = editor.get_node(tag="w:p", attrs={"w14:paraId": para_id})
+        by_line = editor.get_node(tag="w:p", line_number=lines[para_id])
+        run = editor.get_node(tag="w:r", contains=f"Clause {n} as amended.")
+        editor.insert_after(run, f"<w:r><w:t>Accepted by counsel ({n}).</w:t></w:r>")
+        found.append([describe(editor, node) for node in (insertion, paragraph, by_line, run)])
+    return found
+
+
+def tracked_change_session(editor, changes):
+    """Reject each tracked insertion and suggest deleting its paragraph's first run."""
+    found = []
+    for n in range(changes):
+        editor.revert_insertion(editor.get_node(tag="w:ins", attrs={"w:id": str(n)}))
+        run = editor.get_node(tag="w:r", contains=f"Section {n}. ")
+        found.append(describe(editor, editor.suggest_deletion(run)))
+    return found
+
+
+def run_session(editor_classes, session, path, *args):
+    """Time session on each editor; returns what it found and the written document."""
+    results = {}
+    for editor_class in editor_classes:
+        start = time.perf_counter()
+        if issubclass(editor_class, (DocxXMLEditor, LxmlDocxXMLEditor)):
+            editor = editor_class(path, rsid="00C0FFEE", author="Reviewer")
+        else:
+            editor = editor_class(path)
+        loaded = time.perf_counter()
+        found = session(editor, *args)
+        done = time.perf_counter()
+        # Tracked changes are stamped with the current time
+        written = re.sub(rb' (w:date|w16du:dateUtc)="[^"]*"', b"", editor.serialize())
+        document = lxml.etree.tostring(lxml.etree.fromstring(written), method="c14n")
+        results[editor_class.__name__] = (found, document)
+        print(
+            f"{editor_class.__name__:<18} {loaded - start:>8.3f} "
+            f"{done - loaded:>8.3f} {done - start:>8.3f}"
+        )
+    (minidom_found, minidom_doc), (lxml_found, lxml_doc) = results.values()
+    print(f"Same nodes found: {minidom_found == lxml_found}")
+    print(f"Same document written: {minidom_doc == lxml_doc}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the XML editor backends")
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the document")
+    parser.add_argument("--changes", type=int, default=500, help="Tracked changes to review")
+    args = parser.parse_args()
+    changes = min(args.changes, args.pages * PARAGRAPHS_PER_PAGE)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "document.xml"
+        build_document(path, args.pages, changes)
+        lines = paragraph_lines(path)
+        print(
+            f"Fixture: {args.pages} pages, {changes} tracked changes, "
+            f"{len(lines)} paragraphs, {path.stat().st_size / 1024:.0f} KB"
+        )
+
+        print(f"\n{'Editor':<18} {'Load':>8} {'Session':>8} {'Total':>8}")
+        run_session((XMLEditor, LxmlXMLEditor), review_session, path, changes, lines)
+        print(f"\n{'Tracked changes':<18} {'Load':>8} {'Session':>8} {'Total':>8}")
+        run_session(
+            (DocxXMLEditor, LxmlDocxXMLEditor), tracked_change_session, path, changes
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -26,23 +26,34 @@ Usage:
     doc.save()
 """
 
+import copy
 import html
 import random
 import shutil
 import tempfile
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Union
 
+import lxml.etree
 from defusedxml import minidom
-from ooxml.scripts.pack import pack_document
+from ooxml.scripts.pack import directory_parts, pack_document, pack_parts
 from ooxml.scripts.validation.docx import DOCXSchemaValidator
+from ooxml.scripts.validation.parts import PartCache
 from ooxml.scripts.validation.redlining import RedliningValidator
 
-from .utilities import XMLEditor
+from .utilities import LxmlXMLEditor, XMLEditor, _qualified_name
 
 # Path to template files
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
+# Namespaces DocxXMLEditor declares on the root element when it first needs them
+W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
+W16CEX_NAMESPACE = "http://schemas.microsoft.com/office/word/2018/wordml/cex"
+W16DU_NAMESPACE = "http://schemas.microsoft.com/office/word/2023/wordml/word16du"
+
+XML_BACKENDS = ("minidom", "lxml")
+
 
 class DocxXMLEditor(XMLEditor):
     """XMLEditor that automatically applies RSID, author, and date to new elements.
@@ -92,7 +103,7 @@ class DocxXMLEditor(XMLEditor):
         if not root.hasAttribute("xmlns:w16du"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w16du",
-                "http://schemas.microsoft.com/office/word/2023/wordml/word16du",
+                W16DU_NAMESPACE,
             )
 
     def _ensure_w16cex_namespace(self):
@@ -101,7 +112,7 @@ class DocxXMLEditor(XMLEditor):
         if not root.hasAttribute("xmlns:w16cex"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w16cex",
-                "http://schemas.microsoft.com/office/word/2018/wordml/cex",
+                W16CEX_NAMESPACE,
             )
 
     def _ensure_w14_namespace(self):
@@ -110,7 +121,7 @@ class DocxXMLEditor(XMLEditor):
         if not root.hasAttribute("xmlns:w14"):  # type: ignore
             root.setAttribute(  # type: ignore
                 "xmlns:w14",
-                "http://schemas.microsoft.com/office/word/2010/wordml",
+                W14_NAMESPACE,
             )
 
     def _inject_attributes_to_nodes(self, nodes):
@@ -593,6 +604,388 @@ class DocxXMLEditor(XMLEditor):
             raise ValueError(f"Element must be w:r or w:p, got {elem.nodeName}")
 
 
+class LxmlDocxXMLEditor(LxmlXMLEditor):
+    """DocxXMLEditor on the indexed lxml backend.
+
+    Applies the same RSID, author and date attributes as DocxXMLEditor and
+    has the same tracked-change helpers, working on lxml elements. Change
+    ids come from the tag index and elements are renamed, wrapped and given
+    attributes in place with the index kept current, so suggestions and
+    rejections do not rescan the whole document. Used for word/document.xml
+    by Document(..., xml_backend="lxml").
+
+    Attributes:
+        tree (lxml.etree._ElementTree): The parsed part; change it through
+            the editor's methods so the indexes stay current
+    """
+
+    suggest_paragraph = staticmethod(DocxXMLEditor.suggest_paragraph)
+
+    def __init__(
+        self, xml_path, rsid: str, author: str = "Claude", initials: str = "C"
+    ):
+        """Initialize with required RSID and optional author.
+
+        Args:
+            xml_path: Path to XML file to edit
+            rsid: RSID to automatically apply to new elements
+            author: Author name for tracked changes and comments (default: "Claude")
+            initials: Author initials (default: "C")
+        """
+        super().__init__(xml_path)
+        self.rsid = rsid
+        self.author = author
+        self.initials = initials
+
+    def _build_indexes(self):
+        # Highest change id, found on first use and raised as changes are added
+        self._max_change_id = None
+        super()._build_indexes()
+
+    def _index_subtree(self, elem):
+        super()._index_subtree(elem)
+        if self._max_change_id is not None:
+            for node in elem.iter(lxml.etree.Element):
+                if self._tags.get(node) in ("w:ins", "w:del"):
+                    self._note_change_id(node)
+
+    def _note_change_id(self, elem):
+        change_id = self._get_attribute(elem, "w:id")
+        if change_id:
+            try:
+                self._max_change_id = max(self._max_change_id, int(change_id))
+            except ValueError:
+                pass
+
+    def _get_next_change_id(self):
+        """Get the next change ID: one above the highest w:ins or w:del id seen.
+
+        Unlike DocxXMLEditor, ids of changes removed since are not reused.
+        """
+        if self._max_change_id is None:
+            self._max_change_id = -1
+            for tag in ("w:ins", "w:del"):
+                for elem in self._by_tag.get(tag, {}):
+                    self._note_change_id(elem)
+        return self._max_change_id + 1
+
+    def _descendants(self, elem, tag):
+        """Elements below elem with the tag, in document order (like getElementsByTagName)."""
+        return [
+            node
+            for node in elem.iterdescendants(lxml.etree.Element)
+            if self._tags.get(node) == tag
+        ]
+
+    def _inject_attributes_to_nodes(self, nodes):
+        """Inject RSID, author, and date attributes into elements where applicable.
+
+        Same attributes, in the same order, as DocxXMLEditor._inject_attributes_to_nodes().
+
+        Args:
+            nodes: List of lxml elements to process
+        """
+        timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        def set_missing(elem, attr_name, value):
+            if not self._has_attribute(elem, attr_name):
+                self._set_attribute(elem, attr_name, value)
+
+        def add_rsid_to_p(elem):
+            set_missing(elem, "w:rsidR", self.rsid)
+            set_missing(elem, "w:rsidRDefault", self.rsid)
+            set_missing(elem, "w:rsidP", self.rsid)
+            for attr_name in ("w14:paraId", "w14:textId"):
+                if not self._has_attribute(elem, attr_name):
+                    self._declare_namespace("w14", W14_NAMESPACE)
+                    self._set_attribute(elem, attr_name, _generate_hex_id())
+
+        def add_rsid_to_r(elem):
+            # Use w:rsidDel for <w:r> inside <w:del>, otherwise w:rsidR
+            if any(self._tags.get(node) == "w:del" for node in elem.iterancestors()):
+                set_missing(elem, "w:rsidDel", self.rsid)
+            else:
+                set_missing(elem, "w:rsidR", self.rsid)
+
+        def add_tracked_change_attrs(elem):
+            if not self._has_attribute(elem, "w:id"):
+                self._set_attribute(elem, "w:id", str(self._get_next_change_id()))
+                self._note_change_id(elem)
+            set_missing(elem, "w:author", self.author)
+            set_missing(elem, "w:date", timestamp)
+            if not self._has_attribute(elem, "w16du:dateUtc"):
+                self._declare_namespace("w16du", W16DU_NAMESPACE)
+                self._set_attribute(elem, "w16du:dateUtc", timestamp)
+
+        def add_comment_attrs(elem):
+            set_missing(elem, "w:author", self.author)
+            set_missing(elem, "w:date", timestamp)
+            set_missing(elem, "w:initials", self.initials)
+
+        def add_comment_extensible_date(elem):
+            if not self._has_attribute(elem, "w16cex:dateUtc"):
+                self._declare_namespace("w16cex", W16CEX_NAMESPACE)
+                self._set_attribute(elem, "w16cex:dateUtc", timestamp)
+
+        def add_xml_space_to_t(elem):
+            text = elem.text
+            if text and (text[0].isspace() or text[-1].isspace()):
+                set_missing(elem, "xml:space", "preserve")
+
+        handlers = {
+            "w:p": add_rsid_to_p,
+            "w:r": add_rsid_to_r,
+            "w:t": add_xml_space_to_t,
+            "w:ins": add_tracked_change_attrs,
+            "w:del": add_tracked_change_attrs,
+            "w:comment": add_comment_attrs,
+            "w16cex:commentExtensible": add_comment_extensible_date,
+        }
+        for node in nodes:
+            if not isinstance(node.tag, str):
+                continue
+            handler = handlers.get(self._tags.get(node))
+            if handler:
+                handler(node)
+            # Descendants tag by tag, in the order DocxXMLEditor visits them
+            descendants = list(node.iterdescendants(lxml.etree.Element))
+            for tag, handler in handlers.items():
+                for elem in descendants:
+                    if self._tags.get(elem) == tag:
+                        handler(elem)
+
+    def replace_node(self, elem, new_content):
+        """Replace node with automatic attribute injection."""
+        nodes = super().replace_node(elem, new_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def insert_after(self, elem, xml_content):
+        """Insert after with automatic attribute injection."""
+        nodes = super().insert_after(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def insert_before(self, elem, xml_content):
+        """Insert before with automatic attribute injection."""
+        nodes = super().insert_before(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def append_to(self, elem, xml_content):
+        """Append to with automatic attribute injection."""
+        nodes = super().append_to(elem, xml_content)
+        self._inject_attributes_to_nodes(nodes)
+        return nodes
+
+    def _mark_run_deleted(self, run):
+        """Move a run's w:rsidR to w:rsidDel, or give it this editor's w:rsidDel."""
+        if self._has_attribute(run, "w:rsidR"):
+            self._set_attribute(run, "w:rsidDel", self._get_attribute(run, "w:rsidR"))
+            self._remove_attribute(run, "w:rsidR")
+        elif not self._has_attribute(run, "w:rsidDel"):
+            self._set_attribute(run, "w:rsidDel", self.rsid)
+
+    def _convert_to_del_text(self, elem):
+        """Rename every w:t below elem to w:delText, keeping its text and attributes."""
+        for t_elem in self._descendants(elem, "w:t"):
+            self._rename(t_elem, "w:delText")
+
+    def revert_insertion(self, elem):
+        """Reject an insertion by wrapping its content in a deletion.
+
+        See DocxXMLEditor.revert_insertion().
+
+        Args:
+            elem: Element to process (w:ins, w:p, w:body, etc.)
+
+        Returns:
+            list: List containing the processed element(s)
+
+        Raises:
+            ValueError: If the element contains no w:ins elements
+        """
+        tag = self._tags.get(elem)
+        if tag == "w:ins":
+            ins_elements = [elem]
+        else:
+            ins_elements = self._descendants(elem, "w:ins")
+
+        if not ins_elements:
+            raise ValueError(
+                f"revert_insertion requires w:ins elements. "
+                f"The provided element <{tag}> contains no insertions. "
+            )
+
+        for ins_elem in ins_elements:
+            runs = self._descendants(ins_elem, "w:r")
+            if not runs:
+                continue
+
+            for run in runs:
+                self._mark_run_deleted(run)
+                self._convert_to_del_text(run)
+
+            # Move all children (and the text between them) from ins to del wrapper
+            del_wrapper = self._new_element(ins_elem, "w:del")
+            del_wrapper.text, ins_elem.text = ins_elem.text, None
+            for child in list(ins_elem)[:-1]:
+                del_wrapper.append(child)
+            self._restructured(ins_elem)
+
+            self._inject_attributes_to_nodes([del_wrapper])
+
+        return [elem]
+
+    def revert_deletion(self, elem):
+        """Reject a deletion by re-inserting the deleted content.
+
+        See DocxXMLEditor.revert_deletion().
+
+        Args:
+            elem: Element to process (w:del, w:p, w:body, etc.)
+
+        Returns:
+            list: If elem is w:del, returns [elem, new_ins]. Otherwise returns [elem].
+
+        Raises:
+            ValueError: If the element contains no w:del elements
+        """
+        tag = self._tags.get(elem)
+        is_single_del = tag == "w:del"
+        if is_single_del:
+            del_elements = [elem]
+        else:
+            del_elements = self._descendants(elem, "w:del")
+
+        if not del_elements:
+            raise ValueError(
+                f"revert_deletion requires w:del elements. "
+                f"The provided element <{tag}> contains no deletions. "
+            )
+
+        rsid_r = self._lxml_name("w:rsidR")
+        rsid_del = self._lxml_name("w:rsidDel")
+        del_text_tag = self._lxml_name("w:delText")
+        t_tag = self._lxml_name("w:t")
+
+        created_insertion = None
+        for del_elem in del_elements:
+            runs = self._descendants(del_elem, "w:r")
+            if not runs:
+                continue
+
+            parent = del_elem.getparent()
+            ins_elem = self._new_element(parent, "w:ins")
+            for run in runs:
+                # The copy is indexed with the rest of the insertion below
+                new_run = copy.deepcopy(run)
+                new_run.tail = None
+                for del_text in new_run.iter(del_text_tag):
+                    del_text.tag = t_tag
+                if new_run.get(rsid_del) is not None:
+                    new_run.set(rsid_r, new_run.attrib.pop(rsid_del))
+                elif new_run.get(rsid_r) is None:
+                    new_run.set(rsid_r, self.rsid)
+                ins_elem.append(new_run)
+
+            # Insert the new insertion after the deletion
+            ins_elem.tail, del_elem.tail = del_elem.tail, None
+            del_elem.addnext(ins_elem)
+            self._restructured(parent)
+            self._inject_attributes_to_nodes([ins_elem])
+
+            if is_single_del:
+                created_insertion = ins_elem
+
+        if is_single_del and created_insertion is not None:
+            return [elem, created_insertion]
+        return [elem]
+
+    def suggest_deletion(self, elem):
+        """Mark a w:r or w:p element as deleted with tracked changes (in place).
+
+        See DocxXMLEditor.suggest_deletion().
+
+        Args:
+            elem: A w:r or w:p element without existing tracked changes
+
+        Returns:
+            Element: The w:del wrapping a w:r, or the modified w:p
+
+        Raises:
+            ValueError: If element has existing tracked changes or invalid structure
+        """
+        tag = self._tags.get(elem)
+        if tag == "w:r":
+            if self._descendants(elem, "w:delText"):
+                raise ValueError("w:r element already contains w:delText")
+
+            self._convert_to_del_text(elem)
+            self._mark_run_deleted(elem)
+
+            # Wrap in w:del, leaving the text that followed the run after it
+            parent = elem.getparent()
+            del_wrapper = self._new_element(parent, "w:del")
+            elem.addprevious(del_wrapper)
+            del_wrapper.tail, elem.tail = elem.tail, None
+            del_wrapper.append(elem)
+            self._restructured(parent)
+
+            self._inject_attributes_to_nodes([del_wrapper])
+            return del_wrapper
+
+        elif tag == "w:p":
+            if self._descendants(elem, "w:ins") or self._descendants(elem, "w:del"):
+                raise ValueError("w:p element already contains tracked changes")
+
+            pPr_list = self._descendants(elem, "w:pPr")
+            is_numbered = pPr_list and self._descendants(pPr_list[0], "w:numPr")
+
+            if is_numbered:
+                # Add <w:del/> as the first child of w:rPr in w:pPr
+                pPr = pPr_list[0]
+                rPr_list = self._descendants(pPr, "w:rPr")
+                rPr = rPr_list[0] if rPr_list else self._new_element(pPr, "w:rPr")
+                del_marker = self._new_element(rPr, "w:del")
+                del_marker.tail, rPr.text = rPr.text, None
+                rPr.insert(0, del_marker)
+
+            self._convert_to_del_text(elem)
+            for run in self._descendants(elem, "w:r"):
+                self._mark_run_deleted(run)
+
+            # Wrap all non-pPr children, and all text between children, in <w:del>
+            del_wrapper = self._new_element(elem, "w:del")
+            del_wrapper.text, elem.text = elem.text, None
+            for child in list(elem)[:-1]:
+                if self._tags.get(child) != "w:pPr":
+                    del_wrapper.append(child)
+                elif child.tail:
+                    if len(del_wrapper):
+                        del_wrapper[-1].tail = (del_wrapper[-1].tail or "") + child.tail
+                    else:
+                        del_wrapper.text = (del_wrapper.text or "") + child.tail
+                    child.tail = None
+            self._restructured(elem)
+
+            self._inject_attributes_to_nodes([del_wrapper])
+            return elem
+
+        else:
+            raise ValueError(f"Element must be w:r or w:p, got {tag}")
+
+
+def _tag_name(node):
+    """Tag of a minidom or lxml element as written in the file, e.g. "w:p"."""
+    return node.tagName if hasattr(node, "tagName") else _qualified_name(node)
+
+
+def _parent_node(node):
+    """Parent of a minidom or lxml element."""
+    return node.parentNode if hasattr(node, "parentNode") else node.getparent()
+
+
 def _generate_hex_id() -> str:
     """Generate random 8-character hex ID for para/durable IDs.
 
@@ -619,6 +1012,7 @@ class Document:
         track_revisions=False,
         author="Claude",
         initials="C",
+        xml_backend="minidom",
     ):
         """
         Initialize with path to unpacked Word document directory.
@@ -630,7 +1024,17 @@ class Document:
             track_revisions: If True, enables track revisions in settings.xml (default: False)
             author: Default author name for comments (default: "Claude")
             initials: Default author initials for comments (default: "C")
+            xml_backend: "minidom" (default) or "lxml". With "lxml",
+                word/document.xml is edited with LxmlDocxXMLEditor, whose
+                lookups and tracked-change helpers are indexed; its nodes are
+                then lxml elements. Other parts always use DocxXMLEditor.
         """
+        if xml_backend not in XML_BACKENDS:
+            raise ValueError(
+                f"Unknown xml_backend {xml_backend!r}, expected one of {XML_BACKENDS}"
+            )
+        self.xml_backend = xml_backend
+
         self.original_path = Path(unpacked_dir)
 
         if not self.original_path.exists() or not self.original_path.is_dir():
@@ -677,7 +1081,7 @@ class Document:
         # Add author to people.xml
         self._add_author_to_people(author)
 
-    def __getitem__(self, xml_path: str) -> DocxXMLEditor:
+    def __getitem__(self, xml_path: str) -> Union[DocxXMLEditor, LxmlDocxXMLEditor]:
         """
         Get or create a DocxXMLEditor for the specified XML file.
 
@@ -688,7 +1092,8 @@ class Document:
             xml_path: Relative path to XML file (e.g., "word/document.xml", "word/comments.xml")
 
         Returns:
-            DocxXMLEditor instance for the specified file
+            DocxXMLEditor instance for the specified file (LxmlDocxXMLEditor
+            for word/document.xml with xml_backend="lxml")
 
         Raises:
             ValueError: If the file does not exist
@@ -705,7 +1110,10 @@ class Document:
             if not file_path.exists():
                 raise ValueError(f"XML file not found: {xml_path}")
             # Use DocxXMLEditor with RSID, author, and initials for all editors
-            self._editors[xml_path] = DocxXMLEditor(
+            editor_class = DocxXMLEditor
+            if self.xml_backend == "lxml" and xml_path == "word/document.xml":
+                editor_class = LxmlDocxXMLEditor
+            self._editors[xml_path] = editor_class(
                 file_path, rsid=self.rsid, author=self.author, initials=self.initials
             )
         return self._editors[xml_path]
@@ -737,7 +1145,7 @@ class Document:
 
         # If end node is a paragraph, append comment markup inside it
         # Otherwise insert after it (for run-level anchors)
-        if end.tagName == "w:p":
+        if _tag_name(end) == "w:p":
             self._document.append_to(end, self._comment_range_end_xml(comment_id))
         else:
             self._document.insert_after(end, self._comment_range_end_xml(comment_id))
@@ -800,7 +1208,7 @@ class Document:
         self._document.insert_after(
             parent_start_elem, self._comment_range_start_xml(comment_id)
         )
-        parent_ref_run = parent_ref_elem.parentNode
+        parent_ref_run = _parent_node(parent_ref_elem)
         self._document.insert_after(
             parent_ref_run, f'<w:commentRangeEnd w:id="{comment_id}"/>'
         )
@@ -842,12 +1250,13 @@ class Document:
         Raises:
             ValueError: If validation fails.
         """
-        # Create validators with current state
+        # Create validators with current state, sharing one parse of each part
+        parts = PartCache(self.unpacked_path)
         schema_validator = DOCXSchemaValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path, self.original_docx, verbose=False, parts=parts
         )
         redlining_validator = RedliningValidator(
-            self.unpacked_path, self.original_docx, verbose=False
+            self.unpacked_path, self.original_docx, verbose=False, parts=parts
         )
 
         # Run validations
@@ -883,6 +1292,34 @@ class Document:
         target_path = Path(destination) if destination else self.original_path
         shutil.copytree(self.unpacked_path, target_path, dirs_exist_ok=True)
 
+    def pack(self, output_file, validate=True) -> None:
+        """
+        Write the edited document straight to a .docx file.
+
+        Without validation, parts held by editors are packed from memory and
+        the rest read from the working copy. The original directory is not
+        modified.
+
+        Args:
+            output_file: Path of the .docx file to write.
+            validate: If True, validates document before packing (default: True).
+        """
+        # Only ensure comment relationships and content types if comment files exist
+        if self.comments_path.exists():
+            self._ensure_comment_relationships()
+            self._ensure_comment_content_types()
+
+        parts = directory_parts(self.unpacked_path)
+        if validate:
+            # Validation reads the working copy, so it must be written first
+            for editor in self._editors.values():
+                editor.save()
+            self.validate()
+        else:
+            for xml_path, editor in self._editors.items():
+                parts[Path(xml_path).as_posix()] = editor.serialize()
+        pack_parts(parts, output_file)
+
     # ==================== Private: Initialization ====================
 
     def _get_next_comment_id(self):
@@ -28,14 +28,38 @@ Example usage:
 
     # Save changes
     editor.save()
+
+LxmlXMLEditor has the same interface and finds the same nodes, returning lxml
+elements instead of minidom nodes. It indexes the document once, so it is the
+better choice for many lookups in a large part:
+    editor = LxmlXMLEditor("document.xml")
+    elem = editor.get_node(tag="w:ins", attrs={"w:id": "42"})
 """
 
+import bisect
 import html
+import xml.dom.pulldom
+import xml.sax.handler
 from pathlib import Path
 from typing import Optional, Union
 
 import defusedxml.minidom
 import defusedxml.sax
+import lxml.etree
+
+_XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+# Entities are left unexpanded and nothing is fetched, as with defusedxml
+_LXML_PARSER = lxml.etree.XMLParser(
+    resolve_entities=False, no_network=True, huge_tree=True
+)
+# Below this many candidates, checking each one's text beats searching all texts
+_TEXT_SEARCH_MIN_CANDIDATES = 64
+
+# XMLEditor does not keep the comments of the file it loads
+_LXML_DOCUMENT_PARSER = lxml.etree.XMLParser(
+    resolve_entities=False, no_network=True, huge_tree=True, remove_comments=True
+)
 
 
 class XMLEditor:
@@ -66,9 +90,7 @@ class XMLEditor:
         if not self.xml_path.exists():
             raise ValueError(f"XML file not found: {xml_path}")
 
-        with open(self.xml_path, "rb") as f:
-            header = f.read(200).decode("utf-8", errors="ignore")
-        self.encoding = "ascii" if 'encoding="ascii"' in header else "utf-8"
+        self.encoding = _detect_encoding(self.xml_path)
 
         parser = _create_line_tracking_parser()
         self.dom = defusedxml.minidom.parse(str(self.xml_path), parser)
@@ -144,41 +166,7 @@ class XMLEditor:
             # If all applicable filters passed, this is a match
             matches.append(elem)
 
-        if not matches:
-            # Build descriptive error message
-            filters = []
-            if line_number is not None:
-                line_str = (
-                    f"lines {line_number.start}-{line_number.stop - 1}"
-                    if isinstance(line_number, range)
-                    else f"line {line_number}"
-                )
-                filters.append(f"at {line_str}")
-            if attrs is not None:
-                filters.append(f"with attributes {attrs}")
-            if contains is not None:
-                filters.append(f"containing '{contains}'")
-
-            filter_desc = " ".join(filters) if filters else ""
-            base_msg = f"Node not found: <{tag}> {filter_desc}".strip()
-
-            # Add helpful hint based on filters used
-            if contains:
-                hint = "Text may be split across elements or use different wording."
-            elif line_number:
-                hint = "Line numbers may have changed if document was modified."
-            elif attrs:
-                hint = "Verify attribute values are correct."
-            else:
-                hint = "Try adding filters (attrs, line_number, or contains)."
-
-            raise ValueError(f"{base_msg}. {hint}")
-        if len(matches) > 1:
-            raise ValueError(
-                f"Multiple nodes found: <{tag}>. "
-                f"Add more filters (attrs, line_number, or contains) to narrow the search."
-            )
-        return matches[0]
+        return _single_match(matches, tag, attrs, line_number, contains)
 
     def _get_element_text(self, elem):
         """
@@ -299,6 +287,15 @@ class XMLEditor:
                     pass
         return f"rId{max_id + 1}"
 
+    def serialize(self):
+        """
+        Serialize the edited XML, preserving the original encoding (ascii or utf-8).
+
+        Returns:
+            bytes: The document as it would be written by save()
+        """
+        return self.dom.toxml(encoding=self.encoding)
+
     def save(self):
         """
         Save the edited XML back to the file.
@@ -306,8 +303,7 @@ class XMLEditor:
         Serializes the DOM tree and writes it back to the original file path,
         preserving the original encoding (ascii or utf-8).
         """
-        content = self.dom.toxml(encoding=self.encoding)
-        self.xml_path.write_bytes(content)
+        self.xml_path.write_bytes(self.serialize())
 
     def _parse_fragment(self, xml_content):
         """
@@ -343,6 +339,843 @@ class XMLEditor:
         return nodes
 
 
+class LxmlXMLEditor:
+    """
+    Editor with the same interface as XMLEditor, backed by lxml and indexed.
+
+    XMLEditor scans every element with the requested tag on each get_node()
+    call and recomputes the text of each candidate. This editor keeps indexes
+    instead: elements by tag, by attribute value (built per attribute name on
+    first use, e.g. w:id or w14:paraId), by original line number, and the text
+    content of each element for ``contains``. The editing methods keep the
+    indexes current, so lookups stay cheap while a large part is edited.
+
+    Lookups return the same nodes XMLEditor would, as lxml elements. Line
+    numbers and text are recorded with the parser XMLEditor uses, so
+    ``line_number`` and ``contains`` match exactly the same elements.
+
+    Changes made to the tree directly rather than through the editing methods
+    are not seen by the indexes until reindex() is called. Subclasses that
+    rework a subtree in place (renaming, wrapping or setting attributes, as
+    LxmlDocxXMLEditor does for tracked changes) use the _set_attribute(),
+    _rename(), _new_element() and _restructured() helpers instead, which
+    only touch the indexes of that subtree.
+
+    Attributes:
+        xml_path: Path to the XML file being edited
+        encoding: Detected encoding of the XML file ('ascii' or 'utf-8')
+        tree: Parsed lxml.etree._ElementTree
+        root: Root element of the tree
+    """
+
+    def __init__(self, xml_path):
+        """
+        Initialize with path to XML file, parse it and build the indexes.
+
+        Args:
+            xml_path: Path to XML file to edit (str or Path)
+
+        Raises:
+            ValueError: If the XML file does not exist
+        """
+        self.xml_path = Path(xml_path)
+        if not self.xml_path.exists():
+            raise ValueError(f"XML file not found: {xml_path}")
+
+        self.encoding = _detect_encoding(self.xml_path)
+
+        self.tree = lxml.etree.parse(str(self.xml_path), _LXML_DOCUMENT_PARSER)
+        self.root = self.tree.getroot()
+
+        # Original line of each element and its text, as XMLEditor's parser
+        # reports them
+        recorder = _record_positions(self.xml_path)
+        elements = list(self.root.iter(lxml.etree.Element))
+        assert len(elements) == len(recorder.lines), "Parsers disagree on elements"
+
+        self._lines = dict(zip(elements, recorder.lines))
+        self._by_line = {}
+        for elem, line in self._lines.items():
+            self._by_line.setdefault(line, []).append(elem)
+
+        # Non-whitespace text directly inside each element before its first
+        # child element, and after each element up to the next one
+        self._text = dict(zip(elements, map("".join, recorder.texts)))
+        self._tail = dict(zip(elements, map("".join, recorder.tails)))
+
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """(Re)build the tag and attribute indexes and drop cached text."""
+        self._tags = {}
+        self._by_tag = {}
+        self._by_attr = {}
+        self._names = {}
+        self._text_cache = {}
+        self._text_search = {}
+        self._index_subtree(self.root)
+
+    def reindex(self):
+        """
+        Rebuild the indexes after the tree was changed without the editing methods.
+
+        Text is re-read from the tree where it changed beyond whitespace, and
+        elements added directly have no original line number.
+        """
+        texts, tails = {}, {}
+        self._record_tree_text(self.root, texts, tails)
+        self._text = _keep_split_text(texts, self._text)
+        self._tail = _keep_split_text(tails, self._tail)
+        self._lines = {
+            elem: line
+            for elem in self.root.iter(lxml.etree.Element)
+            if (line := self._lines.get(elem)) is not None
+        }
+        self._by_line = {}
+        for elem, line in self._lines.items():
+            self._by_line.setdefault(line, []).append(elem)
+        self._build_indexes()
+
+    def get_node(
+        self,
+        tag: str,
+        attrs: Optional[dict[str, str]] = None,
+        line_number: Optional[Union[int, range]] = None,
+        contains: Optional[str] = None,
+    ):
+        """
+        Get an element by tag and identifier, as XMLEditor.get_node() does.
+
+        Args:
+            tag: The XML tag name (e.g., "w:del", "w:ins", "w:r")
+            attrs: Dictionary of attribute name-value pairs to match (e.g., {"w:id": "1"})
+            line_number: Line number (int) or line range (range) in original XML file (1-indexed)
+            contains: Text string that must appear in any text node within the element.
+                      Supports both entity notation (&#8220;) and Unicode characters (\\u201c).
+
+        Returns:
+            lxml.etree._Element: The matching element
+
+        Raises:
+            ValueError: If node not found or multiple matches found
+
+        Example:
+            elem = editor.get_node(tag="w:del", attrs={"w:id": "1"})
+            elem = editor.get_node(tag="w:p", contains="specific text")
+        """
+        # Normalize the search string: convert HTML entities to Unicode characters
+        normalized_contains = html.unescape(contains) if contains is not None else None
+
+        matches = []
+        for elem in self._candidates(tag, attrs, line_number, normalized_contains):
+            if tag != "*" and self._tags.get(elem) != tag:
+                continue
+            if line_number is not None and not _line_matches(
+                self._lines.get(elem), line_number
+            ):
+                continue
+            if attrs is not None and not all(
+                self._get_attribute(elem, attr_name) == attr_value
+                for attr_name, attr_value in attrs.items()
+            ):
+                continue
+            if (
+                normalized_contains is not None
+                and normalized_contains not in self._get_element_text(elem)
+            ):
+                continue
+            matches.append(elem)
+            if len(matches) > 1:
+                # Already ambiguous, no need to look further
+                break
+
+        return _single_match(matches, tag, attrs, line_number, contains)
+
+    def _candidates(self, tag, attrs, line_number, contains):
+        """Smallest indexed set of elements that can contain every match."""
+        if tag == "*":
+            options = [self._tags]
+        else:
+            options = [self._by_tag.get(tag, {})]
+
+        # A missing attribute reads as "", so only non-empty values are indexed
+        for attr_name, attr_value in (attrs or {}).items():
+            if attr_value != "":
+                options.append(self._attribute_index(attr_name).get(attr_value, {}))
+
+        if isinstance(line_number, int):
+            options.append(self._by_line.get(line_number, []))
+        elif isinstance(line_number, range) and len(line_number) < len(options[0]):
+            options.append(
+                [
+                    elem
+                    for line in line_number
+                    for elem in self._by_line.get(line, [])
+                ]
+            )
+
+        candidates = min(options, key=len)
+        if contains is not None and len(candidates) >= _TEXT_SEARCH_MIN_CANDIDATES:
+            candidates = self._elements_containing(tag, contains)
+        return candidates
+
+    def _elements_containing(self, tag, text):
+        """
+        Elements with the tag whose text contains text.
+
+        Searches the joined text of all such elements at once. Elements edited
+        since it was joined are checked one by one, until there are enough of
+        them to be worth joining again.
+        """
+        search = self._text_search.get(tag)
+        if search is None or len(search.stale) * 8 > len(search.elements):
+            elements = list(self._tags if tag == "*" else self._by_tag.get(tag, {}))
+            search = _TextSearch(elements, map(self._get_element_text, elements))
+            self._text_search[tag] = search
+
+        found = [elem for elem in search.find(text) if elem not in search.stale]
+        for elem in search.stale:
+            # Stale elements may since have been removed
+            if elem in self._tags and text in self._get_element_text(elem):
+                found.append(elem)
+        return found
+
+    def _attribute_index(self, attr_name):
+        """Elements by value of attr_name, built on first use and kept up to date."""
+        index = self._by_attr.get(attr_name)
+        if index is None:
+            index = self._by_attr[attr_name] = {}
+            key = self._lxml_name(attr_name)
+            if key is not None:
+                for elem in self._tags:
+                    value = elem.get(key)
+                    if value is not None:
+                        index.setdefault(value, {})[elem] = None
+        return index
+
+    def _lxml_name(self, name):
+        """
+        lxml name ("{namespace}local") of a qualified name like "w:id" or "w:p".
+
+        The prefix is looked up on the root element first, then on any element
+        of the document. None if no element declares it.
+        """
+        if name not in self._names:
+            if ":" not in name:
+                key = name
+            else:
+                prefix, local_name = name.split(":", 1)
+                namespace = (
+                    _XML_NAMESPACE if prefix == "xml" else self.root.nsmap.get(prefix)
+                )
+                if namespace is None:
+                    # Declared further down, e.g. on mc:AlternateContent
+                    declared = self.root.xpath(
+                        "(//namespace::*[name()=$prefix])[1]", prefix=prefix
+                    )
+                    namespace = declared[0][1] if declared else None
+                key = f"{{{namespace}}}{local_name}" if namespace else None
+            self._names[name] = key
+        return self._names[name]
+
+    def _forget_unresolved_names(self):
+        """Let names whose prefix was undeclared be looked up again after new declarations."""
+        self._names = {
+            name: key for name, key in self._names.items() if key is not None
+        }
+
+    def _get_attribute(self, elem, attr_name):
+        """Attribute value, or "" if it is not set (like minidom's getAttribute)."""
+        key = self._lxml_name(attr_name)
+        return elem.get(key, "") if key is not None else ""
+
+    def _has_attribute(self, elem, attr_name):
+        """Whether the attribute is set on elem (like minidom's hasAttribute)."""
+        key = self._lxml_name(attr_name)
+        return key is not None and elem.get(key) is not None
+
+    def _set_attribute(self, elem, attr_name, value):
+        """
+        Set an attribute by qualified name, keeping the attribute indexes current.
+
+        Raises:
+            ValueError: If the attribute's prefix is not declared in the document
+        """
+        key = self._lxml_name(attr_name)
+        if key is None:
+            raise ValueError(f"Namespace prefix of {attr_name} is not declared")
+        self._unindex_attribute(elem, key)
+        elem.set(key, value)
+        self._index_attribute(elem, key, value)
+
+    def _remove_attribute(self, elem, attr_name):
+        """Remove an attribute by qualified name if it is set, keeping the indexes current."""
+        key = self._lxml_name(attr_name)
+        if key is not None and elem.get(key) is not None:
+            self._unindex_attribute(elem, key)
+            del elem.attrib[key]
+
+    def _index_attribute(self, elem, key, value):
+        for attr_name, index in self._by_attr.items():
+            if self._lxml_name(attr_name) == key:
+                index.setdefault(value, {})[elem] = None
+
+    def _unindex_attribute(self, elem, key):
+        value = elem.get(key)
+        if value is None:
+            return
+        for attr_name, index in self._by_attr.items():
+            if self._lxml_name(attr_name) == key:
+                index.get(value, {}).pop(elem, None)
+
+    def _rename(self, elem, tag):
+        """Change elem's tag in place, e.g. "w:t" to "w:delText", keeping it indexed."""
+        old_tag = self._tags.get(elem)
+        self._by_tag.get(old_tag, {}).pop(elem, None)
+        self._mark_stale(elem, old_tag)
+        elem.tag = self._lxml_name(tag)
+        self._tags[elem] = tag
+        self._by_tag.setdefault(tag, {})[elem] = None
+        self._mark_stale(elem, tag)
+
+    def _new_element(self, parent, tag):
+        """
+        New element appended to parent, to be moved into place with the tree API.
+
+        Created in place so that it uses the prefixes already declared. Call
+        _restructured() on a subtree holding it once the edit is done.
+        """
+        return lxml.etree.SubElement(parent, self._lxml_name(tag))
+
+    def _declare_namespace(self, prefix, uri):
+        """Declare a namespace on the root element, unless the prefix already is."""
+        if prefix in self.root.nsmap:
+            return
+        # lxml cannot add a declaration to an existing element; have
+        # cleanup_namespaces() hoist one from a placeholder child instead
+        keep = {
+            declared
+            for declared, _ in self.root.xpath("//namespace::*")
+            if declared and declared != "xml"
+        }
+        placeholder = lxml.etree.SubElement(
+            self.root, f"{{{uri}}}placeholder", nsmap={prefix: uri}
+        )
+        lxml.etree.cleanup_namespaces(
+            self.root, top_nsmap={prefix: uri}, keep_ns_prefixes=sorted(keep)
+        )
+        self.root.remove(placeholder)
+        self._forget_unresolved_names()
+
+    def _restructured(self, elem):
+        """
+        Update the indexes after elem's subtree was reworked in place.
+
+        Indexes elements created with _new_element() or copied in, and
+        re-reads the text of the subtree, keeping it as XMLEditor split it
+        where it only moved. elem itself must not have been moved.
+        """
+        texts, tails = {}, {}
+        self._record_tree_text(elem, texts, tails)
+        self._text.update(_keep_split_text(texts, self._text))
+        self._tail.update(_keep_split_text(tails, self._tail))
+        self._index_subtree(elem)
+        for node in elem.iter(lxml.etree.Element):
+            self._text_cache.pop(node, None)
+        self._invalidate_text(elem)
+
+    def _get_element_text(self, elem):
+        """
+        All text within an element, skipping whitespace-only text nodes.
+
+        Same result as XMLEditor._get_element_text() for the same element;
+        cached until an edit inside the element.
+        """
+        text = self._text_cache.get(elem)
+        if text is None:
+            parts = [self._text.get(elem, "")]
+            for child in elem:
+                if isinstance(child.tag, str):
+                    parts.append(self._get_element_text(child))
+                    parts.append(self._tail.get(child, ""))
+            text = self._text_cache[elem] = "".join(parts)
+        return text
+
+    def get_line_number(self, elem):
+        """Line of elem in the original file, or None for inserted elements."""
+        return self._lines.get(elem)
+
+    def replace_node(self, elem, new_content):
+        """
+        Replace an element with new XML content.
+
+        Args:
+            elem: lxml.etree._Element to replace
+            new_content: String containing XML to replace the node with
+
+        Returns:
+            List[lxml.etree._Element]: The inserted top-level elements
+
+        Example:
+            new_elems = editor.replace_node(old_elem, "<w:r><w:t>text</w:t></w:r>")
+        """
+        nodes = self.insert_before(elem, new_content)
+        self._remove(elem)
+        return nodes
+
+    def insert_after(self, elem, xml_content):
+        """
+        Insert XML content after an element.
+
+        Args:
+            elem: lxml.etree._Element to insert after
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: The inserted top-level elements
+
+        Example:
+            new_elems = editor.insert_after(elem, "<w:r><w:t>text</w:t></w:r>")
+        """
+        wrapper, lead = self._parse_fragment(xml_content)
+        nodes = list(wrapper)
+
+        # New content goes between elem and the text that followed it
+        following, elem.tail = elem.tail, wrapper.text
+        anchor = elem
+        for node in nodes:
+            anchor.addnext(node)
+            anchor = node
+        anchor.tail = (anchor.tail or "") + (following or "")
+
+        following_text, self._tail[elem] = self._tail.get(elem, ""), lead
+        last = _last_element(nodes)
+        self._tail[last] = self._tail.get(last, "") + following_text
+
+        return self._inserted(elem.getparent(), nodes)
+
+    def insert_before(self, elem, xml_content):
+        """
+        Insert XML content before an element.
+
+        Args:
+            elem: lxml.etree._Element to insert before
+            xml_content: String containing XML to insert
+
+        Returns:
+            List[lxml.etree._Element]: The inserted top-level elements
+
+        Example:
+            new_elems = editor.insert_before(elem, "<w:r><w:t>text</w:t></w:r>")
+        """
+        wrapper, lead = self._parse_fragment(xml_content)
+        nodes = list(wrapper)
+
+        self._append_text_before(elem, wrapper.text, lead)
+        for node in nodes:
+            elem.addprevious(node)
+
+        return self._inserted(elem.getparent(), nodes)
+
+    def append_to(self, elem, xml_content):
+        """
+        Append XML content as a child of an element.
+
+        Args:
+            elem: lxml.etree._Element to append to
+            xml_content: String containing XML to append
+
+        Returns:
+            List[lxml.etree._Element]: The inserted top-level elements
+
+        Example:
+            new_elems = editor.append_to(elem, "<w:r><w:t>text</w:t></w:r>")
+        """
+        wrapper, lead = self._parse_fragment(xml_content)
+        nodes = list(wrapper)
+
+        if len(elem):
+            elem[-1].tail = (elem[-1].tail or "") + (wrapper.text or "")
+        else:
+            elem.text = (elem.text or "") + (wrapper.text or "")
+        last = _last_element(list(elem))
+        if last is not None:
+            self._tail[last] = self._tail.get(last, "") + lead
+        else:
+            self._text[elem] = self._text.get(elem, "") + lead
+        for node in nodes:
+            elem.append(node)
+
+        return self._inserted(elem, nodes)
+
+    def get_next_rid(self):
+        """Get the next available rId for relationships files."""
+        max_id = 0
+        for rel_elem in self._by_tag.get("Relationship", {}):
+            rel_id = rel_elem.get("Id", "")
+            if rel_id.startswith("rId"):
+                try:
+                    max_id = max(max_id, int(rel_id[3:]))
+                except ValueError:
+                    pass
+        return f"rId{max_id + 1}"
+
+    def serialize(self):
+        """
+        Serialize the edited XML, preserving the original encoding (ascii or utf-8).
+
+        Returns:
+            bytes: The document as it would be written by save()
+        """
+        declaration = f'<?xml version="1.0" encoding="{self.encoding}"?>'
+        return declaration.encode(self.encoding) + lxml.etree.tostring(
+            self.tree, encoding=self.encoding
+        )
+
+    def save(self):
+        """
+        Save the edited XML back to the file.
+
+        Serializes the tree and writes it back to the original file path,
+        preserving the original encoding (ascii or utf-8).
+        """
+        self.xml_path.write_bytes(self.serialize())
+
+    def _append_text_before(self, elem, text, kept_text):
+        """Add text right before elem, both to the tree and to the text index."""
+        previous = elem.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + (text or "")
+        else:
+            parent = elem.getparent()
+            parent.text = (parent.text or "") + (text or "")
+
+        previous_element = elem.getprevious()
+        while previous_element is not None and not isinstance(
+            previous_element.tag, str
+        ):
+            previous_element = previous_element.getprevious()
+        if previous_element is not None:
+            self._tail[previous_element] = self._tail.get(previous_element, "") + kept_text
+        else:
+            parent = elem.getparent()
+            self._text[parent] = self._text.get(parent, "") + kept_text
+
+    def _remove(self, elem):
+        """Remove elem and its subtree, keeping the text that followed it."""
+        parent = elem.getparent()
+        self._append_text_before(elem, elem.tail, self._tail.get(elem, ""))
+        parent.remove(elem)
+
+        for node in elem.iter(lxml.etree.Element):
+            tag = self._tags.pop(node, None)
+            self._by_tag.get(tag, {}).pop(node, None)
+            self._mark_stale(node, tag)
+            for attr_name, index in self._by_attr.items():
+                key = self._lxml_name(attr_name)
+                value = node.get(key) if key is not None else None
+                if value is not None:
+                    index.get(value, {}).pop(node, None)
+            line = self._lines.pop(node, None)
+            if line is not None:
+                self._by_line[line].remove(node)
+            self._text.pop(node, None)
+            self._tail.pop(node, None)
+            self._text_cache.pop(node, None)
+        self._invalidate_text(parent)
+
+    def _inserted(self, parent, nodes):
+        """Index newly inserted nodes and return the elements among them."""
+        elements = [node for node in nodes if isinstance(node.tag, str)]
+        # The new content may declare prefixes of its own
+        self._forget_unresolved_names()
+        for node in elements:
+            self._index_subtree(node)
+        self._invalidate_text(parent)
+        return elements
+
+    def _index_subtree(self, elem):
+        """Add elem and its descendants to the tag and attribute indexes."""
+        for node in elem.iter(lxml.etree.Element):
+            tag = _qualified_name(node)
+            self._tags[node] = tag
+            self._by_tag.setdefault(tag, {})[node] = None
+            self._mark_stale(node, tag)
+            for attr_name, index in self._by_attr.items():
+                key = self._lxml_name(attr_name)
+                value = node.get(key) if key is not None else None
+                if value is not None:
+                    index.setdefault(value, {})[node] = None
+
+    def _invalidate_text(self, elem):
+        """Drop the cached text of elem and its ancestors after an edit inside elem."""
+        while elem is not None:
+            self._text_cache.pop(elem, None)
+            self._mark_stale(elem, self._tags.get(elem))
+            elem = elem.getparent()
+
+    def _mark_stale(self, elem, tag):
+        """Note that elem's text changed, or elem was added or removed, for text search."""
+        for key in (tag, "*"):
+            search = self._text_search.get(key)
+            if search is not None:
+                search.stale.add(elem)
+
+    def _record_tree_text(self, elem, texts, tails):
+        """Read the text of elem's subtree from the tree into texts and tails."""
+        for node in elem.iter(lxml.etree.Element):
+            owner, store = node, texts
+            pieces = [node.text]
+            for child in node:
+                if isinstance(child.tag, str):
+                    store[owner] = _join_text(pieces)
+                    owner, store, pieces = child, tails, [child.tail]
+                else:
+                    pieces.append(child.tail)
+            store[owner] = _join_text(pieces)
+
+    def _parse_fragment(self, xml_content):
+        """
+        Parse XML fragment into a wrapper element holding the new nodes.
+
+        The text index entries of the new nodes are taken from the same
+        fragment parsed the way XMLEditor parses it.
+
+        Args:
+            xml_content: String containing XML fragment
+
+        Returns:
+            Tuple of the wrapper element and the indexed text before its first
+            child element
+
+        Raises:
+            AssertionError: If fragment contains no element nodes
+        """
+        # Extract namespace declarations from the root document element
+        namespaces = [
+            f'xmlns:{prefix}="{uri}"' if prefix else f'xmlns="{uri}"'
+            for prefix, uri in self.root.nsmap.items()
+        ]
+
+        ns_decl = " ".join(namespaces)
+        wrapper_xml = f"<root {ns_decl}>{xml_content}</root>"
+        wrapper = lxml.etree.fromstring(wrapper_xml, _LXML_PARSER)
+        assert any(
+            isinstance(node.tag, str) for node in wrapper
+        ), "Fragment must contain at least one element"
+
+        fragment_doc = defusedxml.minidom.parseString(wrapper_xml)
+        texts, tails = {}, {}
+        _record_dom_text(fragment_doc.documentElement, wrapper, texts, tails)
+        for node in wrapper.iter(lxml.etree.Element):
+            if node is not wrapper:
+                self._text[node] = texts.get(node, "")
+                self._tail[node] = tails.get(node, "")
+        return wrapper, texts.get(wrapper, "")
+
+
+def _detect_encoding(xml_path):
+    """Encoding to write an XML file back in: 'ascii' if it declares it, else 'utf-8'."""
+    with open(xml_path, "rb") as f:
+        header = f.read(200).decode("utf-8", errors="ignore")
+    return "ascii" if 'encoding="ascii"' in header else "utf-8"
+
+
+def _single_match(matches, tag, attrs, line_number, contains):
+    """
+    Return the only node in matches, or raise a ValueError describing the search.
+
+    Raises:
+        ValueError: If matches is empty or holds more than one node
+    """
+    if not matches:
+        # Build descriptive error message
+        filters = []
+        if line_number is not None:
+            line_str = (
+                f"lines {line_number.start}-{line_number.stop - 1}"
+                if isinstance(line_number, range)
+                else f"line {line_number}"
+            )
+            filters.append(f"at {line_str}")
+        if attrs is not None:
+            filters.append(f"with attributes {attrs}")
+        if contains is not None:
+            filters.append(f"containing '{contains}'")
+
+        filter_desc = " ".join(filters) if filters else ""
+        base_msg = f"Node not found: <{tag}> {filter_desc}".strip()
+
+        # Add helpful hint based on filters used
+        if contains:
+            hint = "Text may be split across elements or use different wording."
+        elif line_number:
+            hint = "Line numbers may have changed if document was modified."
+        elif attrs:
+            hint = "Verify attribute values are correct."
+        else:
+            hint = "Try adding filters (attrs, line_number, or contains)."
+
+        raise ValueError(f"{base_msg}. {hint}")
+    if len(matches) > 1:
+        raise ValueError(
+            f"Multiple nodes found: <{tag}>. "
+            f"Add more filters (attrs, line_number, or contains) to narrow the search."
+        )
+    return matches[0]
+
+
+def _line_matches(elem_line, line_number):
+    """Whether an element's original line satisfies a line_number filter."""
+    if isinstance(line_number, range):
+        return elem_line in line_number
+    return elem_line == line_number
+
+
+def _qualified_name(elem):
+    """Tag of an lxml element as written in the file, e.g. "w:p"."""
+    local_name = lxml.etree.QName(elem).localname
+    return f"{elem.prefix}:{local_name}" if elem.prefix else local_name
+
+
+def _join_text(pieces):
+    """Non-whitespace pieces of text joined, as the text index holds them."""
+    return "".join(piece for piece in pieces if piece and piece.strip())
+
+
+def _keep_split_text(texts, recorded):
+    """
+    Text read back from the tree, keeping the recorded text where only whitespace differs.
+
+    The recorded text drops whitespace where XMLEditor's parser split the
+    text, which the tree no longer shows, so it is kept unless edited.
+    """
+    for elem, text in texts.items():
+        previous = recorded.get(elem)
+        if previous is not None and "".join(previous.split()) == "".join(text.split()):
+            texts[elem] = previous
+    return texts
+
+
+def _last_element(nodes):
+    """Last element among nodes, skipping comments and processing instructions."""
+    for node in reversed(nodes):
+        if isinstance(node.tag, str):
+            return node
+    return None
+
+
+class _TextSearch:
+    """
+    Text of a set of elements joined into one string for fast substring search.
+
+    The texts are joined with NUL, which cannot occur in XML, so a match
+    never spans two elements. stale collects elements whose text no longer
+    matches the joined string, and elements added since it was built.
+    """
+
+    def __init__(self, elements, texts):
+        self.elements = elements
+        self.starts = []
+        self.stale = set()
+        offset = 0
+        joined = []
+        for text in texts:
+            self.starts.append(offset)
+            joined.append(text)
+            offset += len(text) + 1
+        self.joined = "\0".join(joined)
+
+    def find(self, text):
+        """Elements whose text, as joined, contains text."""
+        if not text:
+            return list(self.elements)
+        found = []
+        position = self.joined.find(text)
+        while position != -1:
+            index = bisect.bisect_right(self.starts, position) - 1
+            found.append(self.elements[index])
+            if index + 1 == len(self.starts):
+                break
+            position = self.joined.find(text, self.starts[index + 1])
+        return found
+
+
+class _PositionRecorder(xml.sax.handler.ContentHandler):
+    """
+    Records what XMLEditor's parser reports for each element, in document order.
+
+    lines holds each element's start line. texts and tails hold the
+    non-whitespace text chunks directly inside each element before its first
+    child element, and after the element up to its next sibling element.
+    Chunks are split exactly where the parser splits text nodes, so whitespace
+    is dropped exactly where XMLEditor._get_element_text() drops it.
+    """
+
+    def __init__(self, parser):
+        super().__init__()
+        self.parser = parser
+        self.lines = []
+        self.texts = []
+        self.tails = []
+        self._stack = []
+        self._chunks = None
+
+    def startElementNS(self, name, qname, attrs):
+        self.lines.append(self.parser._parser.CurrentLineNumber)  # type: ignore
+        self.texts.append([])
+        self.tails.append([])
+        self._stack.append(len(self.lines) - 1)
+        self._chunks = self.texts[-1]
+
+    def endElementNS(self, name, qname):
+        self._chunks = self.tails[self._stack.pop()]
+
+    def characters(self, content):
+        if self._chunks is not None and content.strip():
+            self._chunks.append(content)
+
+
+def _record_positions(xml_path):
+    """
+    Run XMLEditor's parser over a file, fed the same way, and record positions.
+
+    Returns:
+        _PositionRecorder: Lines and text chunks of every element
+    """
+    parser = defusedxml.sax.make_parser()
+    recorder = _PositionRecorder(parser)
+    parser.setFeature(xml.sax.handler.feature_namespaces, True)
+    parser.setContentHandler(recorder)
+    with open(xml_path, "rb") as f:
+        while chunk := f.read(xml.dom.pulldom.default_bufsize):
+            parser.feed(chunk)
+    parser.close()
+    return recorder
+
+
+def _record_dom_text(dom_elem, elem, texts, tails):
+    """
+    Index the text of an lxml subtree from the same XML parsed with minidom.
+
+    Walks both trees together, storing the non-whitespace text nodes before
+    each element's first child element in texts and after each element in
+    tails, keyed by the lxml element.
+    """
+    children = (child for child in elem if isinstance(child.tag, str))
+    owner, store = elem, texts
+    chunks = []
+    for node in dom_elem.childNodes:
+        if node.nodeType == node.TEXT_NODE:
+            if node.data.strip():
+                chunks.append(node.data)
+        elif node.nodeType == node.ELEMENT_NODE:
+            store[owner] = "".join(chunks)
+            owner, store, chunks = next(children), tails, []
+            _record_dom_text(node, owner, texts, tails)
+    store[owner] = "".join(chunks)
+
+
 def _create_line_tracking_parser():
     """
     Create a SAX parser that tracks line and column numbers for each element.
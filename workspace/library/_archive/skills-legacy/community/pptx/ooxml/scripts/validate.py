@@ -10,7 +10,12 @@ import argparse
 import sys
 from pathlib import Path
 
-from validation import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+from validation import (
+    DOCXSchemaValidator,
+    PartCache,
+    PPTXSchemaValidator,
+    RedliningValidator,
+)
 
 
 def main():
@@ -52,10 +57,11 @@ def main():
             print(f"Error: Validation not supported for file type {file_extension}")
             sys.exit(1)
 
-    # Run validators
+    # Run validators; every part is parsed once and shared between them
+    parts = PartCache(unpacked_dir)
     success = True
     for V in validators:
-        validator = V(unpacked_dir, original_file, verbose=args.verbose)
+        validator = V(unpacked_dir, original_file, verbose=args.verbose, parts=parts)
         if not validator.validate():
             success = False
 
@@ -2,11 +2,66 @@
 Base validator with common validation logic for document files.
 """
 
+import copy
+import functools
+import io
+import os
 import re
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 import lxml.etree
 
+from .baseline import BaselineErrors
+from .parts import PartCache
+
+# Worker processes for XSD validation; packages with fewer than
+# MIN_PARTS_PER_WORKER parts per worker are validated in-process
+XSD_WORKERS = int(os.environ.get("OOXML_VALIDATION_WORKERS", os.cpu_count() or 1))
+MIN_PARTS_PER_WORKER = 8
+
+# Compiled schemas by path, kept for the life of the process
+_schema_cache = {}
+_xsd_pool = None
+# Validator per worker process for the validation run it is currently serving
+_worker_validator = {}
+
+
+def load_schema(schema_path):
+    """Compile the XSD at ``schema_path``, or return the copy compiled earlier in this process."""
+    key = str(schema_path)
+    schema = _schema_cache.get(key)
+    if schema is None:
+        with open(schema_path, "rb") as xsd_file:
+            parser = lxml.etree.XMLParser()
+            xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=key)
+        schema = lxml.etree.XMLSchema(xsd_doc)
+        _schema_cache[key] = schema
+    return schema
+
+
+def _get_xsd_pool():
+    global _xsd_pool
+    if _xsd_pool is None:
+        _xsd_pool = ProcessPoolExecutor(max_workers=XSD_WORKERS)
+    return _xsd_pool
+
+
+def _validate_part_xsd(validator_class, unpacked_dir, original_file, run_id, xml_file):
+    """Worker side of validate_against_xsd: one part's raw errors, with a validator reused for the rest of the run.
+
+    Comparing with the original happens in the parent, which owns the baseline index.
+    """
+    validator = _worker_validator.get(run_id)
+    if validator is None:
+        _worker_validator.clear()
+        validator = validator_class(unpacked_dir, original_file)
+        _worker_validator[run_id] = validator
+    return validator._validate_single_file_xsd(
+        Path(xml_file).resolve(), validator.unpacked_dir
+    )
+
 
 class BaseSchemaValidator:
     """Base validator with common validation logic for document files."""
@@ -103,19 +158,21 @@ class BaseSchemaValidator:
         "http://www.w3.org/XML/1998/namespace",
     }
 
-    def __init__(self, unpacked_dir, original_file, verbose=False):
+    def __init__(self, unpacked_dir, original_file, verbose=False, parts=None):
         self.unpacked_dir = Path(unpacked_dir).resolve()
         self.original_file = Path(original_file)
         self.verbose = verbose
 
+        # Parsed parts, shared with the other validators of the same run if given
+        self.parts = parts if parts is not None else PartCache(self.unpacked_dir)
+        # XSD errors of the original document, loaded on first need
+        self._baseline = None
+
         # Set schemas directory
         self.schemas_dir = Path(__file__).parent.parent.parent / "schemas"
 
         # Get all XML and .rels files
-        patterns = ["*.xml", "*.rels"]
-        self.xml_files = [
-            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
-        ]
+        self.xml_files = self.parts.xml_files()
 
         if not self.xml_files:
             print(f"Warning: No XML files found in {self.unpacked_dir}")
@@ -131,7 +188,7 @@ class BaseSchemaValidator:
         for xml_file in self.xml_files:
             try:
                 # Try to parse the XML file
-                lxml.etree.parse(str(xml_file))
+                self.parts.tree(xml_file)
             except lxml.etree.XMLSyntaxError as e:
                 errors.append(
                     f"  {xml_file.relative_to(self.unpacked_dir)}: "
@@ -159,7 +216,7 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.parts.root(xml_file)
                 declared = set(root.nsmap.keys()) - {None}  # Exclude default namespace
 
                 for attr_val in [
@@ -190,15 +247,19 @@ class BaseSchemaValidator:
 
         for xml_file in self.xml_files:
             try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
+                root = self.parts.root(xml_file)
                 file_ids = {}  # Track IDs that must be unique within this file
 
-                # Remove all mc:AlternateContent elements from the tree
-                mc_elements = root.xpath(
-                    ".//mc:AlternateContent", namespaces={"mc": self.MC_NAMESPACE}
-                )
-                for elem in mc_elements:
-                    elem.getparent().remove(elem)
+                # Remove all mc:AlternateContent elements, from a private copy
+                # since the parsed tree is shared with the other checks
+                mc_namespaces = {"mc": self.MC_NAMESPACE}
+                if root.xpath(".//mc:AlternateContent", namespaces=mc_namespaces):
+                    root = self.parts.copy(xml_file).getroot()
+                    mc_elements = root.xpath(
+                        ".//mc:AlternateContent", namespaces=mc_namespaces
+                    )
+                    for elem in mc_elements:
+                        elem.getparent().remove(elem)
 
                 # Now check IDs in the cleaned tree
                 for elem in root.iter():
@@ -281,7 +342,7 @@ class BaseSchemaValidator:
         errors = []
 
         # Find all .rels files
-        rels_files = list(self.unpacked_dir.rglob("*.rels"))
+        rels_files = [f for f in self.xml_files if f.name.endswith(".rels")]
 
         if not rels_files:
             if self.verbose:
@@ -290,10 +351,9 @@ class BaseSchemaValidator:
 
         # Get all files in the unpacked directory (excluding reference files)
         all_files = []
-        for file_path in self.unpacked_dir.rglob("*"):
+        for file_path in self.parts.files():
             if (
-                file_path.is_file()
-                and file_path.name != "[Content_Types].xml"
+                file_path.name != "[Content_Types].xml"
                 and not file_path.name.endswith(".rels")
             ):  # This file is not referenced by .rels
                 all_files.append(file_path.resolve())
@@ -310,7 +370,7 @@ class BaseSchemaValidator:
         for rels_file in rels_files:
             try:
                 # Parse relationships file
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.parts.root(rels_file)
 
                 # Get the directory where this .rels file is located
                 rels_dir = rels_file.parent
@@ -390,8 +450,6 @@ class BaseSchemaValidator:
         Validate that all r:id attributes in XML files reference existing IDs
         in their corresponding .rels files, and optionally validate relationship types.
         """
-        import lxml.etree
-
         errors = []
 
         # Process each XML file that might contain r:id references
@@ -411,7 +469,7 @@ class BaseSchemaValidator:
 
             try:
                 # Parse the .rels file to get valid relationship IDs and their types
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self.parts.root(rels_file)
                 rid_to_type = {}
 
                 for rel in rels_root.findall(
@@ -434,7 +492,7 @@ class BaseSchemaValidator:
                         rid_to_type[rid] = type_name
 
                 # Parse the XML file to find all r:id references
-                xml_root = lxml.etree.parse(str(xml_file)).getroot()
+                xml_root = self.parts.root(xml_file)
 
                 # Find all elements with r:id attributes
                 for elem in xml_root.iter():
@@ -531,7 +589,7 @@ class BaseSchemaValidator:
 
         try:
             # Parse and get all declared parts and extensions
-            root = lxml.etree.parse(str(content_types_file)).getroot()
+            root = self.parts.root(content_types_file)
             declared_parts = set()
             declared_extensions = set()
 
@@ -576,8 +634,7 @@ class BaseSchemaValidator:
             }
 
             # Get all files in the unpacked directory
-            all_files = list(self.unpacked_dir.rglob("*"))
-            all_files = [f for f in all_files if f.is_file()]
+            all_files = self.parts.files()
 
             # Check all XML files for Override declarations
             for xml_file in self.xml_files:
@@ -593,7 +650,7 @@ class BaseSchemaValidator:
                     continue
 
                 try:
-                    root_tag = lxml.etree.parse(str(xml_file)).getroot().tag
+                    root_tag = self.parts.root(xml_file).tag
                     root_name = root_tag.split("}")[-1] if "}" in root_tag else root_tag
 
                     if root_name in declarable_roots and path_str not in declared_parts:
@@ -656,6 +713,15 @@ class BaseSchemaValidator:
         is_valid, current_errors = self._validate_single_file_xsd(
             xml_file, unpacked_dir
         )
+        result = self._compare_with_original(
+            xml_file, is_valid, current_errors, verbose
+        )
+        self._save_baseline()
+        return result
+
+    def _compare_with_original(self, xml_file, is_valid, current_errors, verbose=False):
+        """Reduce a part's XSD result to the errors the original document did not have."""
+        unpacked_dir = self.unpacked_dir
 
         if is_valid is None:
             return None, set()  # Skipped
@@ -692,11 +758,9 @@ class BaseSchemaValidator:
         valid_count = 0
         skipped_count = 0
 
-        for xml_file in self.xml_files:
+        results = self._validate_files_against_xsd(self.xml_files)
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
             relative_path = str(xml_file.relative_to(self.unpacked_dir))
-            is_valid, new_file_errors = self.validate_file_against_xsd(
-                xml_file, verbose=False
-            )
 
             if is_valid is None:
                 skipped_count += 1
@@ -738,6 +802,60 @@ class BaseSchemaValidator:
                 print("\nPASSED - No new XSD validation errors introduced")
             return True
 
+    def _validate_files_against_xsd(self, xml_files):
+        """Run validate_file_against_xsd over xml_files, returning results in the same order.
+
+        Larger packages are spread over a pool of worker processes, each of
+        which compiles a schema once and reuses it for every part it is sent.
+        Parts are dispatched grouped by schema so that a worker mostly sees
+        one schema. If the pool cannot be used, parts are validated here.
+        Either way the comparison with the original happens in this process.
+        """
+        raw_results = self._validate_files_xsd(xml_files)
+        results = [
+            self._compare_with_original(Path(xml_file).resolve(), is_valid, errors)
+            for xml_file, (is_valid, errors) in zip(xml_files, raw_results)
+        ]
+        self._save_baseline()
+        return results
+
+    def _validate_files_xsd(self, xml_files):
+        """(is_valid, errors) from _validate_single_file_xsd for each of xml_files, in order."""
+        results = [(None, None)] * len(xml_files)
+        jobs = sorted(
+            (str(schema_path), index)
+            for index, xml_file in enumerate(xml_files)
+            if (schema_path := self._get_schema_path(xml_file))
+        )
+        indices = [index for _, index in jobs]
+
+        workers = min(XSD_WORKERS, len(indices) // MIN_PARTS_PER_WORKER)
+        if workers > 1:
+            validate_part = functools.partial(
+                _validate_part_xsd,
+                type(self),
+                self.unpacked_dir,
+                self.original_file,
+                uuid.uuid4().hex,
+            )
+            try:
+                outcomes = _get_xsd_pool().map(
+                    validate_part,
+                    [xml_files[index] for index in indices],
+                    chunksize=max(1, len(indices) // (workers * 4)),
+                )
+                for index, outcome in zip(indices, outcomes):
+                    results[index] = outcome
+                return results
+            except Exception as e:
+                print(f"Warning: Parallel XSD validation failed ({e}), validating serially")
+
+        for index in indices:
+            results[index] = self._validate_single_file_xsd(
+                Path(xml_files[index]).resolve(), self.unpacked_dir
+            )
+        return results
+
     def _get_schema_path(self, xml_file):
         """Determine the appropriate schema path for an XML file."""
         # Check exact filename match
@@ -765,8 +883,7 @@ class BaseSchemaValidator:
     def _clean_ignorable_namespaces(self, xml_doc):
         """Remove attributes and elements not in allowed namespaces."""
         # Create a clean copy
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+        xml_copy = copy.deepcopy(xml_doc.getroot())
 
         # Remove attributes not in allowed namespaces
         for elem in xml_copy.iter():
@@ -830,41 +947,58 @@ class BaseSchemaValidator:
             return None, None  # Skip file
 
         try:
-            # Load schema
-            with open(schema_path, "rb") as xsd_file:
-                parser = lxml.etree.XMLParser()
-                xsd_doc = lxml.etree.parse(
-                    xsd_file, parser=parser, base_url=str(schema_path)
-                )
-                schema = lxml.etree.XMLSchema(xsd_doc)
+            # Load XML; the shared tree is copied before any change
+            if xml_file in self.parts:
+                xml_doc = self.parts.tree(xml_file)
+            else:
+                xml_doc = lxml.etree.parse(str(xml_file))
 
-            # Load and preprocess XML
-            with open(xml_file, "r") as f:
-                xml_doc = lxml.etree.parse(f)
+            return self._validate_xsd(
+                xml_doc, schema_path, xml_file.relative_to(base_path)
+            )
 
-            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
-            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+        except Exception as e:
+            return False, {str(e)}
 
-            # Clean ignorable namespaces if needed
-            relative_path = xml_file.relative_to(base_path)
-            if (
-                relative_path.parts
-                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
-            ):
-                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+    def _validate_xsd(self, xml_doc, schema_path, relative_path):
+        """Validate a parsed part against its schema. Returns (is_valid, errors_set)."""
+        # Load schema, compiled once per process
+        schema = load_schema(schema_path)
 
-            # Validate
-            if schema.validate(xml_doc):
-                return True, set()
-            else:
-                errors = set()
-                for error in schema.error_log:
-                    # Store normalized error message (without line numbers for comparison)
-                    errors.add(error.message)
-                return False, errors
+        # Preprocess XML
+        xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
+        xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
 
+        # Clean ignorable namespaces if needed
+        if relative_path.parts and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS:
+            xml_doc = self._clean_ignorable_namespaces(xml_doc)
+
+        # Validate
+        if schema.validate(xml_doc):
+            return True, set()
+        else:
+            errors = set()
+            for error in schema.error_log:
+                # Store normalized error message (without line numbers for comparison)
+                errors.add(error.message)
+            return False, errors
+
+    def _validate_original_part(self, part_name, data):
+        """XSD errors of a part of the original document, given the zip member's bytes."""
+        relative_path = Path(part_name)
+        schema_path = self._get_schema_path(relative_path)
+        if not schema_path:
+            return set()
+        try:
+            xml_doc = lxml.etree.parse(io.BytesIO(data))
+            _, errors = self._validate_xsd(xml_doc, schema_path, relative_path)
+            return errors
         except Exception as e:
-            return False, {str(e)}
+            return {str(e)}
+
+    def _save_baseline(self):
+        if self._baseline is not None:
+            self._baseline.save()
 
     def _get_original_file_errors(self, xml_file):
         """Get XSD validation errors from a single file in the original document.
@@ -875,33 +1009,18 @@ class BaseSchemaValidator:
         Returns:
             set: Set of error messages from the original file
         """
-        import tempfile
-        import zipfile
-
         # Resolve both paths to handle symlinks (e.g., /var vs /private/var on macOS)
         xml_file = Path(xml_file).resolve()
         unpacked_dir = self.unpacked_dir.resolve()
         relative_path = xml_file.relative_to(unpacked_dir)
 
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Extract original file
-            with zipfile.ZipFile(self.original_file, "r") as zip_ref:
-                zip_ref.extractall(temp_path)
-
-            # Find corresponding file in original
-            original_xml_file = temp_path / relative_path
-
-            if not original_xml_file.exists():
-                # File didn't exist in original, so no original errors
-                return set()
-
-            # Validate the specific file in original
-            is_valid, errors = self._validate_single_file_xsd(
-                original_xml_file, temp_path
+        # One index per original file, read from its zip in memory and kept on
+        # disk by content hash for later runs against the same document
+        if self._baseline is None:
+            self._baseline = BaselineErrors(
+                self.original_file, self._validate_original_part, type(self).__name__
             )
-            return errors if errors else set()
+        return self._baseline.errors(relative_path.as_posix())
 
     def _remove_template_tags_from_text_nodes(self, xml_doc):
         """Remove template tags from XML text nodes and collect warnings.
@@ -917,8 +1036,7 @@ class BaseSchemaValidator:
         template_pattern = re.compile(r"\{\{[^}]*\}\}")
 
         # Create a copy of the document to avoid modifying the original
-        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
-        xml_copy = lxml.etree.fromstring(xml_string)
+        xml_copy = copy.deepcopy(xml_doc.getroot())
 
         def process_text_content(text, content_type):
             if not text:
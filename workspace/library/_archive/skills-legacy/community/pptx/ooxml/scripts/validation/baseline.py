@@ -0,0 +1,89 @@
+"""
+Index of the XSD errors already present in an original document.
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import zipfile
+from pathlib import Path
+
+# Where baseline indexes are kept between runs
+BASELINE_CACHE_DIR = Path(
+    os.environ.get(
+        "OOXML_BASELINE_CACHE_DIR",
+        Path(tempfile.gettempdir()) / "ooxml-baseline-errors",
+    )
+)
+# Bump when the way errors are computed changes, to ignore older indexes
+BASELINE_CACHE_VERSION = 1
+
+
+class BaselineErrors:
+    """XSD errors of each part of an original .docx/.pptx, read straight from the zip.
+
+    A part's errors are computed the first time they are asked for, by
+    ``validate_part(name, data)`` on the member's bytes, and remembered. The
+    index is stored on disk under the original file's content hash, so later
+    runs against the same source document start with every part that was
+    already checked. Call ``save`` to write new entries.
+    """
+
+    def __init__(self, original_file, validate_part, cache_key):
+        self.original_file = Path(original_file)
+        self.validate_part = validate_part
+        data = self.original_file.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        self.cache_file = (
+            BASELINE_CACHE_DIR
+            / f"{digest}-{cache_key}-v{BASELINE_CACHE_VERSION}.json"
+        )
+        self._zip = zipfile.ZipFile(io.BytesIO(data))
+        self._members = set(self._zip.namelist())
+        self._errors = self._load()
+        self._dirty = False
+
+    def _load(self):
+        try:
+            with open(self.cache_file, encoding="utf-8") as f:
+                return {name: set(errors) for name, errors in json.load(f).items()}
+        except (OSError, ValueError):
+            return {}
+
+    def errors(self, part_name):
+        """Errors the original had in ``part_name`` (a path relative to the package root)."""
+        if part_name not in self._errors:
+            if part_name in self._members:
+                errors = self.validate_part(part_name, self._zip.read(part_name))
+            else:
+                # Part didn't exist in original, so no original errors
+                errors = set()
+            self._errors[part_name] = errors
+            self._dirty = True
+        return self._errors[part_name]
+
+    def save(self):
+        """Persist entries added since the index was loaded; a failed write only costs a recomputation later."""
+        if not self._dirty:
+            return
+        temp_name = None
+        try:
+            BASELINE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=BASELINE_CACHE_DIR, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(
+                    {name: sorted(errors) for name, errors in self._errors.items()}, f
+                )
+            # Atomic, so concurrent runs never read a half-written index
+            os.replace(temp_name, self.cache_file)
+            self._dirty = False
+        except OSError as e:
+            print(f"Warning: Could not save baseline errors to {self.cache_file}: {e}")
+            if temp_name and os.path.exists(temp_name):
+                os.unlink(temp_name)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
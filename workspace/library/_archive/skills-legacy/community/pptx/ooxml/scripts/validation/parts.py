@@ -0,0 +1,74 @@
+"""
+Parse-once cache of the XML parts of an unpacked Office document.
+"""
+
+import copy
+import os
+from pathlib import Path
+
+import lxml.etree
+
+
+class PartCache:
+    """Parsed XML parts of an unpacked document, shared by every validator in a run.
+
+    Each part is parsed at most once, on first use. Trees returned by ``tree``
+    and ``root`` are shared between checks and must be treated as read-only;
+    a check that modifies a tree takes a private ``copy``. A part that fails
+    to parse raises the same ``XMLSyntaxError`` on every access.
+
+    Build a new cache after the unpacked files change.
+    """
+
+    def __init__(self, unpacked_dir):
+        self.unpacked_dir = Path(unpacked_dir).resolve()
+        self._trees = {}
+        self._syntax_errors = {}
+        self._files = None
+        self._xml_files = None
+
+    def files(self):
+        """All files in the package, directories excluded."""
+        if self._files is None:
+            self._files = [f for f in self.unpacked_dir.rglob("*") if f.is_file()]
+        return self._files
+
+    def xml_files(self):
+        """All ``.xml`` and ``.rels`` parts."""
+        if self._xml_files is None:
+            patterns = ["*.xml", "*.rels"]
+            self._xml_files = [
+                f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+            ]
+        return self._xml_files
+
+    def tree(self, path):
+        """Shared, read-only parsed tree of the part at ``path``."""
+        key = os.path.abspath(path)
+        tree = self._trees.get(key)
+        if tree is not None:
+            return tree
+        if key in self._syntax_errors:
+            raise self._syntax_errors[key]
+        try:
+            tree = lxml.etree.parse(key)
+        except lxml.etree.XMLSyntaxError as e:
+            self._syntax_errors[key] = e
+            raise
+        self._trees[key] = tree
+        return tree
+
+    def root(self, path):
+        """Shared, read-only root element of the part at ``path``."""
+        return self.tree(path).getroot()
+
+    def copy(self, path):
+        """Private copy of the part's tree that may be modified; line numbers are kept."""
+        return copy.deepcopy(self.tree(path))
+
+    def __contains__(self, path):
+        return Path(os.path.abspath(path)).is_relative_to(self.unpacked_dir)
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
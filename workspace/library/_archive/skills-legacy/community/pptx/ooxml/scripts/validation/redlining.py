@@ -7,14 +7,20 @@ import tempfile
 import zipfile
 from pathlib import Path
 
+import lxml.etree
+
+from .parts import PartCache
+
 
 class RedliningValidator:
     """Validator for tracked changes in Word documents."""
 
-    def __init__(self, unpacked_dir, original_docx, verbose=False):
+    def __init__(self, unpacked_dir, original_docx, verbose=False, parts=None):
         self.unpacked_dir = Path(unpacked_dir)
         self.original_docx = Path(original_docx)
         self.verbose = verbose
+        # Parsed parts, shared with the other validators of the same run if given
+        self.parts = parts if parts is not None else PartCache(self.unpacked_dir)
         self.namespaces = {
             "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
         }
@@ -29,10 +35,7 @@ class RedliningValidator:
 
         # First, check if there are any tracked changes by Claude to validate
         try:
-            import xml.etree.ElementTree as ET
-
-            tree = ET.parse(modified_file)
-            root = tree.getroot()
+            root = self.parts.root(modified_file)
 
             # Check for w:del or w:ins tags authored by Claude
             del_elements = root.findall(".//w:del", self.namespaces)
@@ -60,56 +63,47 @@ class RedliningValidator:
             # If we can't parse the XML, continue with full validation
             pass
 
-        # Create temporary directory for unpacking original docx
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-
-            # Unpack original docx
-            try:
-                with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
-                    zip_ref.extractall(temp_path)
-            except Exception as e:
-                print(f"FAILED - Error unpacking original docx: {e}")
-                return False
-
-            original_file = temp_path / "word" / "document.xml"
-            if not original_file.exists():
-                print(
-                    f"FAILED - Original document.xml not found in {self.original_docx}"
-                )
-                return False
-
-            # Parse both XML files using xml.etree.ElementTree for redlining validation
-            try:
-                import xml.etree.ElementTree as ET
-
-                modified_tree = ET.parse(modified_file)
-                modified_root = modified_tree.getroot()
-                original_tree = ET.parse(original_file)
-                original_root = original_tree.getroot()
-            except ET.ParseError as e:
-                print(f"FAILED - Error parsing XML files: {e}")
-                return False
-
-            # Remove Claude's tracked changes from both documents
-            self._remove_claude_tracked_changes(original_root)
-            self._remove_claude_tracked_changes(modified_root)
-
-            # Extract and compare text content
-            modified_text = self._extract_text_content(modified_root)
-            original_text = self._extract_text_content(original_root)
-
-            if modified_text != original_text:
-                # Show detailed character-level differences for each paragraph
-                error_message = self._generate_detailed_diff(
-                    original_text, modified_text
-                )
-                print(error_message)
-                return False
+        # Read the original document.xml straight from the docx
+        try:
+            with zipfile.ZipFile(self.original_docx, "r") as zip_ref:
+                if "word/document.xml" not in zip_ref.namelist():
+                    print(
+                        f"FAILED - Original document.xml not found in {self.original_docx}"
+                    )
+                    return False
+                original_data = zip_ref.read("word/document.xml")
+        except Exception as e:
+            print(f"FAILED - Error unpacking original docx: {e}")
+            return False
+
+        # Parse both XML files; tracked changes are removed below, so the
+        # modified document is a private copy of the shared tree
+        try:
+            modified_root = self.parts.copy(modified_file).getroot()
+            original_root = lxml.etree.fromstring(original_data)
+        except lxml.etree.XMLSyntaxError as e:
+            print(f"FAILED - Error parsing XML files: {e}")
+            return False
+
+        # Remove Claude's tracked changes from both documents
+        self._remove_claude_tracked_changes(original_root)
+        self._remove_claude_tracked_changes(modified_root)
+
+        # Extract and compare text content
+        modified_text = self._extract_text_content(modified_root)
+        original_text = self._extract_text_content(original_root)
+
+        if modified_text != original_text:
+            # Show detailed character-level differences for each paragraph
+            error_message = self._generate_detailed_diff(
+                original_text, modified_text
+            )
+            print(error_message)
+            return False
 
-            if self.verbose:
-                print("PASSED - All changes by Claude are properly tracked")
-            return True
+        if self.verbose:
+            print("PASSED - All changes by Claude are properly tracked")
+        return True
 
     def _generate_detailed_diff(self, original_text, modified_text):
         """Generate detailed word-level differences using git word diff."""
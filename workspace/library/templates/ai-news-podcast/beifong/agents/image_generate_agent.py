@@ -96,5 +96,5 @@ def image_generation_agent_run(agent: Agent, query: str) -> str:
         print(f"Error in Image Generation Agent: {e}")
         return "Error in Image Generation Agent"
     session_state["stage"] = "image"
-    SessionService.save_session(session_id, session_state)
+    SessionService.save_session(session_id, session_state, session["version"])
     return "Required banner images for the podcast are generated successfully."
\ No newline at end of file
@@ -143,6 +143,6 @@ def scrape_agent_run(
     updated_results, _, _ = crawl_urls_batch(current_state["search_results"])
     verified_results = verify_content_with_agent(agent, query, updated_results, use_agent=False)
     current_state["search_results"] = verified_results
-    SessionService.save_session(session_id, current_state)
+    SessionService.save_session(session_id, current_state, session["version"])
     has_results = "search_results" in current_state and current_state["search_results"]
     return f"Scraped {len(current_state['search_results'])} sources with full content relevant to '{query}'{' and updated the full text and published date in the search_results items' if has_results else ''}."
\ No newline at end of file
@@ -128,7 +128,7 @@ def podcast_script_agent_run(
     response_dict["sources"] = sources
     session_state["generated_script"] = response_dict
     session_state['stage'] = 'script'
-    SessionService.save_session(session_id, session_state)
+    SessionService.save_session(session_id, session_state, session["version"])
 
     if not session_state["generated_script"] and not session_state["generated_script"].get("sections"):
         return "Failed to generate podcast script."
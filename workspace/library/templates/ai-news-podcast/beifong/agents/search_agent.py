@@ -100,6 +100,6 @@ def search_agent_run(agent: Agent, query: str) -> str:
     response_dict = response.to_dict()
     current_state["stage"] = "search"
     current_state["search_results"] = response_dict["content"]["items"]
-    SessionService.save_session(session_id, current_state)
+    SessionService.save_session(session_id, current_state, session["version"])
     has_results = "search_results" in current_state and current_state["search_results"]
     return f"Found {len(response_dict['content']['items'])} sources about {query} {'and added to the search_results' if has_results else ''}"
\ No newline at end of file
@@ -3,12 +3,19 @@ from datetime import datetime
 from .connection import db_connection, execute_query
 
 
-def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
+def store_crawled_article(tracking_db_path, entry, raw_content, metadata, canonical_url=None, duplicate_of=None):
+    """
+    Insert a crawled page and return its id, or ``None`` if it could not be stored.
+
+    A ``duplicate_of`` article is linked to that canonical article and stored
+    with ``ai_status = 'duplicate'``, which keeps it out of AI analysis and
+    embedding.
+    """
     metadata_json = json.dumps(metadata)
     query = """
     INSERT INTO crawled_articles 
-    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    (entry_id, source_id, feed_id, title, url, published_date, raw_content, metadata, canonical_url, duplicate_of, ai_status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     try:
         params = (
@@ -20,11 +27,13 @@ def store_crawled_article(tracking_db_path, entry, raw_content, metadata):
             entry.get("published_date", datetime.now().isoformat()),
             raw_content,
             metadata_json,
+            canonical_url,
+            duplicate_of,
+            "duplicate" if duplicate_of else "pending",
         )
-        execute_query(tracking_db_path, query, params)
-        return True
+        return execute_query(tracking_db_path, query, params)
     except Exception:
-        return False
+        return None
 
 
 def update_entry_status(tracking_db_path, entry_id, status):
@@ -124,57 +133,79 @@ def get_article_categories(tracking_db_path, article_id):
     return [row["category_name"] for row in results]
 
 
-def update_article_status(tracking_db_path, article_id, results=None, success=False, error_message=None):
+def _normalize_categories(categories):
+    if isinstance(categories, str):
+        try:
+            categories = json.loads(categories)
+        except json.JSONDecodeError:
+            categories = [c.strip() for c in categories.split(",") if c.strip()]
+    if not isinstance(categories, list):
+        return []
+    return list(dict.fromkeys(str(c).lower().strip() for c in categories if str(c).strip()))
+
+
+def update_article_statuses(tracking_db_path, updates):
+    """
+    Record AI analysis outcomes for a batch of articles in a single transaction.
+
+    ``updates`` holds ``(article_id, results, success, error_message)`` tuples;
+    successful results replace the article's summary, content and categories,
+    failures count an attempt and mark the article ``failed`` after three.
+    """
+    if not updates:
+        return 0
+    successes = [(article_id, results) for article_id, results, success, _ in updates if success and results]
+    succeeded = {article_id for article_id, _ in successes}
+    failures = [(error_message, article_id) for article_id, _, _, error_message in updates if article_id not in succeeded]
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
-        cursor.execute(
+        cursor.executemany(
             """
         UPDATE crawled_articles
         SET ai_attempts = ai_attempts + 1
         WHERE id = ?
         """,
-            (article_id,),
+            [(article_id,) for article_id, _, _, _ in updates],
         )
-        if success and results:
-            categories = []
-            if "categories" in results:
-                if isinstance(results["categories"], str):
-                    try:
-                        categories = json.loads(results["categories"])
-                    except json.JSONDecodeError:
-                        categories = [c.strip() for c in results["categories"].split(",") if c.strip()]
-                elif isinstance(results["categories"], list):
-                    categories = results["categories"]
-            cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET summary = ?, content = ?, processed = 1, ai_status = 'success'
-            WHERE id = ?
-            """,
-                (results.get("summary", ""), results.get("content", ""), article_id),
-            )
-            conn.commit()
+        cursor.executemany(
+            """
+        UPDATE crawled_articles
+        SET summary = ?, content = ?, processed = 1, ai_status = 'success'
+        WHERE id = ?
+        """,
+            [(results.get("summary", ""), results.get("content", ""), article_id) for article_id, results in successes],
+        )
+        category_rows = []
+        replaced = []
+        for article_id, results in successes:
+            categories = _normalize_categories(results.get("categories", []))
             if categories:
-                save_article_categories(tracking_db_path, article_id, categories)
-        else:
-            cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET ai_status = 'error', ai_error = ?
-            WHERE id = ?
-            """,
-                (error_message, article_id),
-            )
-            cursor.execute(
-                """
-            UPDATE crawled_articles
-            SET ai_status = 'failed'
-            WHERE id = ? AND ai_attempts >= 3
-            """,
-                (article_id,),
-            )
-            conn.commit()
-        return cursor.rowcount
+                replaced.append((article_id,))
+                category_rows.extend((article_id, category) for category in categories)
+        cursor.executemany("DELETE FROM article_categories WHERE article_id = ?", replaced)
+        cursor.executemany("INSERT OR IGNORE INTO article_categories (article_id, category_name) VALUES (?, ?)", category_rows)
+        cursor.executemany(
+            """
+        UPDATE crawled_articles
+        SET ai_status = 'error', ai_error = ?
+        WHERE id = ?
+        """,
+            failures,
+        )
+        cursor.executemany(
+            """
+        UPDATE crawled_articles
+        SET ai_status = 'failed'
+        WHERE id = ? AND ai_attempts >= 3
+        """,
+            [(article_id,) for _, article_id in failures],
+        )
+        conn.commit()
+        return len(updates)
+
+
+def update_article_status(tracking_db_path, article_id, results=None, success=False, error_message=None):
+    return update_article_statuses(tracking_db_path, [(article_id, results, success, error_message)])
 
 
 def get_articles_by_date_range(tracking_db_path, start_date=None, end_date=None, limit=None, offset=0):
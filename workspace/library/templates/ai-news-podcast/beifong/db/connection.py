@@ -1,19 +1,15 @@
-import sqlite3
 from contextlib import contextmanager
+from .pool import get_pool
 
 
 @contextmanager
 def db_connection(db_path):
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    with get_pool(db_path).connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 def execute_query(db_path, query, params=(), fetch=False, fetch_one=False):
-    with db_connection(db_path) as conn:
+    def run(conn):
         cursor = conn.cursor()
         cursor.execute(query, params)
 
@@ -25,3 +21,5 @@ def execute_query(db_path, query, params=(), fetch=False, fetch_one=False):
         else:
             conn.commit()
             return cursor.lastrowid
+
+    return get_pool(db_path).run_with_retry(run)
@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional
+from .connection import db_connection
+
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = 64 // SIMHASH_BANDS
+NEAR_DUPLICATE_DISTANCE = 5
+
+
+def simhash_bands(value: int) -> List[int]:
+    """
+    Split a SimHash into ``SIMHASH_BANDS`` 16-bit blocks used as lookup keys.
+
+    Two hashes at most ``SIMHASH_BANDS - 1`` bits apart always share a block,
+    and most pairs within ``NEAR_DUPLICATE_DISTANCE`` do, while unrelated
+    articles typically differ in 20 or more bits.
+    """
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return [(value >> (band * SIMHASH_BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin((a ^ b) & 0xFFFFFFFFFFFFFFFF).count("1")
+
+
+def to_sqlite_int(value: int) -> int:
+    """SQLite integers are signed 64-bit; store the unsigned hash in two's complement."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def from_sqlite_int(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+def find_articles_by_canonical_urls(tracking_db_path, canonical_urls: Iterable[str]) -> Dict[str, int]:
+    """Canonical URL -> id of the canonical article already stored under it."""
+    canonical_urls = [url for url in set(canonical_urls) if url]
+    if not canonical_urls:
+        return {}
+    placeholders = ",".join(["?"] * len(canonical_urls))
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+        SELECT canonical_url, COALESCE(duplicate_of, id) AS article_id
+        FROM crawled_articles
+        WHERE canonical_url IN ({placeholders})
+        ORDER BY id
+        """,
+            canonical_urls,
+        )
+        found = {}
+        for row in cursor.fetchall():
+            found.setdefault(row["canonical_url"], row["article_id"])
+        return found
+
+
+def find_duplicate_article(tracking_db_path, content_hash: Optional[str], simhash: Optional[int], max_distance=NEAR_DUPLICATE_DISTANCE):
+    """
+    Id of a fingerprinted article with the same text, or text within ``max_distance`` SimHash bits.
+
+    Candidates are the rows sharing the exact content hash or any SimHash
+    band, each served by its own index, so the lookup never scans the table.
+    """
+    if content_hash is None and simhash is None:
+        return None
+    conditions, params = [], []
+    if content_hash is not None:
+        conditions.append("content_hash = ?")
+        params.append(content_hash)
+    if simhash is not None:
+        for band, value in enumerate(simhash_bands(simhash)):
+            conditions.append(f"band{band} = ?")
+            params.append(value)
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT article_id, content_hash, simhash FROM article_fingerprints WHERE {' OR '.join(conditions)} ORDER BY article_id",
+            params,
+        )
+        best = None
+        for row in cursor.fetchall():
+            if content_hash is not None and row["content_hash"] == content_hash:
+                return row["article_id"]
+            if simhash is None or row["simhash"] is None:
+                continue
+            distance = hamming_distance(simhash, from_sqlite_int(row["simhash"]))
+            if distance <= max_distance and (best is None or distance < best[0]):
+                best = (distance, row["article_id"])
+        return best[1] if best else None
+
+
+def store_article_fingerprint(tracking_db_path, article_id, content_hash: Optional[str], simhash: Optional[int]):
+    if content_hash is None and simhash is None:
+        return 0
+    bands = simhash_bands(simhash) if simhash is not None else [None] * SIMHASH_BANDS
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+        INSERT OR REPLACE INTO article_fingerprints (article_id, content_hash, simhash, band0, band1, band2, band3)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            (article_id, content_hash, to_sqlite_int(simhash) if simhash is not None else None, *bands),
+        )
+        conn.commit()
+        return cursor.rowcount
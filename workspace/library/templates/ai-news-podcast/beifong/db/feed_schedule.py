@@ -0,0 +1,136 @@
+import statistics
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from .connection import db_connection, execute_query
+
+DEFAULT_POLL_INTERVAL = 60 * 60
+MIN_POLL_INTERVAL = 15 * 60
+MAX_POLL_INTERVAL = 24 * 60 * 60
+MAX_FAILURE_BACKOFF = 7 * 24 * 60 * 60
+UNCHANGED_BACKOFF_FACTOR = 1.5
+CADENCE_SAMPLE_SIZE = 20
+
+
+def parse_published_date(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(str(value))
+        except (TypeError, ValueError, IndexError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def estimate_publish_interval(published_dates):
+    """Median gap in seconds between consecutive publications, or None with fewer than two datable entries."""
+    dates = sorted(d for d in (parse_published_date(value) for value in published_dates) if d is not None)
+    gaps = [(later - earlier).total_seconds() for earlier, later in zip(dates, dates[1:])]
+    gaps = [gap for gap in gaps if gap > 0]
+    if not gaps:
+        return None
+    return statistics.median(gaps)
+
+
+def compute_poll_interval(publish_interval, consecutive_unchanged=0, consecutive_failures=0):
+    if consecutive_failures:
+        return min(MAX_FAILURE_BACKOFF, DEFAULT_POLL_INTERVAL * (2**consecutive_failures))
+    # poll twice per expected publication so a new item waits at most half a cadence
+    interval = publish_interval / 2 if publish_interval else DEFAULT_POLL_INTERVAL
+    interval *= UNCHANGED_BACKOFF_FACTOR ** min(consecutive_unchanged, 10)
+    return int(max(MIN_POLL_INTERVAL, min(MAX_POLL_INTERVAL, interval)))
+
+
+def get_feed_schedules(tracking_db_path):
+    query = """
+    SELECT feed_id, next_due_at, poll_interval, consecutive_unchanged, consecutive_failures
+    FROM feed_tracking
+    """
+    return {row["feed_id"]: row for row in execute_query(tracking_db_path, query, fetch=True)}
+
+
+def feed_priority(schedule, now):
+    """How many poll intervals a feed is overdue; feeds never scheduled come first."""
+    if not schedule or not schedule.get("next_due_at"):
+        return float("inf")
+    next_due_at = datetime.fromisoformat(schedule["next_due_at"])
+    interval = schedule.get("poll_interval") or DEFAULT_POLL_INTERVAL
+    return 1 + (now - next_due_at).total_seconds() / interval
+
+
+def filter_due_feeds(feeds, schedules, now=None):
+    now = now or datetime.now()
+    due = []
+    for feed in feeds:
+        schedule = schedules.get(feed["id"])
+        if schedule and schedule.get("next_due_at") and datetime.fromisoformat(schedule["next_due_at"]) > now:
+            continue
+        due.append((feed_priority(schedule, now), feed))
+    due.sort(key=lambda item: item[0], reverse=True)
+    return [feed for _, feed in due]
+
+
+def _recent_publish_dates(cursor, feed_id):
+    cursor.execute(
+        """
+    SELECT published_date FROM feed_entries
+    WHERE feed_id = ?
+    ORDER BY id DESC
+    LIMIT ?
+    """,
+        (feed_id, CADENCE_SAMPLE_SIZE),
+    )
+    return [row["published_date"] for row in cursor.fetchall()]
+
+
+def record_feed_poll_results(tracking_db_path, results):
+    """
+    Update each feed's schedule after a poll.
+
+    ``results`` is a list of ``(feed_id, outcome)`` pairs where outcome is
+    ``"changed"``, ``"unchanged"`` or ``"failed"``.
+    """
+    if not results:
+        return 0
+    now = datetime.now()
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        placeholders = ",".join(["?"] * len(results))
+        cursor.execute(
+            f"""
+        SELECT feed_id, consecutive_unchanged, consecutive_failures
+        FROM feed_tracking WHERE feed_id IN ({placeholders})
+        """,
+            [feed_id for feed_id, _ in results],
+        )
+        current = {row["feed_id"]: row for row in cursor.fetchall()}
+        updates = []
+        for feed_id, outcome in results:
+            row = current.get(feed_id)
+            unchanged = (row["consecutive_unchanged"] or 0) if row else 0
+            failures = (row["consecutive_failures"] or 0) if row else 0
+            if outcome == "failed":
+                failures += 1
+            elif outcome == "unchanged":
+                unchanged, failures = unchanged + 1, 0
+            else:
+                unchanged, failures = 0, 0
+            publish_interval = estimate_publish_interval(_recent_publish_dates(cursor, feed_id))
+            interval = compute_poll_interval(publish_interval, unchanged, failures)
+            next_due_at = (now + timedelta(seconds=interval)).isoformat()
+            updates.append((next_due_at, interval, unchanged, failures, outcome, feed_id))
+        cursor.executemany(
+            """
+        UPDATE feed_tracking
+        SET next_due_at = ?, poll_interval = ?, consecutive_unchanged = ?,
+            consecutive_failures = ?, last_status = ?
+        WHERE feed_id = ?
+        """,
+            updates,
+        )
+        conn.commit()
+        return cursor.rowcount
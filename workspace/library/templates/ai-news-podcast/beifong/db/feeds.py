@@ -1,9 +1,22 @@
 from datetime import datetime
 import sqlite3
 from .connection import db_connection, execute_query
+from .feed_schedule import filter_due_feeds, get_feed_schedules
 
 
-def get_active_feeds(sources_db_path, limit=None, offset=0):
+def get_active_feeds(sources_db_path, limit=None, offset=0, tracking_db_path=None):
+    """
+    Active feeds joined with their source name.
+
+    When ``tracking_db_path`` is given only feeds whose ``next_due_at`` has
+    passed (or that were never scheduled) are returned, most overdue first.
+    """
+    if tracking_db_path is not None:
+        feeds = get_active_feeds(sources_db_path)
+        due_feeds = filter_due_feeds(feeds, get_feed_schedules(tracking_db_path))
+        if limit:
+            return due_feeds[offset : offset + limit]
+        return due_feeds
     if limit:
         query = """
         SELECT sf.id, sf.source_id, sf.feed_url, sf.feed_type, sf.last_crawled, 
@@ -81,18 +94,78 @@ def store_feed_entries(tracking_db_path, feed_id, source_id, entries):
     return count
 
 
-def update_tracking_info(tracking_db_path, feeds):
+def get_feed_tracking_infos(tracking_db_path, feed_ids):
+    if not feed_ids:
+        return {}
+    placeholders = ",".join(["?"] * len(feed_ids))
+    query = f"SELECT * FROM feed_tracking WHERE feed_id IN ({placeholders})"
+    rows = execute_query(tracking_db_path, query, tuple(feed_ids), fetch=True)
+    return {row["feed_id"]: row for row in rows}
+
+
+def update_feed_tracking_batch(tracking_db_path, updates):
+    if not updates:
+        return 0
+    now = datetime.now().isoformat()
     with db_connection(tracking_db_path) as conn:
         cursor = conn.cursor()
-        for feed in feeds:
-            cursor.execute(
+        cursor.executemany(
+            """
+        UPDATE feed_tracking 
+        SET last_processed = ?, last_etag = ?, last_modified = ?, entry_hash = ?
+        WHERE feed_id = ?
+        """,
+            [(now, update["etag"], update["modified"], update["entry_hash"], update["feed_id"]) for update in updates],
+        )
+        conn.commit()
+        return cursor.rowcount
+
+
+def store_feed_entries_batch(tracking_db_path, feed_batches):
+    """Insert entries for many feeds in one transaction; returns new-entry counts keyed by feed_id."""
+    counts = {}
+    if not feed_batches:
+        return counts
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        for feed_id, source_id, entries in feed_batches:
+            before = conn.total_changes
+            cursor.executemany(
                 """
-            INSERT OR IGNORE INTO feed_tracking 
-            (feed_id, source_id, feed_url, last_processed)
-            VALUES (?, ?, ?, NULL)
+            INSERT OR IGNORE INTO feed_entries 
+            (feed_id, source_id, entry_id, title, link, published_date, content, summary)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             """,
-                (feed["id"], feed["source_id"], feed["feed_url"]),
+                [
+                    (
+                        feed_id,
+                        source_id,
+                        entry.get("entry_id", ""),
+                        entry.get("title", ""),
+                        entry.get("link", ""),
+                        entry.get("published_date", datetime.now().isoformat()),
+                        entry.get("content", ""),
+                        entry.get("summary", ""),
+                    )
+                    for entry in entries
+                ],
             )
+            counts[feed_id] = conn.total_changes - before
+        conn.commit()
+    return counts
+
+
+def update_tracking_info(tracking_db_path, feeds):
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+        INSERT OR IGNORE INTO feed_tracking 
+        (feed_id, source_id, feed_url, last_processed)
+        VALUES (?, ?, ?, NULL)
+        """,
+            [(feed["id"], feed["source_id"], feed["feed_url"]) for feed in feeds],
+        )
         conn.commit()
 
 
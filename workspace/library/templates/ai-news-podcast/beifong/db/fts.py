@@ -0,0 +1,185 @@
+import re
+import sqlite3
+from .connection import execute_query
+
+ARTICLES_FTS = "articles_fts"
+POSTS_FTS = "posts_fts"
+# bm25 column weights: a hit in the title counts more than one deep in the body
+ARTICLES_RANK = f"bm25({ARTICLES_FTS}, 10.0, 4.0, 1.0)"
+POSTS_RANK = f"bm25({POSTS_FTS}, 4.0, 1.0, 1.0)"
+
+ARTICLES_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {ARTICLES_FTS} USING fts5(
+        title, summary, content,
+        content='crawled_articles', content_rowid='id',
+        tokenize='porter unicode61', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_insert AFTER INSERT ON crawled_articles BEGIN
+        INSERT INTO {ARTICLES_FTS}(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_delete AFTER DELETE ON crawled_articles BEGIN
+        INSERT INTO {ARTICLES_FTS}({ARTICLES_FTS}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS crawled_articles_fts_update AFTER UPDATE OF title, summary, content ON crawled_articles BEGIN
+        INSERT INTO {ARTICLES_FTS}({ARTICLES_FTS}, rowid, title, summary, content)
+        VALUES ('delete', old.id, old.title, old.summary, old.content);
+        INSERT INTO {ARTICLES_FTS}(rowid, title, summary, content) VALUES (new.id, new.title, new.summary, new.content);
+    END
+    """,
+]
+
+POSTS_FTS_SCHEMA = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {POSTS_FTS} USING fts5(
+        post_text, user_display_name, user_handle,
+        content='posts', content_rowid='id',
+        tokenize='unicode61', prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+        INSERT INTO {POSTS_FTS}(rowid, post_text, user_display_name, user_handle)
+        VALUES (new.id, new.post_text, new.user_display_name, new.user_handle);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+        INSERT INTO {POSTS_FTS}({POSTS_FTS}, rowid, post_text, user_display_name, user_handle)
+        VALUES ('delete', old.id, old.post_text, old.user_display_name, old.user_handle);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF post_text, user_display_name, user_handle ON posts BEGIN
+        INSERT INTO {POSTS_FTS}({POSTS_FTS}, rowid, post_text, user_display_name, user_handle)
+        VALUES ('delete', old.id, old.post_text, old.user_display_name, old.user_handle);
+        INSERT INTO {POSTS_FTS}(rowid, post_text, user_display_name, user_handle)
+        VALUES (new.id, new.post_text, new.user_display_name, new.user_handle);
+    END
+    """,
+]
+
+POSTS_FTS_TRIGGERS = ("posts_fts_insert", "posts_fts_delete", "posts_fts_update")
+_POST_ID_KEY_RE = re.compile(r"\bpost_id\s+TEXT\s+PRIMARY\s+KEY\b", re.I)
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_available = set()
+
+
+def _ensure_fts(cursor, table, schema):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,))
+    existed = cursor.fetchone() is not None
+    try:
+        for statement in schema:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        print(f"Full-text search disabled for {table}: {str(e)}")
+        return False
+    if not existed:
+        # backfill rows written before the index (and its triggers) existed
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+    return True
+
+
+def ensure_articles_fts(cursor):
+    """Create the crawled_articles FTS5 index and its sync triggers, backfilling existing rows on first run."""
+    return _ensure_fts(cursor, ARTICLES_FTS, ARTICLES_FTS_SCHEMA)
+
+
+def _drop_posts_fts(cursor):
+    for trigger in POSTS_FTS_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute(f"DROP TABLE IF EXISTS {POSTS_FTS}")
+
+
+def _migrate_posts_key(cursor):
+    """
+    Rebuild a ``posts`` table keyed only by ``post_id TEXT`` so it gains an ``id INTEGER PRIMARY KEY``.
+
+    The implicit rowid of such a table can be renumbered by VACUUM, which would
+    leave the external-content index pointing at other posts. Returns whether
+    ``posts`` now has the key.
+    """
+    cursor.execute("PRAGMA table_info(posts)")
+    columns = cursor.fetchall()
+    if any(column[1] == "id" and column[5] for column in columns):
+        return True
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='posts'")
+    table_sql = cursor.fetchone()[0]
+    keyed_sql = _POST_ID_KEY_RE.sub("id INTEGER PRIMARY KEY, post_id TEXT NOT NULL UNIQUE", table_sql, count=1)
+    if keyed_sql == table_sql:
+        return False
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='index' AND tbl_name='posts' AND sql IS NOT NULL")
+    index_statements = [row[0] for row in cursor.fetchall()]
+    names = ", ".join(column[1] for column in columns)
+    _drop_posts_fts(cursor)
+    cursor.execute("ALTER TABLE posts RENAME TO posts_unkeyed")
+    cursor.execute(keyed_sql)
+    cursor.execute(f"INSERT INTO posts ({names}) SELECT {names} FROM posts_unkeyed ORDER BY rowid")
+    cursor.execute("DROP TABLE posts_unkeyed")
+    for statement in index_statements:
+        cursor.execute(statement)
+    print("Added an INTEGER PRIMARY KEY to posts for full-text search")
+    return True
+
+
+def ensure_posts_fts(cursor):
+    """
+    Create the posts FTS5 index and its sync triggers, backfilling existing rows on first run.
+
+    The index is keyed on ``posts.id``; tables from before that column existed
+    are migrated first and an index built on their implicit rowid is rebuilt.
+    """
+    if not _migrate_posts_key(cursor):
+        print(f"Full-text search disabled for {POSTS_FTS}: posts has no INTEGER PRIMARY KEY")
+        return False
+    cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (POSTS_FTS,))
+    existing = cursor.fetchone()
+    if existing and "content_rowid='id'" not in existing[0]:
+        _drop_posts_fts(cursor)
+    return _ensure_fts(cursor, POSTS_FTS, POSTS_FTS_SCHEMA)
+
+
+def has_fts(db_path, table):
+    """Whether ``table`` exists in ``db_path``; positive answers are cached for the process lifetime."""
+    key = (db_path, table)
+    if key in _available:
+        return True
+    try:
+        found = execute_query(db_path, "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,), fetch=True, fetch_one=True)
+    except sqlite3.Error:
+        return False
+    if found:
+        _available.add(key)
+    return bool(found)
+
+
+def build_match_query(terms, operator="OR", prefix=True):
+    """
+    Turn free-text terms into a safe FTS5 MATCH expression.
+
+    Each term becomes a quoted phrase of its word tokens (so user input can
+    never inject FTS syntax), with a prefix wildcard on the final token when
+    ``prefix`` is set. Phrases are joined with ``operator``. Returns ``None``
+    when no term contains a searchable token.
+    """
+    if isinstance(terms, str):
+        terms = [terms]
+    operator = "AND" if str(operator).upper() == "AND" else "OR"
+    phrases = []
+    for term in terms:
+        tokens = _TOKEN_RE.findall(str(term))
+        if not tokens:
+            continue
+        phrase = '"' + " ".join(tokens) + '"'
+        phrases.append(f"{phrase}*" if prefix else phrase)
+    if not phrases:
+        return None
+    return f" {operator} ".join(phrases)
@@ -0,0 +1,115 @@
+import time
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+from .config import get_sources_db_path, get_tracking_db_path
+from .connection import db_connection
+
+IN_BATCH_SIZE = 500
+SOURCE_NAMES_TTL = 300
+CATEGORY_SEPARATOR = "\x1f"
+UNKNOWN_SOURCE = "Unknown Source"
+
+
+def get_categories_for_articles(tracking_db_path, article_ids: Iterable[int]) -> Dict[int, List[str]]:
+    """Categories for a page of articles: one grouped query per ``IN_BATCH_SIZE`` ids instead of one per article."""
+    ids = list(dict.fromkeys(article_id for article_id in article_ids if article_id is not None))
+    categories = {article_id: [] for article_id in ids}
+    if not ids:
+        return categories
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(ids), IN_BATCH_SIZE):
+            chunk = ids[start : start + IN_BATCH_SIZE]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(
+                f"""
+                SELECT article_id, group_concat(category_name, ?) AS names
+                FROM article_categories
+                WHERE article_id IN ({placeholders})
+                GROUP BY article_id
+                """,
+                [CATEGORY_SEPARATOR, *chunk],
+            )
+            for row in cursor.fetchall():
+                categories[row["article_id"]] = row["names"].split(CATEGORY_SEPARATOR) if row["names"] else []
+    return categories
+
+
+class SourceNameCache:
+    """
+    Process-wide, TTL-bounded copy of the ``sources``/``source_feeds`` name mapping.
+
+    The mapping is small and changes only when sources are edited, so each
+    process reloads it at most once per ``ttl`` seconds (two queries) and
+    writers call ``invalidate`` after changing it.
+    """
+
+    def __init__(self, ttl: float = SOURCE_NAMES_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+
+    def _load(self, sources_db_path):
+        with db_connection(sources_db_path) as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, name FROM sources")
+            by_source = {row["id"]: row["name"] for row in cursor.fetchall()}
+            cursor.execute("SELECT id, source_id FROM source_feeds")
+            by_feed = {row["id"]: by_source.get(row["source_id"]) for row in cursor.fetchall()}
+        return by_source, by_feed
+
+    def get(self, sources_db_path: Optional[str] = None):
+        """``(names_by_source_id, names_by_feed_id)``, reloaded when older than ``ttl``; empty maps if unreadable."""
+        sources_db_path = sources_db_path or get_sources_db_path()
+        entry = self._entries.get(sources_db_path)
+        if entry is not None and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        with self._lock:
+            entry = self._entries.get(sources_db_path)
+            if entry is None or time.monotonic() - entry[0] >= self.ttl:
+                try:
+                    entry = (time.monotonic(), self._load(sources_db_path))
+                except Exception as e:
+                    print(f"Error loading source names: {str(e)}")
+                    return {}, {}
+                self._entries[sources_db_path] = entry
+        return entry[1]
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+source_names = SourceNameCache()
+
+
+def resolve_source_name(article: Dict[str, Any], by_source, by_feed, default=UNKNOWN_SOURCE):
+    feed_id = article.get("feed_id")
+    source_id = article.get("source_id")
+    if feed_id is not None and by_feed.get(feed_id):
+        return by_feed[feed_id]
+    if source_id is not None and by_source.get(source_id):
+        return by_source[source_id]
+    return default
+
+
+def hydrate_articles(
+    articles: List[Dict[str, Any]],
+    tracking_db_path: Optional[str] = None,
+    sources_db_path: Optional[str] = None,
+    categories: bool = True,
+    sources: bool = True,
+    default_source=UNKNOWN_SOURCE,
+) -> List[Dict[str, Any]]:
+    """Attach ``categories`` and ``source_name`` to a page of article dicts in place, in O(1) queries."""
+    if not articles:
+        return articles
+    if categories:
+        by_article = get_categories_for_articles(tracking_db_path or get_tracking_db_path(), [article.get("id") for article in articles])
+        for article in articles:
+            article["categories"] = by_article.get(article.get("id"), [])
+    if sources:
+        by_source, by_feed = source_names.get(sources_db_path)
+        for article in articles:
+            article["source_name"] = resolve_source_name(article, by_source, by_feed, default_source)
+    return articles
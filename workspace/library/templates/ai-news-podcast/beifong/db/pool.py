@@ -0,0 +1,187 @@
+import os
+import time
+import random
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+MAX_IDLE_CONNECTIONS = int(os.environ.get("SQLITE_POOL_MAX_IDLE", 8))
+CACHED_STATEMENTS = int(os.environ.get("SQLITE_CACHED_STATEMENTS", 256))
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+BUSY_RETRIES = int(os.environ.get("SQLITE_BUSY_RETRIES", 5))
+BUSY_RETRY_BASE_DELAY = 0.05
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA temp_store=MEMORY",
+    f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}",
+)
+
+
+def is_busy_error(error):
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class ConnectionPool:
+    """Pool of reusable, WAL-tuned sqlite3 connections for a single database file.
+
+    A connection is checked out exclusively for the duration of a ``with``
+    block, so nested blocks get distinct connections exactly like the old
+    connect-per-call helpers did. Released connections are rolled back if a
+    transaction was left open and parked on a LIFO idle list, which keeps the
+    most recently used (and therefore warmest) connection in play.
+    """
+
+    def __init__(self, db_path, max_idle=MAX_IDLE_CONNECTIONS):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._stats = {
+            "opened": 0,
+            "reused": 0,
+            "closed": 0,
+            "checked_out": 0,
+            "busy_retries": 0,
+            "busy_failures": 0,
+        }
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+        )
+        conn.row_factory = sqlite3.Row
+        for pragma in PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.DatabaseError:
+                pass
+        return conn
+
+    def _reset_after_fork(self):
+        # connections must never cross a fork (celery prefork, multiprocessing)
+        self._idle = []
+        self._pid = os.getpid()
+
+    def acquire(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._reset_after_fork()
+            conn = self._idle.pop() if self._idle else None
+            self._stats["checked_out"] += 1
+            if conn is not None:
+                self._stats["reused"] += 1
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._lock:
+                    self._stats["checked_out"] -= 1
+                raise
+            with self._lock:
+                self._stats["opened"] += 1
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn, discard=False):
+        try:
+            if not discard and conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            discard = True
+        with self._lock:
+            self._stats["checked_out"] -= 1
+            if not discard and self._pid == os.getpid() and len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+            self._stats["closed"] += 1
+        conn.close()
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            discard = not is_busy_error(e) and not isinstance(e, sqlite3.IntegrityError)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def run_with_retry(self, func, retries=BUSY_RETRIES):
+        """Run ``func(conn)`` on a pooled connection, retrying when the database is busy."""
+        attempt = 0
+        while True:
+            try:
+                with self.connection() as conn:
+                    return func(conn)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt >= retries:
+                    if is_busy_error(e):
+                        with self._lock:
+                            self._stats["busy_failures"] += 1
+                    raise
+                with self._lock:
+                    self._stats["busy_retries"] += 1
+                time.sleep(BUSY_RETRY_BASE_DELAY * (2**attempt) * (1 + random.random()))
+                attempt += 1
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._stats["closed"] += len(idle)
+        for conn in idle:
+            conn.close()
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle"] = len(self._idle)
+        stats["db_path"] = self.db_path
+        return stats
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[key] = pool
+    return pool
+
+
+@contextmanager
+def pooled_connection(db_path):
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+
+def get_pool_metrics():
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.metrics() for pool in pools]
+
+
+def close_all_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_all()
@@ -55,14 +55,14 @@ def get_task(tasks_db_path, task_id):
 def get_all_tasks(tasks_db_path, include_disabled=False):
     if include_disabled:
         query = """
-        SELECT id, name, description, command, frequency, frequency_unit, enabled, last_run, created_at
+        SELECT id, name, task_type, description, command, frequency, frequency_unit, enabled, last_run, created_at
         FROM tasks
         ORDER BY name
         """
         return execute_query(tasks_db_path, query, fetch=True)
     else:
         query = """
-        SELECT id, name, description, command, frequency, frequency_unit, enabled, last_run, created_at
+        SELECT id, name, task_type, description, command, frequency, frequency_unit, enabled, last_run, created_at
         FROM tasks
         WHERE enabled = 1
         ORDER BY name
@@ -149,6 +149,26 @@ def update_task_execution(tasks_db_path, execution_id, status, error_message=Non
     return execute_query(tasks_db_path, query, params)
 
 
+def append_task_execution_output(tasks_db_path, execution_id, text):
+    query = """
+    UPDATE task_executions
+    SET output = COALESCE(output, '') || ?
+    WHERE id = ?
+    """
+    return execute_query(tasks_db_path, query, (text, execution_id))
+
+
+def finish_task_execution(tasks_db_path, execution_id, status, error_message=None):
+    """Like ``update_task_execution`` but keeps the output already streamed into the row."""
+    end_time = datetime.now().isoformat()
+    query = """
+    UPDATE task_executions
+    SET end_time = ?, status = ?, error_message = ?
+    WHERE id = ?
+    """
+    return execute_query(tasks_db_path, query, (end_time, status, error_message, execution_id))
+
+
 def get_recent_task_executions(tasks_db_path, task_id=None, limit=10):
     if task_id:
         query = """
@@ -228,7 +248,7 @@ def get_execution_stats(tasks_db_path, days=7):
 
 def get_pending_tasks(tasks_db_path):
     query = """
-    SELECT id, name, description, command, frequency, frequency_unit, enabled, last_run
+    SELECT id, name, task_type, description, command, frequency, frequency_unit, enabled, last_run
     FROM tasks
     WHERE enabled = 1
     AND (
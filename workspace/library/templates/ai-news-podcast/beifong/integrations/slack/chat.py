@@ -1,6 +1,5 @@
 import os
 import re
-import sqlite3
 import asyncio
 import aiohttp
 import json
@@ -11,6 +10,7 @@ from dotenv import load_dotenv
 from typing import Dict, List
 from datetime import datetime
 from db.config import get_slack_sessions_db_path
+from db.connection import db_connection
 
 load_dotenv()
 
@@ -18,6 +18,8 @@ app = App(token=os.environ["SLACK_BOT_TOKEN"])
 # local url works but banner images won't work in slack unless it's https with proper domain
 # you can use ngrok to port forward local url to https and replace this local url with ngrok url
 API_BASE_URL = os.environ.get("API_BASE_URL", "http://localhost:7000")
+EVENT_STREAM_TIMEOUT_SEC = 600
+PROGRESS_NOTICE_SEC = 30
 executor = ThreadPoolExecutor(max_workers=10)
 active_sessions: Dict[str, Dict] = {}
 DB_PATH = get_slack_sessions_db_path()
@@ -29,73 +31,62 @@ def send_error_message(thread_key: str, error_message: str):
 
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS thread_sessions (
-            thread_key TEXT PRIMARY KEY,
-            session_id TEXT NOT NULL,
-            channel_id TEXT NOT NULL,
-            user_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS session_state (
-            session_id TEXT PRIMARY KEY,
-            state_data TEXT,
-            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS thread_sessions (
+                thread_key TEXT PRIMARY KEY,
+                session_id TEXT NOT NULL,
+                channel_id TEXT NOT NULL,
+                user_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS session_state (
+                session_id TEXT PRIMARY KEY,
+                state_data TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        conn.commit()
 
 
 def save_session_mapping(thread_key: str, session_id: str, channel_id: str, user_id: str = None):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "INSERT OR REPLACE INTO thread_sessions (thread_key, session_id, channel_id, user_id, updated_at) VALUES (?, ?, ?, ?, ?)",
-        (thread_key, session_id, channel_id, user_id, datetime.now().isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO thread_sessions (thread_key, session_id, channel_id, user_id, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (thread_key, session_id, channel_id, user_id, datetime.now().isoformat()),
+        )
+        conn.commit()
 
 
 def get_session_info(thread_key: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT session_id, channel_id, user_id FROM thread_sessions WHERE thread_key = ?",
-        (thread_key,),
-    )
-    result = cursor.fetchone()
-    conn.close()
-    return result if result else None
+    with db_connection(DB_PATH) as conn:
+        result = conn.execute(
+            "SELECT session_id, channel_id, user_id FROM thread_sessions WHERE thread_key = ?",
+            (thread_key,),
+        ).fetchone()
+    return tuple(result) if result else None
 
 
 def save_session_state(session_id: str, state_data):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     if isinstance(state_data, str):
         json_data = state_data
     else:
         json_data = json.dumps(state_data)
-    cursor.execute(
-        "INSERT OR REPLACE INTO session_state (session_id, state_data, updated_at) VALUES (?, ?, ?)",
-        (session_id, json_data, datetime.now().isoformat()),
-    )
-    conn.commit()
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO session_state (session_id, state_data, updated_at) VALUES (?, ?, ?)",
+            (session_id, json_data, datetime.now().isoformat()),
+        )
+        conn.commit()
 
 
 def get_session_state(session_id: str):
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("SELECT state_data FROM session_state WHERE session_id = ?", (session_id,))
-    result = cursor.fetchone()
-    conn.close()
+    with db_connection(DB_PATH) as conn:
+        result = conn.execute("SELECT state_data FROM session_state WHERE session_id = ?", (session_id,)).fetchone()
     if result:
         try:
             return json.loads(result[0])
@@ -144,6 +135,20 @@ class PodcastAgentClient:
             print(f"API check_status error: {e}")
             raise
 
+    async def events(self, session_id: str, task_id=None):
+        """Events from the API's server-sent event stream for the session's task; keepalives come through as ``{"type": "keepalive"}``."""
+        params = {"task_id": task_id} if task_id else {}
+        timeout = aiohttp.ClientTimeout(total=EVENT_STREAM_TIMEOUT_SEC, sock_read=60)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(f"{self.base_url}/api/podcast-agent/events/{session_id}", params=params) as resp:
+                resp.raise_for_status()
+                async for raw_line in resp.content:
+                    line = raw_line.decode("utf-8").strip()
+                    if line.startswith("data:"):
+                        yield json.loads(line[len("data:") :])
+                    elif line.startswith(":"):
+                        yield {"type": "keepalive"}
+
 
 api_client = PodcastAgentClient(API_BASE_URL)
 
@@ -218,10 +223,45 @@ async def poll_for_completion(session_id: str, thread_key: str, task_id=None):
             del active_sessions[session_id]
 
 
+async def wait_for_completion(session_id: str, thread_key: str, task_id=None):
+    """Follow the task through the API's event stream; falls back to polling ``/status`` if the stream is unavailable."""
+    print(f"Subscribing to events for session: {session_id}, task: {task_id}")
+    active_sessions[session_id] = {
+        "thread_key": thread_key,
+        "task_id": task_id,
+        "start_time": datetime.now(),
+    }
+    start_time = last_notice = datetime.now()
+    result = None
+    try:
+        async for event in api_client.events(session_id, task_id):
+            if event["type"] == "result":
+                result = event.get("result") or {}
+                break
+            if event.get("session_state"):
+                save_session_state(session_id, event.get("session_state"))
+            if (datetime.now() - last_notice).total_seconds() >= PROGRESS_NOTICE_SEC:
+                last_notice = datetime.now()
+                elapsed = int((last_notice - start_time).total_seconds())
+                await send_slack_message(thread_key, f"🔄 Still processing request... ({elapsed}s elapsed)")
+    except Exception as e:
+        print(f"Event stream error for session {session_id}: {e}")
+    if result is None:
+        print(f"No result event for session {session_id}, falling back to polling")
+        await poll_for_completion(session_id, thread_key, task_id)
+        return
+    try:
+        if result.get("session_state"):
+            save_session_state(session_id, result.get("session_state"))
+        await send_completion_message(thread_key, result)
+    finally:
+        active_sessions.pop(session_id, None)
+
+
 def start_background_polling(session_id: str, thread_key: str, task_id=None):
     if session_id in active_sessions:
         print(f"Replacing existing poll for session: {session_id}")
-    future = run_async_in_thread(poll_for_completion(session_id, thread_key, task_id))
+    future = run_async_in_thread(wait_for_completion(session_id, thread_key, task_id))
     active_sessions[session_id] = {
         "thread_key": thread_key,
         "task_id": task_id,
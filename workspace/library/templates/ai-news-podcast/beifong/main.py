@@ -4,10 +4,13 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, StreamingResponse
 import uvicorn
 import os
+import asyncio
 import aiofiles
 from contextlib import asynccontextmanager
 from routers import article_router, podcast_router, source_router, task_router, podcast_config_router, async_podcast_agent_router, social_media_router
 from services.db_init import init_databases
+from db.pool import get_pool_metrics, close_all_pools
+from utils.audio_mixer import is_rendering, media_type
 from dotenv import load_dotenv
 
 
@@ -17,6 +20,8 @@ CLIENT_BUILD_PATH = os.environ.get(
     "CLIENT_BUILD_PATH",
     "../web/build",
 )
+RENDER_POLL_INTERVAL = 0.25
+RENDER_STALL_TIMEOUT = 120
 
 
 @asynccontextmanager
@@ -33,9 +38,43 @@ async def lifespan(app: FastAPI):
     print("Application startup complete!")
     yield
     print("Shutting down application...")
+    close_all_pools()
     print("Shutdown complete")
 
 
+class CancelOnDisconnectMiddleware:
+    """Cancel in-flight GET handlers (and the DB reads they await) when the client goes away."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        messages = asyncio.Queue()
+        disconnected = asyncio.Event()
+
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await messages.put(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    handler.cancel()
+                    return
+
+        handler = asyncio.ensure_future(self.app(scope, messages.get, send))
+        watcher = asyncio.ensure_future(watch_disconnect())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+        finally:
+            watcher.cancel()
+
+
 app = FastAPI(title="Beifong API", description="Beifong API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
@@ -45,6 +84,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CancelOnDisconnectMiddleware)
 
 
 app.include_router(article_router.router, prefix="/api/articles", tags=["articles"])
@@ -56,11 +96,41 @@ app.include_router(async_podcast_agent_router.router, prefix="/api/podcast-agent
 app.include_router(social_media_router.router, prefix="/api/social-media", tags=["social-media"])
 
 
+@app.get("/api/db-pool/metrics")
+async def db_pool_metrics():
+    return {"pools": get_pool_metrics()}
+
+
+async def follow_rendering(audio_path: str, chunk_size: int = 64 * 1024):
+    """Tail a podcast that is still being encoded, ending once the mixer closes it (or stops making progress)."""
+    async with aiofiles.open(audio_path, "rb") as f:
+        idle = 0.0
+        while True:
+            chunk = await f.read(chunk_size)
+            if chunk:
+                idle = 0.0
+                yield chunk
+                continue
+            if not is_rendering(audio_path):
+                # the mixer may have written a last block between our read and its close
+                chunk = await f.read()
+                if chunk:
+                    yield chunk
+                return
+            if idle >= RENDER_STALL_TIMEOUT:
+                return
+            await asyncio.sleep(RENDER_POLL_INTERVAL)
+            idle += RENDER_POLL_INTERVAL
+
+
 @app.get("/stream-audio/{filename}")
 async def stream_audio(filename: str, request: Request):
     audio_path = os.path.join("podcasts/audio", filename)
     if not os.path.exists(audio_path):
         return Response(status_code=404, content="Audio file not found")
+    if is_rendering(audio_path):
+        headers = {"Content-Disposition": f"inline; filename={filename}", "Cache-Control": "no-store"}
+        return StreamingResponse(follow_rendering(audio_path), media_type=media_type(audio_path), headers=headers)
     file_size = os.path.getsize(audio_path)
     range_header = request.headers.get("Range", "").strip()
     start = 0
@@ -79,7 +149,7 @@ async def stream_audio(filename: str, request: Request):
         "Content-Range": f"bytes {start}-{end}/{file_size}",
         "Content-Length": str(content_length),
         "Content-Disposition": f"inline; filename={filename}",
-        "Content-Type": "audio/wav",
+        "Content-Type": media_type(audio_path),
     }
 
     async def file_streamer():
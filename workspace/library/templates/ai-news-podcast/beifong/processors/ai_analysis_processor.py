@@ -1,107 +1,195 @@
 import json
 import time
 import random
+import asyncio
 import argparse
-from bs4 import BeautifulSoup
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI
 from db.config import get_tracking_db_path
-from db.articles import get_unprocessed_articles, update_article_status
+from db.articles import get_unprocessed_articles, update_article_statuses
+from utils.crawl_url import extract_clean_text, truncate_to_tokens
 from utils.load_api_keys import load_api_key
 
 WEB_PAGE_ANALYSE_MODEL = "gpt-4o"
 MODEL_INSTRUCTION = "You are a helpful assistant that analyzes articles and extracts structured information."
+MAX_PROMPT_TOKENS = 6000
+MAX_OUTPUT_TOKENS = 400
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 5
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
 
 
-def extract_clean_text(raw_html, max_tokens=8000):
-    soup = BeautifulSoup(raw_html, "html.parser")
-    for element in soup(["script", "style", "nav", "header", "footer", "aside"]):
-        element.decompose()
-    text = soup.get_text(separator="\n", strip=True)
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    text = "\n".join(lines)
-    approx_tokens = len(text) / 4
-    if approx_tokens > max_tokens:
-        text = text[: max_tokens * 4]
-    return text
-
-
-def process_article_with_ai(client, article, max_tokens=8000):
-    clean_text = extract_clean_text(article["raw_content"], max_tokens)
+def build_messages(article, clean_text):
     metadata = article.get("metadata", {})
-    title = article["title"]
-    url = article["url"]
     description = ""
     if metadata and isinstance(metadata, dict):
         if "description" in metadata:
             description = metadata["description"]
         elif "og" in metadata and "description" in metadata["og"]:
             description = metadata["og"]["description"]
+    return [
+        {
+            "role": "system",
+            "content": MODEL_INSTRUCTION,
+        },
+        {
+            "role": "user",
+            "content": f"""
+                        Analyze this article and provide a structured output with two components:
+
+                        1. A list of 3-5 relevant categories for this article
+                        2. A concise 2-3 sentence summary of the article
+
+                        Article Title: {article["title"]}
+                        Article URL: {article["url"]}
+                        Description: {description}
+
+                        Article Text:
+                        {clean_text}
+
+                        Provide your response as a JSON object with these keys:
+                        - categories: an array of 3-5 relevant categories (as strings)
+                        - summary: a 2-3 sentence summary of the article
+                        """,
+        },
+    ]
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit for chat requests that backs off when the API pushes back.
+
+    A rate-limit response halves the number of requests allowed in flight and
+    pauses every new request until the ``retry-after`` window has passed; each
+    run of successes as long as the current limit lets one more request back
+    in, up to ``max_concurrency``.
+    """
+
+    def __init__(self, max_concurrency=MAX_CONCURRENT_REQUESTS):
+        self.max_concurrency = max_concurrency
+        self.limit = max_concurrency
+        self.active = 0
+        self.resume_at = 0.0
+        self.throttled = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+        pause = self.resume_at - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    async def release(self, throttled=False, delay=0.0):
+        async with self._condition:
+            self.active -= 1
+            if throttled:
+                self.throttled += 1
+                self._successes = 0
+                self.limit = max(1, self.limit // 2)
+                self.resume_at = max(self.resume_at, time.monotonic() + delay)
+            else:
+                self._successes += 1
+                if self.limit < self.max_concurrency and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+def _retry_delay(error, attempt):
+    if isinstance(error, openai.APIStatusError):
+        try:
+            return float(error.response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            pass
+    return min(60, 2**attempt) * (0.5 + random.random())
+
+
+async def process_article_with_ai(client, limiter, article, clean_text, max_retries=MAX_RETRIES):
+    """Categories and summary for one article; the cleaned text is stored as its content without a round trip through the model."""
+    messages = build_messages(article, truncate_to_tokens(clean_text, MAX_PROMPT_TOKENS))
+    attempt = 0
+    while True:
+        await limiter.acquire()
+        try:
+            response = await client.chat.completions.create(
+                model=WEB_PAGE_ANALYSE_MODEL,
+                response_format={"type": "json_object"},
+                messages=messages,
+                temperature=0.3,
+                max_tokens=MAX_OUTPUT_TOKENS,
+            )
+        except RETRYABLE_ERRORS as e:
+            delay = _retry_delay(e, attempt)
+            await limiter.release(throttled=True, delay=delay)
+            if attempt >= max_retries:
+                print(f"Error processing article with AI: {str(e)}")
+                return None, False, str(e)
+            print(f"AI analysis throttled ({type(e).__name__}), retrying in {delay:.1f}s at concurrency {limiter.limit}")
+            attempt += 1
+            continue
+        except Exception as e:
+            await limiter.release()
+            print(f"Error processing article with AI: {str(e)}")
+            return None, False, str(e)
+        await limiter.release()
+        break
     try:
-        response = client.chat.completions.create(
-            model=WEB_PAGE_ANALYSE_MODEL,
-            response_format={"type": "json_object"},
-            messages=[
-                {
-                    "role": "system",
-                    "content": MODEL_INSTRUCTION,
-                },
-                {
-                    "role": "user",
-                    "content": f"""
-                                Analyze this article and provide a structured output with three components:
-
-                                1. A list of 3-5 relevant categories for this article
-                                2. A concise 2-3 sentence summary of the article
-                                3. The extracted main article content, removing any navigation, ads, or irrelevant elements
-
-                                Article Title: {title}
-                                Article URL: {url}
-                                Description: {description}
-
-                                Article Text:
-                                {clean_text}
-
-                                Provide your response as a JSON object with these keys:
-                                - categories: an array of 3-5 relevant categories (as strings)
-                                - summary: a 2-3 sentence summary of the article
-                                - content: the cleaned main article content
-                                """,
-                },
-            ],
-            temperature=0.3,
-            max_tokens=1500,
-        )
         response_json = json.loads(response.choices[0].message.content)
-        categories = response_json.get("categories", [])
-        if isinstance(categories, str):
-            categories = [cat.strip() for cat in categories.split(",") if cat.strip()]
-        results = {
-            "categories": categories,
-            "summary": response_json.get("summary", ""),
-            "content": response_json.get("content", ""),
-        }
-        return results, True, None
-    except Exception as e:
-        error_message = str(e)
-        print(f"Error processing article with AI: {error_message}")
-        return None, False, error_message
-
-
-def analyze_articles(tracking_db_path=None, openai_api_key=None, batch_size=5, delay_range=(1, 3)):
+    except (json.JSONDecodeError, TypeError) as e:
+        print(f"Error processing article with AI: {str(e)}")
+        return None, False, str(e)
+    categories = response_json.get("categories", [])
+    if isinstance(categories, str):
+        categories = [cat.strip() for cat in categories.split(",") if cat.strip()]
+    results = {
+        "categories": categories,
+        "summary": response_json.get("summary", ""),
+        "content": clean_text,
+    }
+    return results, True, None
+
+
+def analyze_articles(tracking_db_path=None, openai_api_key=None, batch_size=5, max_concurrency=MAX_CONCURRENT_REQUESTS, base_url=None):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
-    client = OpenAI(api_key=openai_api_key)
     articles = get_unprocessed_articles(tracking_db_path, limit=batch_size)
     stats = {"total_articles": len(articles), "success_count": 0, "failed_count": 0}
-    for i, article in enumerate(articles):
+    if not articles:
+        return stats
+    clean_texts = [extract_clean_text(article["raw_content"], max_tokens=None) for article in articles]
+    print(f"Analyzing {len(articles)} articles, up to {max_concurrency} at a time")
+
+    async def run():
+        client = AsyncOpenAI(api_key=openai_api_key, base_url=base_url, max_retries=0)
+        limiter = AdaptiveLimiter(max_concurrency)
+        try:
+            outcomes = await asyncio.gather(
+                *[process_article_with_ai(client, limiter, article, text) for article, text in zip(articles, clean_texts)]
+            )
+        finally:
+            await client.close()
+        if limiter.throttled:
+            print(f"Rate limited {limiter.throttled} times, finished at concurrency {limiter.limit}")
+        return outcomes
+
+    start = time.time()
+    outcomes = asyncio.run(run())
+    updates = []
+    for i, (article, (results, success, error_message)) in enumerate(zip(articles, outcomes)):
         article_id = article["id"]
-        title = article["title"]
         attempt = article.get("ai_attempts", 0) + 1
-        print(f"[{i + 1}/{len(articles)}] Processing article: {title} (Attempt {attempt})")
-        results, success, error_message = process_article_with_ai(client, article)
-        update_article_status(tracking_db_path, article_id, results, success, error_message)
+        print(f"[{i + 1}/{len(articles)}] {article['title']} (Attempt {attempt})")
+        updates.append((article_id, results, success, error_message))
         if success:
             categories_display = ", ".join(results["categories"])
             print(f"Successfully processed article ID {article_id}")
@@ -111,10 +199,8 @@ def analyze_articles(tracking_db_path=None, openai_api_key=None, batch_size=5, d
         else:
             print(f"Failed to process article ID {article_id}: {error_message}")
             stats["failed_count"] += 1
-
-        if i < len(articles) - 1:
-            delay = random.uniform(delay_range[0], delay_range[1])
-            time.sleep(delay)
+    update_article_statuses(tracking_db_path, updates)
+    print(f"Analyzed {len(articles)} articles in {time.time() - start:.1f}s")
     return stats
 
 
@@ -130,7 +216,8 @@ def analyze_in_batches(
     openai_api_key=None,
     batch_size=20,
     total_batches=1,
-    delay_between_batches=10,
+    delay_between_batches=0,
+    max_concurrency=MAX_CONCURRENT_REQUESTS,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
@@ -143,6 +230,7 @@ def analyze_in_batches(
             tracking_db_path=tracking_db_path,
             openai_api_key=openai_api_key,
             batch_size=batch_size,
+            max_concurrency=max_concurrency,
         )
         total_stats["total_articles"] += batch_stats["total_articles"]
         total_stats["success_count"] += batch_stats["success_count"]
@@ -150,7 +238,7 @@ def analyze_in_batches(
         if batch_stats["total_articles"] == 0:
             print("No more articles to process")
             break
-        if i < total_batches - 1:
+        if i < total_batches - 1 and delay_between_batches:
             print(f"Waiting {delay_between_batches} seconds before next batch...")
             time.sleep(delay_between_batches)
     return total_stats
@@ -171,6 +259,12 @@ def parse_arguments():
         default=1,
         help="Total number of batches to process",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=MAX_CONCURRENT_REQUESTS,
+        help="Maximum number of analysis requests in flight",
+    )
     return parser.parse_args()
 
 
@@ -184,5 +278,6 @@ if __name__ == "__main__":
         openai_api_key=api_key,
         batch_size=args.batch_size,
         total_batches=args.total_batches,
+        max_concurrency=args.concurrency,
     )
     print_stats(stats)
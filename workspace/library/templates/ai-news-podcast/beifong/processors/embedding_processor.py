@@ -1,13 +1,14 @@
 import time
+import asyncio
 import argparse
-import random
+from datetime import datetime
 import numpy as np
-from openai import OpenAI
 from db.config import get_tracking_db_path
 from db.connection import db_connection, execute_query
 from utils.load_api_keys import load_api_key
+from utils.embedding_batcher import EMBEDDING_MODEL, EmbeddingBatcher, content_hash
 
-EMBEDDING_MODEL = "text-embedding-3-small"
+CACHE_LOOKUP_CHUNK = 500
 
 def create_embedding_table(tracking_db_path):
     with db_connection(tracking_db_path) as conn:
@@ -41,6 +42,15 @@ def create_embedding_table(tracking_db_path):
             print("Article embeddings table created successfully.")
         else:
             print("Article embeddings table already exists.")
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            content_hash TEXT PRIMARY KEY,
+            embedding BLOB NOT NULL,
+            embedding_model TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """)
+        conn.commit()
 
 
 def get_articles_without_embeddings(tracking_db_path, limit=20):
@@ -87,15 +97,6 @@ def mark_articles_as_processing(tracking_db_path, article_ids):
         return 0
 
 
-def generate_embedding(client, text, model=EMBEDDING_MODEL):
-    try:
-        response = client.embeddings.create(input=text, model=model)
-        return response.data[0].embedding, model
-    except Exception as e:
-        print(f"Error generating embedding: {str(e)}")
-        return None, None
-
-
 def prepare_article_text(article):
     title = article.get("title", "")
     summary = article.get("summary", "")
@@ -104,64 +105,97 @@ def prepare_article_text(article):
     return full_text
 
 
-def store_embedding(tracking_db_path, article_id, embedding, model):
-    from datetime import datetime
-    import sqlite3
-    embedding_blob = np.array(embedding, dtype=np.float32).tobytes()
-    query = """
-    INSERT INTO article_embeddings 
-    (article_id, embedding, embedding_model, created_at, in_faiss_index)
-    VALUES (?, ?, ?, ?, 0)
+def get_cached_embeddings(tracking_db_path, hashes):
+    hashes = list(hashes)
+    cached = {}
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(hashes), CACHE_LOOKUP_CHUNK):
+            chunk = hashes[start : start + CACHE_LOOKUP_CHUNK]
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(f"SELECT content_hash, embedding FROM embedding_cache WHERE content_hash IN ({placeholders})", chunk)
+            cached.update({row["content_hash"]: row["embedding"] for row in cursor.fetchall()})
+    return cached
+
+
+def store_embeddings_bulk(tracking_db_path, article_rows, cache_rows, model):
+    """Insert article embeddings and new cache entries in one transaction with executemany."""
+    now = datetime.now().isoformat()
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+        INSERT OR IGNORE INTO embedding_cache (content_hash, embedding, embedding_model, created_at)
+        VALUES (?, ?, ?, ?)
+        """,
+            [(key, blob, model, now) for key, blob in cache_rows],
+        )
+        cursor.executemany(
+            """
+        INSERT INTO article_embeddings 
+        (article_id, embedding, embedding_model, created_at, in_faiss_index)
+        VALUES (?, ?, ?, ?, 0)
+        """,
+            [(article_id, blob, model, now) for article_id, blob in article_rows],
+        )
+        conn.commit()
+        return len(article_rows)
+
+
+async def embed_articles(articles, batcher, tracking_db_path):
     """
-    params = (article_id, embedding_blob, model, datetime.now().isoformat())
-    try:
-        execute_query(tracking_db_path, query, params)
-        return True
-    except sqlite3.IntegrityError:
-        print(f"Warning: Embedding already exists for article {article_id}")
-        return False
-    except Exception as e:
-        print(f"Error storing embedding: {str(e)}")
-        return False
+    Resolve one embedding per article, reusing cached vectors for identical text.
+
+    Returns ``(article_rows, cache_rows, cache_hits)`` where rows hold float32 blobs.
+    """
+    keys = [content_hash(prepare_article_text(article), batcher.model) for article in articles]
+    cached = get_cached_embeddings(tracking_db_path, set(keys))
+    missing = {}
+    for article, key in zip(articles, keys):
+        if key not in cached and key not in missing:
+            missing[key] = prepare_article_text(article)
+    vectors = await batcher.embed(list(missing.values()))
+    cache_rows = []
+    for key, vector in zip(missing.keys(), vectors):
+        if vector is not None:
+            blob = np.array(vector, dtype=np.float32).tobytes()
+            cached[key] = blob
+            cache_rows.append((key, blob))
+    article_rows = [(article["id"], cached[key]) for article, key in zip(articles, keys) if key in cached]
+    cache_hits = len(articles) - len(missing)
+    return article_rows, cache_rows, cache_hits
 
 
-def process_articles_for_embedding(tracking_db_path=None, openai_api_key=None, batch_size=20, delay_range=(1, 3)):
+def process_articles_for_embedding(tracking_db_path=None, openai_api_key=None, batch_size=20, delay_range=(1, 3), base_url=None):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
     create_embedding_table(tracking_db_path)
-    client = OpenAI(api_key=openai_api_key)
     articles = get_articles_without_embeddings(tracking_db_path, limit=batch_size)
     if not articles:
         print("No articles found that need embeddings")
-        return {"total_articles": 0, "success_count": 0, "failed_count": 0}
+        return {"total_articles": 0, "success_count": 0, "failed_count": 0, "cache_hits": 0}
     article_ids = [article["id"] for article in articles]
     mark_articles_as_processing(tracking_db_path, article_ids)
-    stats = {"total_articles": len(articles), "success_count": 0, "failed_count": 0}
-    for i, article in enumerate(articles):
-        article_id = article["id"]
+    print(f"Generating embeddings for {len(articles)} articles")
+
+    async def run():
+        batcher = EmbeddingBatcher(api_key=openai_api_key, model=EMBEDDING_MODEL, base_url=base_url)
         try:
-            print(f"[{i + 1}/{len(articles)}] Generating embedding for article {article_id}: {article['title']}")
-            text = prepare_article_text(article)
-            embedding, model = generate_embedding(client, text)
-            if embedding:
-                success = store_embedding(tracking_db_path, article_id, embedding, model)
-                if success:
-                    print(f"Successfully stored embedding for article {article_id}")
-                    stats["success_count"] += 1
-                else:
-                    print(f"Failed to store embedding for article {article_id}")
-                    stats["failed_count"] += 1
-            else:
-                print(f"Failed to generate embedding for article {article_id}")
-                stats["failed_count"] += 1
-        except Exception as e:
-            print(f"Error processing article {article_id}: {str(e)}")
-            stats["failed_count"] += 1
-        if i < len(articles) - 1:
-            delay = random.uniform(delay_range[0], delay_range[1])
-            time.sleep(delay)
+            return await embed_articles(articles, batcher, tracking_db_path)
+        finally:
+            await batcher.close()
+
+    article_rows, cache_rows, cache_hits = asyncio.run(run())
+    stored = store_embeddings_bulk(tracking_db_path, article_rows, cache_rows, EMBEDDING_MODEL)
+    stats = {
+        "total_articles": len(articles),
+        "success_count": stored,
+        "failed_count": len(articles) - stored,
+        "cache_hits": cache_hits,
+    }
+    print(f"Stored {stored} embeddings ({cache_hits} reused from cache, {len(cache_rows)} newly generated)")
     return stats
 
 
@@ -170,6 +204,7 @@ def print_stats(stats):
     print(f"Total articles processed: {stats['total_articles']}")
     print(f"Successfully embedded: {stats['success_count']}")
     print(f"Failed: {stats['failed_count']}")
+    print(f"Reused from cache: {stats.get('cache_hits', 0)}")
 
 
 def parse_arguments():
@@ -178,9 +213,10 @@ def parse_arguments():
     parser.add_argument(
         "--batch_size",
         type=int,
-        default=20,
+        default=200,
         help="Number of articles to process in each batch",
     )
+    parser.add_argument("--base_url", default=None, help="Embeddings API base URL (e.g. a local stub server)")
     return parser.parse_args()
 
 
@@ -189,27 +225,30 @@ def process_in_batches(
     openai_api_key=None,
     batch_size=20,
     total_batches=1,
-    delay_between_batches=10,
+    delay_between_batches=0,
+    base_url=None,
 ):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     if openai_api_key is None:
         raise ValueError("OpenAI API key is required")
-    total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0}
+    total_stats = {"total_articles": 0, "success_count": 0, "failed_count": 0, "cache_hits": 0}
     for i in range(total_batches):
         print(f"\nProcessing batch {i + 1}/{total_batches}")
         batch_stats = process_articles_for_embedding(
             tracking_db_path=tracking_db_path,
             openai_api_key=openai_api_key,
             batch_size=batch_size,
+            base_url=base_url,
         )
         total_stats["total_articles"] += batch_stats["total_articles"]
         total_stats["success_count"] += batch_stats["success_count"]
         total_stats["failed_count"] += batch_stats["failed_count"]
+        total_stats["cache_hits"] += batch_stats["cache_hits"]
         if batch_stats["total_articles"] == 0:
             print("No more articles to process")
             break
-        if i < total_batches - 1:
+        if delay_between_batches and i < total_batches - 1:
             print(f"Waiting {delay_between_batches} seconds before next batch...")
             time.sleep(delay_between_batches)
     return total_stats
@@ -225,5 +264,6 @@ if __name__ == "__main__":
         openai_api_key=api_key,
         batch_size=args.batch_size,
         total_batches=3,
+        base_url=args.base_url,
     )
     print_stats(stats)
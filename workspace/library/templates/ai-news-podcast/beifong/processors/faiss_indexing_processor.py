@@ -1,63 +1,178 @@
 import os
+import json
+import math
 import time
 import argparse
+from datetime import datetime
 import numpy as np
 import faiss
 from db.config import get_tracking_db_path, get_faiss_db_path
 from db.connection import db_connection, execute_query
 
+INDEX_TYPES = ["flat", "ivfflat", "ivfpq", "hnsw"]
+TRAIN_POINTS_PER_LIST = 39
+MIN_IVF_LISTS = 16
+MAX_TRAIN_SAMPLE = 100_000
+REBUILD_GROWTH_FACTOR = 2.0
+FETCH_CHUNK = 1000
+PQ_M = 64
+PQ_BITS = 8
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 100
+HNSW_EF_SEARCH = 64
 
-def initialize_faiss_index(dimension=1536, index_path=None, index_type="hnsw", n_list=100):
-    if index_path and os.path.exists(index_path):
-        print(f"Loading existing FAISS index from {index_path}")
-        try:
-            index = faiss.read_index(index_path)
-            print(f"Loaded index with {index.ntotal} vectors")
-            return index
-        except Exception as e:
-            print(f"Error loading FAISS index: {str(e)}")
-            print("Creating a new index instead")
-    print(f"Creating new FAISS index with dimension {dimension}, type: {index_type}")
-    if index_type == "flat":
-        return faiss.IndexFlatL2(dimension)
-
-    elif index_type == "ivfflat":
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+LATEST_EMBEDDINGS_SQL = """
+SELECT ae.id, ae.article_id, ae.embedding
+FROM article_embeddings ae
+WHERE ae.id IN (SELECT MAX(id) FROM article_embeddings GROUP BY article_id)
+"""
+
+
+def choose_n_list(corpus_size, n_list=None):
+    """IVF list count: ``n_list`` if given, else ~4*sqrt(N); capped so every list gets enough training points."""
+    if not n_list:
+        n_list = int(4 * math.sqrt(max(corpus_size, 1)))
+    return max(1, min(n_list, corpus_size // TRAIN_POINTS_PER_LIST))
+
+
+def required_training_vectors(index_type):
+    """Corpus size below which an IVF index cannot be trained properly and exact search is used instead."""
+    if index_type == "ivfflat":
+        return MIN_IVF_LISTS * TRAIN_POINTS_PER_LIST
+    if index_type == "ivfpq":
+        return max(MIN_IVF_LISTS, 2**PQ_BITS) * TRAIN_POINTS_PER_LIST
+    return 0
+
+
+def create_base_index(dimension, index_type, n_list):
+    if index_type == "ivfflat":
+        index = faiss.IndexIVFFlat(faiss.IndexFlatL2(dimension), dimension, n_list)
     elif index_type == "ivfpq":
-        quantizer = faiss.IndexFlatL2(dimension)
-        m = 16
-        bits = 8
-        index = faiss.IndexIVFPQ(quantizer, dimension, n_list, m, bits)
-        print("Training IVF-PQ index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+        m = next(m for m in (PQ_M, 32, 16, 8, 4, 2, 1) if dimension % m == 0)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dimension), dimension, n_list, m, PQ_BITS)
     elif index_type == "hnsw":
-        m = 32
-        ef_construction = 100
-        index = faiss.IndexHNSWFlat(dimension, m)
-        index.hnsw.efConstruction = ef_construction
-        index.hnsw.efSearch = 64
-        return index
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.hnsw.efSearch = HNSW_EF_SEARCH
     else:
-        print(f"Unknown index type '{index_type}', falling back to IVF Flat")
-        quantizer = faiss.IndexFlatL2(dimension)
-        index = faiss.IndexIVFFlat(quantizer, dimension, n_list)
-        print("Training IVF index with random vectors...")
-        train_size = max(10000, n_list * 10)
-        train_vectors = np.random.random((train_size, dimension)).astype(np.float32)
-        index.train(train_vectors)
-        index.nprobe = min(10, n_list // 10)
-        return index
+        index = faiss.IndexFlatL2(dimension)
+    if isinstance(index, faiss.IndexIVF):
+        index.nprobe = max(1, n_list // 16)
+    return index
+
+
+def get_corpus_size(tracking_db_path):
+    row = execute_query(tracking_db_path, "SELECT COUNT(DISTINCT article_id) AS n FROM article_embeddings", fetch=True, fetch_one=True)
+    return row["n"] if row else 0
+
+
+def decode_embeddings(rows, dimension):
+    """Split rows into ``(embedding_ids, article_ids, vectors)``, dropping blobs of the wrong dimension."""
+    embedding_ids, article_ids, vectors = [], [], []
+    for row in rows:
+        embedding = np.frombuffer(row["embedding"], dtype=np.float32)
+        if embedding.shape[0] != dimension:
+            print(f"Embedding dimension mismatch: expected {dimension}, got {embedding.shape[0]}")
+            continue
+        embedding_ids.append(row["id"])
+        article_ids.append(row["article_id"])
+        vectors.append(embedding)
+    if not vectors:
+        return [], np.empty(0, dtype=np.int64), np.empty((0, dimension), dtype=np.float32)
+    return embedding_ids, np.array(article_ids, dtype=np.int64), np.vstack(vectors).astype(np.float32)
+
+
+def sample_training_vectors(tracking_db_path, dimension, sample_size):
+    """Uniform sample of the latest embedding per article; ids are sampled first so blobs are never sorted."""
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id) AS id FROM article_embeddings GROUP BY article_id")
+        ids = np.array([row["id"] for row in cursor.fetchall()], dtype=np.int64)
+        if len(ids) > sample_size:
+            ids = np.random.default_rng().choice(ids, size=sample_size, replace=False)
+        vectors = []
+        for start in range(0, len(ids), FETCH_CHUNK):
+            chunk = ids[start : start + FETCH_CHUNK].tolist()
+            placeholders = ",".join(["?"] * len(chunk))
+            cursor.execute(f"SELECT id, article_id, embedding FROM article_embeddings WHERE id IN ({placeholders})", chunk)
+            vectors.append(decode_embeddings(cursor.fetchall(), dimension)[2])
+    return np.vstack(vectors) if vectors else np.empty((0, dimension), dtype=np.float32)
+
+
+def wrap_with_ids(base):
+    """Index keyed by article id: IVF indexes store external ids in their inverted lists, other types need an ``IndexIDMap2``."""
+    if isinstance(base, faiss.IndexIVF):
+        return base
+    return faiss.IndexIDMap2(base)
+
+
+def rebuild_faiss_index(tracking_db_path, dimension, index_type="ivfflat", n_list=None):
+    """
+    Build a fresh index keyed by article id from the latest embedding of every article.
+
+    IVF quantizers are trained on a sample of real vectors; while the corpus is
+    too small to train them, an exact flat index is built instead and the
+    requested type is picked up on a later rebuild. Returns ``(index, meta, max_embedding_id)``.
+    """
+    corpus_size = get_corpus_size(tracking_db_path)
+    built_type = index_type
+    if corpus_size < required_training_vectors(index_type):
+        built_type = "flat"
+    lists = choose_n_list(corpus_size, n_list) if built_type in ("ivfflat", "ivfpq") else 0
+    base = create_base_index(dimension, built_type, lists)
+    if not base.is_trained:
+        sample_size = min(MAX_TRAIN_SAMPLE, max(lists * 256, required_training_vectors(built_type)))
+        train_vectors = sample_training_vectors(tracking_db_path, dimension, sample_size)
+        print(f"Training {built_type} index ({lists} lists) on {len(train_vectors)} sampled embeddings...")
+        base.train(train_vectors)
+    index = wrap_with_ids(base)
+    max_id = 0
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute(LATEST_EMBEDDINGS_SQL)
+        while True:
+            rows = cursor.fetchmany(FETCH_CHUNK)
+            if not rows:
+                break
+            embedding_ids, article_ids, vectors = decode_embeddings(rows, dimension)
+            if embedding_ids:
+                index.add_with_ids(vectors, article_ids)
+                max_id = max(max_id, max(embedding_ids))
+    meta = {
+        "index_type": index_type,
+        "built_type": built_type,
+        "dimension": dimension,
+        "n_list": lists,
+        "trained_on": corpus_size,
+        "built_at": datetime.now().isoformat(),
+    }
+    print(f"Built {built_type} index with {index.ntotal} vectors")
+    return index, meta, max_id
+
+
+def meta_path_for(index_path):
+    return f"{index_path}.meta.json"
+
+
+def load_index_state(index_path):
+    """Existing ``(index, meta)``; ``(None, None)`` when missing, unreadable or in the legacy position-mapped layout."""
+    if not index_path or not os.path.exists(index_path):
+        return None, None
+    try:
+        index = faiss.read_index(index_path)
+        with open(meta_path_for(index_path)) as f:
+            meta = json.load(f)
+    except Exception as e:
+        print(f"Error loading FAISS index state: {str(e)}")
+        return None, None
+    if isinstance(index, faiss.IndexIDMap2):
+        # IVF behind an id map goes out of sync with it on removal, so such an index is rebuilt
+        if isinstance(faiss.downcast_index(index.index), faiss.IndexIVF):
+            return None, None
+    elif not isinstance(index, faiss.IndexIVF):
+        return None, None
+    print(f"Loaded index with {index.ntotal} vectors")
+    return index, meta
 
 
 def save_faiss_index(index, index_path):
@@ -74,43 +189,68 @@ def save_faiss_index(index, index_path):
         return False
 
 
-def save_id_mapping(id_map, mapping_path):
+def save_index_state(index, meta, index_path, mapping_path=None):
+    if not save_faiss_index(index, index_path):
+        return False
+    meta_path = meta_path_for(index_path)
+    with open(f"{meta_path}.tmp", "w") as f:
+        json.dump(meta, f)
+    os.replace(f"{meta_path}.tmp", meta_path)
+    # article ids now live inside the index; a leftover positional map would only mislead readers
+    if mapping_path and os.path.exists(mapping_path):
+        os.remove(mapping_path)
+    return True
+
+
+def rebuild_reason(index, meta, dimension, index_type, corpus_size):
+    if index is None:
+        return "no usable index"
+    if index.d != dimension:
+        return f"dimension changed from {index.d} to {dimension}"
+    if meta.get("index_type") != index_type:
+        return f"index type changed from {meta.get('index_type')} to {index_type}"
+    if meta.get("built_type") != index_type and corpus_size >= required_training_vectors(index_type):
+        return f"corpus reached {corpus_size} vectors, enough to train {index_type}"
+    if meta.get("built_type") in ("ivfflat", "ivfpq") and corpus_size >= REBUILD_GROWTH_FACTOR * max(meta.get("trained_on", 0), 1):
+        return f"corpus grew from {meta.get('trained_on')} to {corpus_size} vectors since training"
+    return None
+
+
+def indexed_article_ids(index):
+    if isinstance(index, faiss.IndexIVF):
+        invlists = index.invlists
+        ids = [faiss.rev_swig_ptr(invlists.get_ids(i), invlists.list_size(i)).copy() for i in range(index.nlist) if invlists.list_size(i)]
+        return np.concatenate(ids) if ids else np.empty(0, dtype=np.int64)
+    return faiss.vector_to_array(index.id_map)
+
+
+def remove_ids(index, article_ids):
+    """Remove vectors by article id; returns the count removed, or ``None`` if the index type cannot delete (HNSW)."""
+    if len(article_ids) == 0:
+        return 0
     try:
-        mapping_dir = os.path.dirname(mapping_path)
-        os.makedirs(mapping_dir, exist_ok=True)
-        np.save(mapping_path, np.array(id_map))
-        print(f"ID mapping saved to {mapping_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving ID mapping: {str(e)}")
-        try:
-            print("Trying alternative save method...")
-            simple_path = os.path.join(mapping_dir, "article_id_map.npy")
-            np.save(simple_path, np.array(id_map))
-            print(f"ID mapping saved to {simple_path} (alternative path)")
-            return True
-        except Exception as e:
-            print(f"Alternative save method also failed: {str(e)}")
-            return False
-
-
-def load_id_mapping(mapping_path):
-    if os.path.exists(mapping_path):
-        try:
-            return np.load(mapping_path).tolist()
-        except Exception as e:
-            print(f"Error loading ID mapping: {str(e)}")
-    return []
-
-
-def get_embeddings_not_in_index(tracking_db_path, limit=100):
+        return index.remove_ids(np.asarray(article_ids, dtype=np.int64))
+    except RuntimeError:
+        return None
+
+
+def remove_stale_vectors(index, tracking_db_path):
+    """Drop vectors whose article no longer has any embedding row."""
+    rows = execute_query(tracking_db_path, "SELECT DISTINCT article_id FROM article_embeddings", fetch=True)
+    current = np.array([row["article_id"] for row in rows], dtype=np.int64)
+    stale = np.setdiff1d(indexed_article_ids(index), current)
+    return remove_ids(index, stale)
+
+
+def get_embeddings_not_in_index(tracking_db_path, limit=100, after_id=0):
     query = """
     SELECT ae.id, ae.article_id, ae.embedding, ae.embedding_model
     FROM article_embeddings ae
-    WHERE ae.in_faiss_index = 0
+    WHERE ae.in_faiss_index = 0 AND ae.id > ?
+    ORDER BY ae.id
     LIMIT ?
     """
-    return execute_query(tracking_db_path, query, (limit,), fetch=True)
+    return execute_query(tracking_db_path, query, (after_id, limit), fetch=True)
 
 
 def mark_embeddings_as_indexed(tracking_db_path, embedding_ids):
@@ -120,8 +260,8 @@ def mark_embeddings_as_indexed(tracking_db_path, embedding_ids):
         cursor = conn.cursor()
         placeholders = ",".join(["?"] * len(embedding_ids))
         query = f"""
-        UPDATE article_embeddings 
-        SET in_faiss_index = 1 
+        UPDATE article_embeddings
+        SET in_faiss_index = 1
         WHERE id IN ({placeholders})
         """
         cursor.execute(query, embedding_ids)
@@ -129,104 +269,56 @@ def mark_embeddings_as_indexed(tracking_db_path, embedding_ids):
         return cursor.rowcount
 
 
-def add_embeddings_to_index(embeddings_data, faiss_index, id_map):
+def mark_all_embeddings_as_indexed(tracking_db_path, max_embedding_id):
+    with db_connection(tracking_db_path) as conn:
+        cursor = conn.cursor()
+        cursor.execute("UPDATE article_embeddings SET in_faiss_index = 1 WHERE id <= ? AND in_faiss_index = 0", (max_embedding_id,))
+        conn.commit()
+        return cursor.rowcount
+
+
+def add_embeddings_to_index(embeddings_data, faiss_index):
+    """
+    Upsert a batch of embedding rows by article id.
+
+    Re-embedded articles replace their previous vector. Returns
+    ``(added, embedding_ids, needs_rebuild)``; ``needs_rebuild`` is set when the
+    index cannot delete the old vectors, in which case nothing is added.
+    """
     if not embeddings_data:
-        return 0, []
-    embeddings = []
-    article_ids = []
-    embedding_ids = []
-    for data in embeddings_data:
-        try:
-            embedding_blob = data["embedding"]
-            embedding = np.frombuffer(embedding_blob, dtype=np.float32)
-
-            if embedding.shape[0] != faiss_index.d:
-                print(f"Embedding dimension mismatch: expected {faiss_index.d}, got {embedding.shape[0]}")
-                continue
-            embeddings.append(embedding)
-            article_ids.append(data["article_id"])
-            embedding_ids.append(data["id"])
-        except Exception as e:
-            print(f"Error processing embedding {data['id']}: {str(e)}")
-    if not embeddings:
-        return 0, []
+        return 0, [], False
+    embedding_ids, article_ids, vectors = decode_embeddings(embeddings_data, faiss_index.d)
+    if not embedding_ids:
+        return 0, [], False
+    # rows arrive ordered by id, so the last occurrence of an article is its newest embedding
+    _, reversed_first = np.unique(article_ids[::-1], return_index=True)
+    keep = np.sort(len(article_ids) - 1 - reversed_first)
+    article_ids, vectors = article_ids[keep], vectors[keep]
+    replaced = np.intersect1d(article_ids, indexed_article_ids(faiss_index))
+    if remove_ids(faiss_index, replaced) is None:
+        return 0, [], True
     try:
-        embeddings_array = np.vstack(embeddings).astype(np.float32)
-        faiss_index.add(embeddings_array)
-        for article_id in article_ids:
-            id_map.append(article_id)
-        print(f"Added {len(embeddings)} embeddings to FAISS index")
-        return len(embeddings), embedding_ids
+        faiss_index.add_with_ids(vectors, article_ids)
+        print(f"Added {len(article_ids)} embeddings to FAISS index ({len(replaced)} replaced)")
+        return len(article_ids), embedding_ids, False
     except Exception as e:
         print(f"Error adding embeddings to FAISS index: {str(e)}")
-        return 0, []
+        return 0, [], False
 
 
-def process_embeddings_for_indexing(
-    tracking_db_path=None,
-    index_path=None,
-    mapping_path=None,
-    batch_size=100,
-    index_type="ivfflat",
-    n_list=100,
-):
-    if tracking_db_path is None:
-        tracking_db_path = get_tracking_db_path()
-    index_dir = os.path.dirname(index_path)
-    os.makedirs(index_dir, exist_ok=True)
-    id_map = load_id_mapping(mapping_path)
-    with db_connection(tracking_db_path) as conn:
-        cursor = conn.cursor()
-        cursor.execute("""
-        SELECT name FROM sqlite_master 
-        WHERE type='table' AND name='article_embeddings'
-        """)
-        table_exists = cursor.fetchone() is not None
-
-        if not table_exists:
-            print("article_embeddings table does not exist. Please run embedding_processor first.")
-            return {"processed": 0, "added": 0, "errors": 0, "total_vectors": 0, "status": "table_missing"}
-    sample_query = """
-    SELECT embedding FROM article_embeddings LIMIT 1
-    """
-    sample = execute_query(tracking_db_path, sample_query, fetch=True, fetch_one=True)
+def detect_embedding_dimension(tracking_db_path):
+    sample = execute_query(tracking_db_path, "SELECT embedding FROM article_embeddings ORDER BY id DESC LIMIT 1", fetch=True, fetch_one=True)
     if not sample:
-        print("No embeddings found in the database")
-        default_dimension = 1536
-        print(f"Using default dimension: {default_dimension}")
-
-        faiss_index = initialize_faiss_index(
-            dimension=default_dimension, index_path=index_path if os.path.exists(index_path) else None, index_type=index_type, n_list=n_list
-        )
-        return {
-            "processed": 0,
-            "added": 0,
-            "errors": 0,
-            "total_vectors": faiss_index.ntotal if hasattr(faiss_index, "ntotal") else 0,
-            "status": "no_embeddings",
-        }
-    embedding_dimension = len(np.frombuffer(sample["embedding"], dtype=np.float32))
-    print(f"Detected embedding dimension: {embedding_dimension}")
-    faiss_index = initialize_faiss_index(dimension=embedding_dimension, index_path=index_path, index_type=index_type, n_list=n_list)
-    embeddings_data = get_embeddings_not_in_index(tracking_db_path, limit=batch_size)
-    if not embeddings_data:
-        print("No new embeddings to add to the index")
-        return {"processed": 0, "added": 0, "errors": 0, "total_vectors": faiss_index.ntotal, "status": "no_new_embeddings"}
-    added_count, embedding_ids = add_embeddings_to_index(embeddings_data, faiss_index, id_map)
-    if added_count > 0:
-        save_faiss_index(faiss_index, index_path)
-        save_id_mapping(id_map, mapping_path)
-        marked_count = mark_embeddings_as_indexed(tracking_db_path, embedding_ids)
-        print(f"Marked {marked_count} embeddings as indexed in the database")
-    stats = {
-        "processed": len(embeddings_data),
-        "added": added_count,
-        "errors": len(embeddings_data) - added_count,
-        "total_vectors": faiss_index.ntotal,
-        "index_type": index_type,
-        "status": "success",
-    }
-    return stats
+        return None
+    return len(np.frombuffer(sample["embedding"], dtype=np.float32))
+
+
+def article_embeddings_table_exists(tracking_db_path):
+    query = """
+    SELECT name FROM sqlite_master
+    WHERE type='table' AND name='article_embeddings'
+    """
+    return bool(execute_query(tracking_db_path, query, fetch=True))
 
 
 def process_in_batches(
@@ -235,42 +327,110 @@ def process_in_batches(
     mapping_path=None,
     batch_size=100,
     total_batches=5,
-    delay_between_batches=2,
+    delay_between_batches=0,
     index_type="ivfflat",
-    n_list=100,
+    n_list=None,
 ):
+    """
+    Bring the on-disk index up to date with ``article_embeddings``.
+
+    The index is loaded once, rebuilt from scratch when it is missing, of the
+    wrong shape, or outgrown by the corpus. Otherwise stale vectors are removed
+    and up to ``total_batches`` batches of new or re-embedded rows are upserted.
+    The index is written once at the end of the run.
+    """
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
-    total_stats = {"processed": 0, "added": 0, "errors": 0, "index_type": index_type}
-    for i in range(total_batches):
+    if index_path is None or mapping_path is None:
+        default_index_path, default_mapping_path = get_faiss_db_path()
+        index_path = index_path or default_index_path
+        mapping_path = mapping_path or default_mapping_path
+    total_stats = {"processed": 0, "added": 0, "errors": 0, "removed": 0, "rebuilt": False, "index_type": index_type}
+    if not article_embeddings_table_exists(tracking_db_path):
+        print("article_embeddings table does not exist. Please run embedding_processor first.")
+        return {**total_stats, "total_vectors": 0, "status": "table_missing"}
+    dimension = detect_embedding_dimension(tracking_db_path)
+    if dimension is None:
+        print("No embeddings found in the database")
+        return {**total_stats, "total_vectors": 0, "status": "no_embeddings"}
+    print(f"Detected embedding dimension: {dimension}")
+    faiss_index, meta = load_index_state(index_path)
+    reason = rebuild_reason(faiss_index, meta, dimension, index_type, get_corpus_size(tracking_db_path))
+    if reason is None:
+        removed = remove_stale_vectors(faiss_index, tracking_db_path)
+        if removed is None:
+            reason = "stale vectors cannot be removed from this index type"
+        else:
+            total_stats["removed"] = removed
+    rebuilt_up_to = None
+    indexed_ids = []
+    last_seen_id = 0
+    for i in range(total_batches + 1):
+        if reason is not None:
+            print(f"Rebuilding FAISS index: {reason}")
+            faiss_index, meta, rebuilt_up_to = rebuild_faiss_index(tracking_db_path, dimension, index_type, n_list)
+            total_stats["rebuilt"] = True
+            total_stats["added"] = faiss_index.ntotal
+            indexed_ids = []
+            last_seen_id = max(last_seen_id, rebuilt_up_to)
+            reason = None
+        if i == total_batches:
+            break
         print(f"\nProcessing batch {i + 1}/{total_batches}")
-        batch_stats = process_embeddings_for_indexing(
-            tracking_db_path=tracking_db_path,
-            index_path=index_path,
-            mapping_path=mapping_path,
-            batch_size=batch_size,
-            index_type=index_type,
-            n_list=n_list,
-        )
-        total_stats["processed"] += batch_stats["processed"]
-        total_stats["added"] += batch_stats["added"]
-        total_stats["errors"] += batch_stats["errors"]
-        if "total_vectors" in batch_stats:
-            total_stats["total_vectors"] = batch_stats["total_vectors"]
-        if batch_stats["processed"] == 0:
+        embeddings_data = get_embeddings_not_in_index(tracking_db_path, limit=batch_size, after_id=last_seen_id)
+        if not embeddings_data:
             print("No more embeddings to process")
             break
-        if i < total_batches - 1:
-            print(f"Waiting {delay_between_batches} seconds before next batch...")
+        last_seen_id = embeddings_data[-1]["id"]
+        added_count, embedding_ids, needs_rebuild = add_embeddings_to_index(embeddings_data, faiss_index)
+        if needs_rebuild:
+            reason = "re-embedded articles cannot be replaced in this index type"
+            continue
+        total_stats["processed"] += len(embeddings_data)
+        total_stats["added"] += added_count
+        total_stats["errors"] += len(embeddings_data) - len(embedding_ids)
+        indexed_ids.extend(embedding_ids)
+        if delay_between_batches and i < total_batches - 1:
             time.sleep(delay_between_batches)
+    changed = total_stats["rebuilt"] or total_stats["removed"] > 0 or bool(indexed_ids)
+    # rows are only flagged after the index is on disk, so a crash mid-run re-indexes them next time
+    if changed and save_index_state(faiss_index, meta, index_path, mapping_path):
+        if rebuilt_up_to is not None:
+            mark_all_embeddings_as_indexed(tracking_db_path, rebuilt_up_to)
+        mark_embeddings_as_indexed(tracking_db_path, indexed_ids)
+    total_stats["total_vectors"] = faiss_index.ntotal
+    total_stats["status"] = "success" if changed else "no_new_embeddings"
     return total_stats
 
 
+def process_embeddings_for_indexing(
+    tracking_db_path=None,
+    index_path=None,
+    mapping_path=None,
+    batch_size=100,
+    index_type="ivfflat",
+    n_list=None,
+):
+    return process_in_batches(
+        tracking_db_path=tracking_db_path,
+        index_path=index_path,
+        mapping_path=mapping_path,
+        batch_size=batch_size,
+        total_batches=1,
+        index_type=index_type,
+        n_list=n_list,
+    )
+
+
 def print_stats(stats):
     print("\nFAISS Indexing Statistics:")
     print(f"Total embeddings processed: {stats['processed']}")
     print(f"Successfully added to index: {stats['added']}")
     print(f"Errors: {stats['errors']}")
+    if stats.get("removed"):
+        print(f"Stale vectors removed: {stats['removed']}")
+    if stats.get("rebuilt"):
+        print("Index was rebuilt and retrained this run")
     if "total_vectors" in stats:
         print(f"Total vectors in index: {stats['total_vectors']}")
     if "index_type" in stats:
@@ -301,19 +461,19 @@ def parse_arguments():
     parser.add_argument(
         "--mapping_path",
         default="databases/faiss/article_id_map.npy",
-        help="Path to save the ID mapping file",
+        help="Path of the legacy ID mapping file (removed once the index stores article ids)",
     )
     parser.add_argument(
         "--index_type",
-        choices=["flat", "ivfflat", "ivfpq", "hnsw"],
+        choices=INDEX_TYPES,
         default="hnsw",
         help="Type of FAISS index to create",
     )
     parser.add_argument(
         "--n_list",
         type=int,
-        default=100,
-        help="Number of clusters for IVF-based indexes",
+        default=None,
+        help="Number of clusters for IVF-based indexes (default: ~4*sqrt(corpus size))",
     )
     parser.add_argument(
         "--total_batches",
@@ -337,3 +497,4 @@ if __name__ == "__main__":
         index_type=args.index_type,
         n_list=args.n_list,
     )
+    print_stats(stats)
@@ -1,18 +1,92 @@
-import time
-import random
-from utils.rss_feed_parser import get_feed_data
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from utils.rss_feed_parser import parse_feed_content
+from utils.feed_fetcher import HostLimiter, create_feed_client, fetch_feed
 from db.config import get_sources_db_path, get_tracking_db_path
 from db.feeds import (
     get_active_feeds,
     count_active_feeds,
-    get_feed_tracking_info,
-    update_feed_tracking,
-    store_feed_entries,
+    get_feed_tracking_infos,
+    update_feed_tracking_batch,
+    store_feed_entries_batch,
     update_tracking_info,
 )
+from db.feed_schedule import record_feed_poll_results
 
+MAX_CONCURRENCY = int(os.environ.get("FEED_FETCH_CONCURRENCY", 50))
+PER_HOST_LIMIT = int(os.environ.get("FEED_FETCH_PER_HOST", 2))
+WRITE_BATCH_SIZE = 50
 
-def fetch_and_process_feeds(sources_db_path=None, tracking_db_path=None, delay_between_feeds=2, batch_size=100):
+
+async def _process_feed(feed, tracking_info, client, limiter, global_limit, parse_pool):
+    try:
+        return await _fetch_and_parse(feed, tracking_info or {}, client, limiter, global_limit, parse_pool)
+    except Exception as e:
+        return {"feed": feed, "outcome": "failed", "reason": str(e) or type(e).__name__}
+
+
+async def _fetch_and_parse(feed, tracking_info, client, limiter, global_limit, parse_pool):
+    feed_url = feed["feed_url"]
+    response = await fetch_feed(
+        client,
+        feed_url,
+        limiter,
+        global_limit,
+        etag=tracking_info.get("last_etag"),
+        modified=tracking_info.get("last_modified"),
+    )
+    if response["status"] == 304:
+        return {"feed": feed, "outcome": "unchanged", "reason": "not modified since last check"}
+    if response["status"] >= 400:
+        return {"feed": feed, "outcome": "failed", "reason": f"HTTP {response['status']}"}
+    loop = asyncio.get_running_loop()
+    feed_data = await loop.run_in_executor(
+        parse_pool, parse_feed_content, response["content"], response["etag"], response["modified"], response["status"]
+    )
+    if not feed_data["is_rss_feed"]:
+        return {"feed": feed, "outcome": "failed", "reason": "not a valid RSS feed"}
+    last_hash = tracking_info.get("entry_hash")
+    if last_hash and feed_data["current_hash"] == last_hash:
+        return {"feed": feed, "outcome": "unchanged", "reason": "content unchanged based on hash"}
+    return {"feed": feed, "outcome": "changed", "feed_data": feed_data}
+
+
+def _flush(tracking_db_path, changed):
+    feed_batches = [
+        (result["feed"]["id"], result["feed"]["source_id"], result["feed_data"]["parsed_entries"])
+        for result in changed
+        if result["feed_data"]["parsed_entries"]
+    ]
+    counts = store_feed_entries_batch(tracking_db_path, feed_batches)
+    update_feed_tracking_batch(
+        tracking_db_path,
+        [
+            {
+                "feed_id": result["feed"]["id"],
+                "etag": result["feed_data"]["etag"],
+                "modified": result["feed_data"]["modified"],
+                "entry_hash": result["feed_data"]["current_hash"],
+            }
+            for result in changed
+        ],
+    )
+    for result in changed:
+        new_entries = counts.get(result["feed"]["id"], 0)
+        if new_entries:
+            print(f"Stored {new_entries} new entries from {result['feed']['feed_url']}")
+    return sum(counts.values())
+
+
+async def fetch_and_process_feeds_async(
+    sources_db_path=None,
+    tracking_db_path=None,
+    delay_between_feeds=2,
+    batch_size=100,
+    max_concurrency=MAX_CONCURRENCY,
+    per_host_limit=PER_HOST_LIMIT,
+    parse_workers=None,
+):
     if sources_db_path is None:
         sources_db_path = get_sources_db_path()
     if tracking_db_path is None:
@@ -24,63 +98,67 @@ def fetch_and_process_feeds(sources_db_path=None, tracking_db_path=None, delay_b
         "new_entries": 0,
         "unchanged_feeds": 0,
         "failed_feeds": 0,
+        "skipped_feeds": 0,
     }
-    offset = 0
-    while offset < total_feeds:
-        feeds = get_active_feeds(sources_db_path, limit=batch_size, offset=offset)
-        if not feeds:
-            break
-        update_tracking_info(tracking_db_path, feeds)
-        for feed in feeds:
-            feed_id = feed["id"]
-            source_id = feed["source_id"]
-            feed_url = feed["feed_url"]
-            tracking_info = get_feed_tracking_info(tracking_db_path, feed_id)
-            etag = tracking_info.get("last_etag") if tracking_info else None
-            modified = tracking_info.get("last_modified") if tracking_info else None
-            last_hash = tracking_info.get("entry_hash") if tracking_info else None
-            try:
-                feed_data = get_feed_data(feed_url, etag=etag, modified=modified)
-                if not feed_data["is_rss_feed"]:
-                    print(f"Feed {feed_url} is not a valid RSS feed")
-                    stats["failed_feeds"] += 1
-                    continue
-                if feed_data["status"] == 304:
-                    print(f"Feed {feed_url} not modified since last check")
+    feeds = get_active_feeds(sources_db_path, tracking_db_path=tracking_db_path)
+    stats["skipped_feeds"] = total_feeds - len(feeds)
+    if not feeds:
+        return stats
+    for start in range(0, len(feeds), batch_size):
+        update_tracking_info(tracking_db_path, feeds[start : start + batch_size])
+    tracking_infos = get_feed_tracking_infos(tracking_db_path, [feed["id"] for feed in feeds])
+    limiter = HostLimiter(per_host_limit=per_host_limit, min_interval=delay_between_feeds)
+    global_limit = asyncio.Semaphore(max_concurrency)
+    changed = []
+    outcomes = []
+    with ProcessPoolExecutor(max_workers=parse_workers) as parse_pool:
+        async with create_feed_client(max_connections=max_concurrency) as client:
+            tasks = [
+                asyncio.ensure_future(_process_feed(feed, tracking_infos.get(feed["id"]), client, limiter, global_limit, parse_pool))
+                for feed in feeds
+            ]
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                feed_url = result["feed"]["feed_url"]
+                outcomes.append((result["feed"]["id"], result["outcome"]))
+                if result["outcome"] == "unchanged":
+                    print(f"Feed {feed_url} {result['reason']}")
                     stats["unchanged_feeds"] += 1
-                    continue
-                current_hash = feed_data["current_hash"]
-                if last_hash and current_hash == last_hash:
-                    print(f"Feed {feed_url} content unchanged based on hash")
-                    stats["unchanged_feeds"] += 1
-                    continue
-                parsed_entries = feed_data["parsed_entries"]
-                if parsed_entries:
-                    new_entries = store_feed_entries(tracking_db_path, feed_id, source_id, parsed_entries)
-                    stats["new_entries"] += new_entries
-                    print(f"Stored {new_entries} new entries from {feed_url}")
-                update_feed_tracking(
-                    tracking_db_path,
-                    feed_id,
-                    feed_data["etag"],
-                    feed_data["modified"],
-                    current_hash,
-                )
-                stats["processed_feeds"] += 1
-            except Exception as e:
-                print(f"Error processing feed {feed_url}: {str(e)}")
-                stats["failed_feeds"] += 1
-            time.sleep(random.uniform(1, delay_between_feeds))
-        offset += batch_size
+                elif result["outcome"] == "failed":
+                    print(f"Error processing feed {feed_url}: {result['reason']}")
+                    stats["failed_feeds"] += 1
+                else:
+                    changed.append(result)
+                    if len(changed) >= WRITE_BATCH_SIZE:
+                        batch, changed = changed, []
+                        stats["new_entries"] += await asyncio.to_thread(_flush, tracking_db_path, batch)
+                        stats["processed_feeds"] += len(batch)
+    if changed:
+        stats["new_entries"] += await asyncio.to_thread(_flush, tracking_db_path, changed)
+        stats["processed_feeds"] += len(changed)
+    for start in range(0, len(outcomes), batch_size):
+        await asyncio.to_thread(record_feed_poll_results, tracking_db_path, outcomes[start : start + batch_size])
     return stats
 
 
+def fetch_and_process_feeds(sources_db_path=None, tracking_db_path=None, delay_between_feeds=2, batch_size=100):
+    return asyncio.run(
+        fetch_and_process_feeds_async(
+            sources_db_path=sources_db_path,
+            tracking_db_path=tracking_db_path,
+            delay_between_feeds=delay_between_feeds,
+            batch_size=batch_size,
+        )
+    )
+
+
 def print_stats(stats):
     print("\nFeed Processing Statistics:")
     print(f"Total feeds: {stats['total_feeds']}")
     print(f"Processed feeds: {stats['processed_feeds']}")
     print(f"Unchanged feeds: {stats['unchanged_feeds']}")
     print(f"Failed feeds: {stats['failed_feeds']}")
+    print(f"Not yet due: {stats['skipped_feeds']}")
     print(f"New entries: {stats['new_entries']}")
 
 
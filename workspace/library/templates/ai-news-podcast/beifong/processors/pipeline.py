@@ -0,0 +1,155 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from models.tasks_schemas import TASK_TYPES
+from utils.load_api_keys import load_api_key
+
+
+class Stage:
+    """
+    One step of the ingestion pipeline, run inside the scheduler process.
+
+    ``run()`` does the work and returns the processor's stats dict;
+    ``produced(stats)`` reports how many new items it handed downstream, and
+    any positive count triggers the stages that list this one in
+    ``depends_on`` straight away. At most ``concurrency`` runs of a stage are
+    in flight at once. Output of ``run()`` is stored with the task execution,
+    including from threads it starts with ``asyncio.to_thread`` or a copied
+    ``contextvars`` context; child processes are not captured.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[], Dict[str, Any]],
+        depends_on: Sequence[str] = (),
+        concurrency: int = 1,
+        produced: Optional[Callable[[Dict[str, Any]], int]] = None,
+    ):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.concurrency = concurrency
+        self.produced = produced or (lambda stats: 0)
+        self.slots = threading.BoundedSemaphore(concurrency)
+
+
+STAGES: Dict[str, Stage] = {}
+
+
+def register_stage(name: str, run, depends_on: Sequence[str] = (), concurrency: int = 1, produced=None) -> Stage:
+    for upstream in depends_on:
+        if upstream not in STAGES:
+            raise ValueError(f"Stage {name} depends on unknown stage {upstream}")
+    stage = Stage(name, run, depends_on, concurrency, produced)
+    STAGES[name] = stage
+    return stage
+
+
+def dependents(name: str) -> List[str]:
+    return [stage.name for stage in STAGES.values() if name in stage.depends_on]
+
+
+def stage_for_task(task: Dict[str, Any]) -> Optional[Stage]:
+    """The registered stage for a ``tasks`` row, by ``task_type`` or, for older rows, by its command."""
+    task_type = task.get("task_type")
+    if task_type in STAGES:
+        return STAGES[task_type]
+    command = (task.get("command") or "").strip()
+    for name, spec in TASK_TYPES.items():
+        if spec["command"] == command and name in STAGES:
+            return STAGES[name]
+    return None
+
+
+def _require_api_key():
+    api_key = load_api_key()
+    if not api_key:
+        raise RuntimeError("No OpenAI API key provided. Please set OPENAI_API_KEY in .env file")
+    return api_key
+
+
+# Each runner mirrors its processor's ``__main__`` block; imports are deferred so the
+# scheduler starts quickly and pays for openai/faiss/bs4 once, on first use.
+
+
+def run_feed_processor():
+    from processors.feed_processor import fetch_and_process_feeds, print_stats
+
+    stats = fetch_and_process_feeds()
+    print_stats(stats)
+    return stats
+
+
+def run_url_crawler():
+    from processors.url_processor import crawl_in_batches, print_stats
+
+    stats = crawl_in_batches(batch_size=20, total_batches=50)
+    print_stats(stats)
+    return stats
+
+
+def run_ai_analyzer():
+    from processors.ai_analysis_processor import analyze_in_batches, print_stats
+
+    stats = analyze_in_batches(openai_api_key=_require_api_key(), batch_size=10, total_batches=1)
+    print_stats(stats)
+    return stats
+
+
+def run_embedding_processor():
+    from processors.embedding_processor import process_in_batches, print_stats
+
+    stats = process_in_batches(openai_api_key=_require_api_key(), batch_size=200, total_batches=3)
+    print_stats(stats)
+    return stats
+
+
+def run_faiss_indexer():
+    from db.config import get_faiss_db_path
+    from processors.faiss_indexing_processor import process_in_batches, print_stats
+
+    index_path, mapping_path = get_faiss_db_path()
+    stats = process_in_batches(batch_size=100, index_path=index_path, mapping_path=mapping_path, total_batches=5, index_type="hnsw")
+    print_stats(stats)
+    return stats
+
+
+def run_podcast_generator():
+    from processors.podcast_generator_processor import main
+
+    if main() != 0:
+        raise RuntimeError("Podcast generation could not start")
+    return {}
+
+
+def _run_script_main(main, name):
+    """Call a processor ``main`` written for the command line, turning its ``sys.exit`` into an ordinary task failure."""
+    try:
+        code = main()
+    except SystemExit as e:
+        code = e.code
+    if code not in (None, 0):
+        raise RuntimeError(f"{name} exited with code {code}")
+    return {}
+
+
+def run_x_scraper():
+    from processors.x_scraper_processor import main
+
+    return _run_script_main(main, "X scraper")
+
+
+def run_fb_scraper():
+    from processors.fb_scraper_processor import main
+
+    return _run_script_main(main, "Facebook scraper")
+
+
+register_stage("feed_processor", run_feed_processor, produced=lambda stats: stats.get("new_entries", 0))
+register_stage("url_crawler", run_url_crawler, depends_on=["feed_processor"], produced=lambda stats: stats.get("success_count", 0))
+register_stage("ai_analyzer", run_ai_analyzer, depends_on=["url_crawler"], produced=lambda stats: stats.get("success_count", 0))
+register_stage("embedding_processor", run_embedding_processor, depends_on=["ai_analyzer"], produced=lambda stats: stats.get("success_count", 0))
+register_stage("faiss_indexer", run_faiss_indexer, depends_on=["embedding_processor"])
+register_stage("podcast_generator", run_podcast_generator)
+register_stage("social_x_scraper", run_x_scraper)
+register_stage("social_fb_scraper", run_fb_scraper)
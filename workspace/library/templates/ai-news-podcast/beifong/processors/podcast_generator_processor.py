@@ -10,6 +10,7 @@ from db.config import get_tracking_db_path, get_podcasts_db_path, get_tasks_db_p
 from db.podcast_configs import get_podcast_config, get_all_podcast_configs
 from db.agent_config_v2 import AVAILABLE_LANGS
 from utils.tts_engine_selector import generate_podcast_audio
+from utils.audio_mixer import audio_extension
 from utils.load_api_keys import load_api_key
 from tools.session_state_manager import _save_podcast_to_database_sync
 
@@ -115,7 +116,7 @@ def generate_podcast_from_prompt_v2(
     full_audio_path = None
     try:
         audio_format = convert_script_to_audio_format(podcast_data)
-        audio_filename = f"podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}.wav"
+        audio_filename = f"podcast_{datetime.now().strftime('%Y%m%d_%H%M%S')}{audio_extension()}"
         audio_path = os.path.join(output_dir, "audio", audio_filename)
 
         class DictPodcastScript:
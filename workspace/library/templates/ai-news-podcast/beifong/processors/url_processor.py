@@ -1,59 +1,136 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from db.config import get_tracking_db_path
 from db.feeds import get_uncrawled_entries
 from db.articles import store_crawled_article, update_entry_status
-from utils.crawl_url import get_web_data
+from db.dedup import find_articles_by_canonical_urls, find_duplicate_article, store_article_fingerprint
+from utils.crawl_url import extract_web_data
+from utils.dedup import canonicalize_url, fingerprint_html, page_canonical_url
+from utils.web_crawler import WebCrawler
 
+MAX_CONCURRENCY = 20
+PER_HOST_LIMIT = 2
 
-def crawl_pending_entries(tracking_db_path=None, batch_size=20, delay_range=(1, 3), max_attempts=3):
-    if tracking_db_path is None:
-        tracking_db_path = get_tracking_db_path()
+
+def _parse_page(content, encoding):
+    web_data = extract_web_data(content, encoding)
+    return web_data, fingerprint_html(web_data["raw_html"])
+
+
+async def _crawl_entry(entry, crawler, parse_pool):
+    url = entry["link"]
+    print(f"Crawling URL: {url}")
+    fetched = await crawler.fetch(url)
+    if not fetched["ok"]:
+        return entry, None, fetched["reason"]
+    loop = asyncio.get_running_loop()
+    web_data, fingerprint = await loop.run_in_executor(parse_pool, _parse_page, fetched["content"], fetched["encoding"])
+    if not web_data["raw_html"]:
+        crawler.stats.record_failure("empty_body")
+        return entry, None, "empty_body"
+    final_url = fetched["final_url"]
+    web_data["canonical_url"] = page_canonical_url(web_data["metadata"].get("canonical_url"), final_url)
+    web_data["fingerprint"] = fingerprint
+    return entry, web_data, None
+
+
+def _store_duplicate(tracking_db_path, entry, canonical_url, duplicate_of, stats):
+    if store_crawled_article(tracking_db_path, entry, None, {}, canonical_url=canonical_url, duplicate_of=duplicate_of):
+        update_entry_status(tracking_db_path, entry["id"], "duplicate")
+        stats["duplicate_count"] += 1
+        print(f"Duplicate of article {duplicate_of}: {entry['link']}")
+    else:
+        update_entry_status(tracking_db_path, entry["id"], "failed")
+        stats["failed_count"] += 1
+
+
+def _store_results(tracking_db_path, results, stats):
+    for entry, web_data, reason in results:
+        entry_id = entry["id"]
+        url = entry["link"]
+        if web_data is None:
+            print(f"No content retrieved for {url} ({reason})")
+            update_entry_status(tracking_db_path, entry_id, "failed")
+            stats["failed_count"] += 1
+            continue
+        canonical_url = web_data["canonical_url"]
+        fingerprint = web_data["fingerprint"]
+        duplicate_of = find_articles_by_canonical_urls(tracking_db_path, [canonical_url]).get(canonical_url)
+        if duplicate_of is None:
+            duplicate_of = find_duplicate_article(tracking_db_path, fingerprint["content_hash"], fingerprint["simhash"])
+        if duplicate_of is not None:
+            _store_duplicate(tracking_db_path, entry, canonical_url, duplicate_of, stats)
+            continue
+        article_id = store_crawled_article(tracking_db_path, entry, web_data["raw_html"], web_data["metadata"], canonical_url=canonical_url)
+        if article_id:
+            store_article_fingerprint(tracking_db_path, article_id, fingerprint["content_hash"], fingerprint["simhash"])
+            update_entry_status(tracking_db_path, entry_id, "success")
+            stats["success_count"] += 1
+            print(f"Successfully crawled: {url}")
+        else:
+            update_entry_status(tracking_db_path, entry_id, "failed")
+            stats["failed_count"] += 1
+            print(f"Failed to store: {url} (likely duplicate)")
+
+
+def _link_known_urls(tracking_db_path, entries, stats):
+    """
+    Link entries whose canonical URL was already crawled without fetching them again.
+
+    Returns the entries still to crawl, at most one per canonical URL; the
+    others sharing a URL with one being crawled now are returned separately
+    and linked once it is stored.
+    """
+    canonical_urls = {entry["id"]: canonicalize_url(entry["link"]) for entry in entries}
+    known = find_articles_by_canonical_urls(tracking_db_path, canonical_urls.values())
+    to_crawl, deferred, claimed = [], [], set()
+    for entry in entries:
+        canonical_url = canonical_urls[entry["id"]]
+        if canonical_url in known:
+            _store_duplicate(tracking_db_path, entry, canonical_url, known[canonical_url], stats)
+        elif canonical_url in claimed:
+            deferred.append((entry, canonical_url))
+        else:
+            claimed.add(canonical_url)
+            to_crawl.append(entry)
+    return to_crawl, deferred
+
+
+def _link_deferred(tracking_db_path, deferred, stats):
+    known = find_articles_by_canonical_urls(tracking_db_path, [canonical_url for _, canonical_url in deferred])
+    for entry, canonical_url in deferred:
+        if canonical_url in known:
+            _store_duplicate(tracking_db_path, entry, canonical_url, known[canonical_url], stats)
+        # otherwise the copy crawled in this batch failed; the entry stays 'processing'
+        # and reset_stuck_entries hands it to the next batch without counting an attempt
+
+
+async def _crawl_batch(tracking_db_path, batch_size, max_attempts, crawler, parse_pool):
     entries = get_uncrawled_entries(tracking_db_path, limit=batch_size, max_attempts=max_attempts)
     stats = {
         "total_entries": len(entries),
         "success_count": 0,
         "failed_count": 0,
         "skipped_count": 0,
+        "duplicate_count": 0,
     }
+    crawlable = []
     for entry in entries:
-        entry_id = entry["id"]
-        url = entry["link"]
-        if not url or url.strip() == "":
-            update_entry_status(tracking_db_path, entry_id, "skipped")
+        if not entry["link"] or entry["link"].strip() == "":
+            update_entry_status(tracking_db_path, entry["id"], "skipped")
             stats["skipped_count"] += 1
-            continue
-        print(f"Crawling URL: {url}")
-        try:
-            web_data = get_web_data(url)
-            if not web_data or not web_data["raw_html"]:
-                print(f"No content retrieved for {url}")
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
-                continue
-            success = store_crawled_article(tracking_db_path, entry, web_data["raw_html"], web_data["metadata"])
-            if success:
-                update_entry_status(tracking_db_path, entry_id, "success")
-                stats["success_count"] += 1
-                print(f"Successfully crawled: {url}")
-            else:
-                update_entry_status(tracking_db_path, entry_id, "failed")
-                stats["failed_count"] += 1
-                print(f"Failed to store: {url} (likely duplicate)")
-        except Exception as e:
-            print(f"Error crawling {url}: {str(e)}")
-            update_entry_status(tracking_db_path, entry_id, "failed")
-            stats["failed_count"] += 1
+        else:
+            crawlable.append(entry)
+    crawlable, deferred = await asyncio.to_thread(_link_known_urls, tracking_db_path, crawlable, stats)
+    results = await asyncio.gather(*[_crawl_entry(entry, crawler, parse_pool) for entry in crawlable], return_exceptions=True)
+    results = [(entry, None, type(result).__name__) if isinstance(result, Exception) else result for entry, result in zip(crawlable, results)]
+    await asyncio.to_thread(_store_results, tracking_db_path, results, stats)
+    if deferred:
+        await asyncio.to_thread(_link_deferred, tracking_db_path, deferred, stats)
     return stats
 
 
-def print_stats(stats):
-    print("\nCrawl Statistics:")
-    print(f"Total entries processed: {stats['total_entries']}")
-    print(f"Successfully crawled: {stats['success_count']}")
-    print(f"Failed: {stats['failed_count']}")
-    print(f"Skipped (no URL): {stats['skipped_count']}")
-
-
-def crawl_in_batches(tracking_db_path=None, batch_size=20, total_batches=5, delay_between_batches=10):
+async def crawl_in_batches_async(tracking_db_path=None, batch_size=20, total_batches=5, max_attempts=3, host_delay=1.0, delay_between_batches=0):
     if tracking_db_path is None:
         tracking_db_path = get_tracking_db_path()
     total_stats = {
@@ -61,22 +138,62 @@ def crawl_in_batches(tracking_db_path=None, batch_size=20, total_batches=5, dela
         "success_count": 0,
         "failed_count": 0,
         "skipped_count": 0,
+        "duplicate_count": 0,
     }
-    for i in range(total_batches):
-        print(f"\nProcessing batch {i + 1}/{total_batches}")
-        batch_stats = crawl_pending_entries(tracking_db_path=tracking_db_path, batch_size=batch_size)
-        total_stats["total_entries"] += batch_stats["total_entries"]
-        total_stats["success_count"] += batch_stats["success_count"]
-        total_stats["failed_count"] += batch_stats["failed_count"]
-        total_stats["skipped_count"] += batch_stats["skipped_count"]
-        if batch_stats["total_entries"] == 0:
-            print("No more entries to process")
-            break
-        if i < total_batches - 1:
-            print(f"Waiting {delay_between_batches} seconds before next batch...")
+    with ProcessPoolExecutor() as parse_pool:
+        async with WebCrawler(max_concurrency=MAX_CONCURRENCY, per_host_limit=PER_HOST_LIMIT, host_delay=host_delay) as crawler:
+            for i in range(total_batches):
+                print(f"\nProcessing batch {i + 1}/{total_batches}")
+                batch_stats = await _crawl_batch(tracking_db_path, batch_size, max_attempts, crawler, parse_pool)
+                for key in ("total_entries", "success_count", "failed_count", "skipped_count", "duplicate_count"):
+                    total_stats[key] += batch_stats[key]
+                if batch_stats["total_entries"] == 0:
+                    print("No more entries to process")
+                    break
+                if delay_between_batches and i < total_batches - 1:
+                    print(f"Waiting {delay_between_batches} seconds before next batch...")
+                    await asyncio.sleep(delay_between_batches)
+            total_stats["throughput"] = crawler.stats.as_dict()
     return total_stats
 
 
+def crawl_pending_entries(tracking_db_path=None, batch_size=20, delay_range=(1, 3), max_attempts=3):
+    return asyncio.run(
+        crawl_in_batches_async(
+            tracking_db_path=tracking_db_path,
+            batch_size=batch_size,
+            total_batches=1,
+            max_attempts=max_attempts,
+            host_delay=delay_range[0],
+        )
+    )
+
+
+def crawl_in_batches(tracking_db_path=None, batch_size=20, total_batches=5, delay_between_batches=0):
+    return asyncio.run(
+        crawl_in_batches_async(
+            tracking_db_path=tracking_db_path,
+            batch_size=batch_size,
+            total_batches=total_batches,
+            delay_between_batches=delay_between_batches,
+        )
+    )
+
+
+def print_stats(stats):
+    print("\nCrawl Statistics:")
+    print(f"Total entries processed: {stats['total_entries']}")
+    print(f"Successfully crawled: {stats['success_count']}")
+    print(f"Failed: {stats['failed_count']}")
+    print(f"Skipped (no URL): {stats['skipped_count']}")
+    print(f"Linked to an existing article: {stats.get('duplicate_count', 0)}")
+    throughput = stats.get("throughput")
+    if throughput:
+        print(f"Throughput: {throughput['pages_per_second']} pages/s, {throughput['bytes_per_second']} bytes/s")
+        if throughput["failures_by_reason"]:
+            print(f"Failures by reason: {throughput['failures_by_reason']}")
+
+
 if __name__ == "__main__":
     stats = crawl_in_batches(batch_size=20, total_batches=50)
     print_stats(stats)
@@ -1,4 +1,6 @@
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from pydantic import BaseModel
 from services.async_podcast_agent_service import podcast_agent_service
@@ -49,6 +51,32 @@ async def check_status(request: StatusRequest):
     return await podcast_agent_service.check_result_status(request)
 
 
+@router.get("/events/{session_id}")
+async def stream_events(session_id: str, task_id: Optional[str] = None):
+    """Stream the session's task events as server-sent events, ending with the task result"""
+
+    async def event_source():
+        async for event in podcast_agent_service.task_events(session_id, task_id):
+            if event["type"] == "keepalive":
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@router.websocket("/ws/{session_id}")
+async def websocket_events(websocket: WebSocket, session_id: str, task_id: Optional[str] = None):
+    """Same events as /events over a WebSocket"""
+    await websocket.accept()
+    try:
+        async for event in podcast_agent_service.task_events(session_id, task_id):
+            await websocket.send_json(event)
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+
+
 @router.get("/sessions")
 async def list_sessions(page: int = 1, per_page: int = 10):
     """List all saved podcast sessions with pagination"""
@@ -1,6 +1,9 @@
 import os
+import sys
 import time
 import signal
+import threading
+import contextvars
 import subprocess
 from datetime import datetime
 import traceback
@@ -11,14 +14,88 @@ from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
 from db.config import get_tasks_db_path
 from db.connection import db_connection
 from db.tasks import (
+    append_task_execution_output,
+    finish_task_execution,
+    get_all_tasks,
     get_pending_tasks,
     update_task_last_run,
-    update_task_execution,
 )
+from processors.pipeline import dependents, stage_for_task
 
 running = True
 MAX_WORKERS = 5
 DEFAULT_TASK_TIMEOUT = 3600
+LOG_FLUSH_SEC = 2.0
+
+
+class ExecutionLog:
+    """Buffers a run's output and appends it to its ``task_executions`` row every ``LOG_FLUSH_SEC`` seconds."""
+
+    def __init__(self, tasks_db_path, execution_id):
+        self.tasks_db_path = tasks_db_path
+        self.execution_id = execution_id
+        self._parts = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._flushing = False
+
+    def write(self, text):
+        with self._lock:
+            self._parts.append(text)
+        if time.monotonic() - self._last_flush >= LOG_FLUSH_SEC:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if self._flushing:
+                return
+            self._flushing = True
+            text, self._parts = "".join(self._parts), []
+            self._last_flush = time.monotonic()
+        try:
+            if text:
+                append_task_execution_output(self.tasks_db_path, self.execution_id, text)
+        except Exception as e:
+            sys.__stderr__.write(f"ERROR: Could not store output for execution {self.execution_id}: {e}\n")
+        finally:
+            self._flushing = False
+
+
+class ContextRoutedStream:
+    """
+    Stand-in for stdout/stderr that also copies whatever a stage run prints into that run's ``ExecutionLog``.
+
+    The log is held in a ``ContextVar``, so output from threads the stage
+    starts through ``asyncio.to_thread`` or with a copied context (as the
+    processors do) is captured too. Threads started with a fresh context and
+    child processes, such as parse pools, are not routed.
+    """
+
+    def __init__(self, stream, name):
+        self._stream = stream
+        self._log = contextvars.ContextVar(name, default=None)
+
+    def route(self, log):
+        return self._log.set(log)
+
+    def unroute(self, token):
+        self._log.reset(token)
+
+    def write(self, text):
+        log = self._log.get()
+        if log is not None:
+            log.write(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+stdout_router = ContextRoutedStream(sys.stdout, "stdout_execution_log")
+stderr_router = ContextRoutedStream(sys.stderr, "stderr_execution_log")
 
 
 def cleanup_stuck_tasks():
@@ -56,8 +133,8 @@ def cleanup_stuck_tasks():
         print(f"ERROR: {traceback.format_exc()}")
 
 
-def execute_task(task_id, command):
-    tasks_db_path = get_tasks_db_path()
+def claim_execution(tasks_db_path, task_id):
+    """Insert a ``running`` execution row for the task, or return ``None`` if one is already running."""
     with db_connection(tasks_db_path) as conn:
         conn.execute("BEGIN EXCLUSIVE TRANSACTION")
         try:
@@ -74,7 +151,7 @@ def execute_task(task_id, command):
             if is_running:
                 print(f"WARNING: Task {task_id} is already running, skipping this execution")
                 conn.commit()
-                return
+                return None
             cursor.execute(
                 """
                 INSERT INTO task_executions 
@@ -87,46 +164,149 @@ def execute_task(task_id, command):
             conn.commit()
             if not execution_id:
                 print(f"ERROR: Failed to create execution record for task {task_id}")
-                return
+                return None
+            return execution_id
         except Exception as e:
             conn.rollback()
             print(f"ERROR: Transaction error for task {task_id}: {str(e)}")
-            return
-    print(f"INFO: Starting task {task_id}: {command}")
+            return None
+
+
+def run_subprocess(command, log):
+    """Run a command that is not a registered stage, streaming its combined output into ``log``."""
+    process = subprocess.Popen(
+        command,
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        env={**os.environ, "PYTHONUNBUFFERED": "1"},
+    )
+    timed_out = threading.Event()
+
+    def kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(DEFAULT_TASK_TIMEOUT, kill)
+    timer.start()
     try:
-        process = subprocess.Popen(
-            command,
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-        )
+        for line in process.stdout:
+            log.write(line)
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+    if timed_out.is_set():
+        raise TimeoutError(f"Task timed out after {DEFAULT_TASK_TIMEOUT} seconds")
+    if returncode != 0:
+        raise RuntimeError(f"Process exited with code {returncode}")
+
+
+def execute_task(task):
+    """
+    Run one task to completion and return how many new items its stage produced (``None`` if it did not run).
+
+    Registered pipeline stages run in this process, within their stage's
+    concurrency limit; anything else still runs as a shell command. Output
+    is streamed into the execution row while the task runs.
+    """
+    task_id = task["id"]
+    tasks_db_path = get_tasks_db_path()
+    stage = stage_for_task(task)
+    if stage is not None:
+        stage.slots.acquire()
+    try:
+        execution_id = claim_execution(tasks_db_path, task_id)
+        if not execution_id:
+            return None
+        print(f"INFO: Starting task {task_id}: {stage.name if stage else task['command']}")
+        log = ExecutionLog(tasks_db_path, execution_id)
+        stdout_token = stdout_router.route(log)
+        stderr_token = stderr_router.route(log)
+        produced = 0
+        status, error_message = "failed", "Task was interrupted before it finished"
         try:
-            stdout, stderr = process.communicate(timeout=DEFAULT_TASK_TIMEOUT)
-            if process.returncode == 0:
-                status = "success"
-                error_message = None
-                print(f"INFO: Task {task_id} completed successfully")
+            if stage is not None:
+                produced = stage.produced(stage.run() or {}) or 0
             else:
-                status = "failed"
-                error_message = stderr if stderr else f"Process exited with code {process.returncode}"
-                print(f"ERROR: Task {task_id} failed: {error_message}")
-        except subprocess.TimeoutExpired:
-            process.kill()
-            stdout, stderr = process.communicate()
-            status = "failed"
-            error_message = f"Task timed out after {DEFAULT_TASK_TIMEOUT} seconds"
-            print(f"ERROR: Task {task_id} timed out")
-        output = f"STDOUT:\n{stdout}\n\nSTDERR:\n{stderr}" if stderr else stdout
-        update_task_execution(tasks_db_path, execution_id, status, error_message, output)
-        timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        update_task_last_run(tasks_db_path, task_id, timestamp)
-    except Exception as e:
-        print(f"ERROR: Error executing task {task_id}: {str(e)}")
-        error_message = traceback.format_exc()
-        update_task_execution(tasks_db_path, execution_id, "failed", error_message)
-        timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-        update_task_last_run(tasks_db_path, task_id, timestamp)
+                run_subprocess(task["command"], log)
+            status, error_message = "success", None
+            print(f"INFO: Task {task_id} completed successfully")
+        except Exception as e:
+            status, error_message = "failed", f"{e}\n{traceback.format_exc()}"
+            print(f"ERROR: Task {task_id} failed: {e}")
+        finally:
+            stdout_router.unroute(stdout_token)
+            stderr_router.unroute(stderr_token)
+            log.flush()
+            # anything escaping above (SystemExit, KeyboardInterrupt) must still close the row, or
+            # claim_execution would skip this task until the next restart
+            finish_task_execution(tasks_db_path, execution_id, status, error_message)
+            update_task_last_run(tasks_db_path, task_id, datetime.now().strftime("%Y-%m-%dT%H:%M:%S"))
+        return produced if status == "success" else None
+    finally:
+        if stage is not None:
+            stage.slots.release()
+
+
+class PipelineWorker:
+    """
+    Long-lived executor for scheduled tasks.
+
+    The thread pool lives as long as the scheduler, so stages reuse the
+    modules (and clients) they imported on their first run. When a stage
+    produces new items, the enabled tasks of its dependent stages are queued
+    at once instead of waiting for their own interval; a task that is
+    already running when that happens is queued for one more run after it
+    finishes.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self._lock = threading.Lock()
+        self._active = {}
+
+    def submit(self, task, reason="schedule"):
+        with self._lock:
+            if task["id"] in self._active:
+                if reason == "upstream":
+                    self._active[task["id"]] = True
+                return False
+            self._active[task["id"]] = False
+        print(f"INFO: Queued task {task['id']}: {task['name']} ({reason})")
+        self.executor.submit(self._run, task)
+        return True
+
+    def _run(self, task):
+        produced = None
+        try:
+            produced = execute_task(task)
+        except Exception as e:
+            print(f"ERROR: Error executing task {task['id']}: {str(e)}")
+        finally:
+            with self._lock:
+                rerun = self._active.pop(task["id"], False)
+        stage = stage_for_task(task)
+        if produced and stage is not None:
+            print(f"INFO: Stage {stage.name} produced {produced} new items, triggering downstream stages")
+            self.trigger_dependents(stage.name)
+        if rerun and running:
+            self.submit(task, "upstream")
+
+    def trigger_dependents(self, stage_name):
+        names = set(dependents(stage_name))
+        if not names:
+            return
+        for task in get_all_tasks(get_tasks_db_path()) or []:
+            stage = stage_for_task(task)
+            if stage is not None and stage.name in names:
+                self.submit(task, "upstream")
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+worker = None
 
 
 def check_for_tasks():
@@ -138,12 +318,9 @@ def check_for_tasks():
             print("DEBUG: No pending tasks found")
             return
         print(f"INFO: Found {len(pending_tasks)} pending tasks")
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            for task in pending_tasks:
-                task_id = task["id"]
-                command = task["command"]
-                print(f"INFO: Scheduling task {task_id}: {task['name']} (Last run: {task['last_run']})")
-                executor.submit(execute_task, task_id, command)
+        for task in pending_tasks:
+            print(f"INFO: Scheduling task {task['id']}: {task['name']} (Last run: {task['last_run']})")
+            worker.submit(task)
     except Exception as e:
         print(f"ERROR: Error in check_for_tasks: {str(e)}")
         print(f"ERROR: {traceback.format_exc()}")
@@ -169,7 +346,9 @@ def signal_handler(sig, frame):
 
 
 def main():
-    global running
+    global running, worker
+    sys.stdout, sys.stderr = stdout_router, stderr_router
+    worker = PipelineWorker()
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     print("INFO: Starting task scheduler")
@@ -198,6 +377,7 @@ def main():
         print("INFO: Scheduler interrupted")
     finally:
         scheduler.shutdown()
+        worker.shutdown()
         print("INFO: Scheduler shutdown complete")
 
 
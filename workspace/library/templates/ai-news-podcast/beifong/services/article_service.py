@@ -1,7 +1,10 @@
+import asyncio
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 import json
 from services.db_service import tracking_db, sources_db
+from db.fts import ARTICLES_FTS, ARTICLES_RANK, build_match_query, has_fts
+from db.hydration import hydrate_articles
 from models.article_schemas import Article, PaginatedArticles
 
 
@@ -52,7 +55,13 @@ class ArticleService:
             if date_to:
                 query_parts.append("AND datetime(ca.published_date) <= datetime(?)")
                 query_params.append(date_to)
-            if search:
+            match = build_match_query(search.split(), operator="AND") if search else None
+            use_fts = match is not None and has_fts(tracking_db.db_path, ARTICLES_FTS)
+            if use_fts:
+                query_parts[1] = f"FROM {ARTICLES_FTS} JOIN crawled_articles ca ON ca.id = {ARTICLES_FTS}.rowid"
+                query_parts.append(f"AND {ARTICLES_FTS} MATCH ?")
+                query_params.append(match)
+            elif search:
                 query_parts.append("AND (ca.title LIKE ? OR ca.summary LIKE ?)")
                 search_param = f"%{search}%"
                 query_params.extend([search_param, search_param])
@@ -62,28 +71,17 @@ class ArticleService:
             )
             total_articles = await tracking_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
             total_count = total_articles.get("COUNT(*)", 0) if total_articles else 0
-            query_parts.append("ORDER BY datetime(ca.published_date) DESC, ca.id DESC")
+            if use_fts:
+                query_parts.append(f"ORDER BY {ARTICLES_RANK}, datetime(ca.published_date) DESC, ca.id DESC")
+            else:
+                query_parts.append("ORDER BY datetime(ca.published_date) DESC, ca.id DESC")
             query_parts.append("LIMIT ? OFFSET ?")
             query_params.extend([per_page, offset])
             articles_query = " ".join(query_parts)
             articles = await tracking_db.execute_query(articles_query, tuple(query_params), fetch=True)
-            feed_ids = [article["feed_id"] for article in articles if article.get("feed_id")]
-            source_names = {}
-            if feed_ids:
-                feed_ids_str = ",".join("?" for _ in feed_ids)
-                source_query = f"""
-                SELECT sf.id as feed_id, s.name as source_name
-                FROM source_feeds sf
-                JOIN sources s ON sf.source_id = s.id
-                WHERE sf.id IN ({feed_ids_str})
-                """
-                sources_result = await sources_db.execute_query(source_query, tuple(feed_ids), fetch=True)
-                source_names = {item["feed_id"]: item["source_name"] for item in sources_result}
+            await asyncio.to_thread(hydrate_articles, articles, tracking_db.db_path, sources_db.db_path)
             for article in articles:
-                feed_id = article.get("feed_id")
-                article["source_name"] = source_names.get(feed_id, "Unknown Source")
                 article.pop("feed_id", None)
-                article["categories"] = await self.get_article_categories(article["id"])
             total_pages = (total_count + per_page - 1) // per_page if total_count > 0 else 0
             has_next = page < total_pages
             has_prev = page > 1
@@ -113,27 +111,13 @@ class ArticleService:
             article = await tracking_db.execute_query(article_query, (article_id,), fetch=True, fetch_one=True)
             if not article:
                 raise HTTPException(status_code=404, detail="Article not found")
-            if article.get("feed_id"):
-                source_query = """
-                SELECT s.name as source_name
-                FROM source_feeds sf
-                JOIN sources s ON sf.source_id = s.id
-                WHERE sf.id = ?
-                """
-                source_result = await sources_db.execute_query(source_query, (article["feed_id"],), fetch=True, fetch_one=True)
-                if source_result:
-                    article["source_name"] = source_result["source_name"]
-                else:
-                    article["source_name"] = "Unknown Source"
-            else:
-                article["source_name"] = "Unknown Source"
+            await asyncio.to_thread(hydrate_articles, [article], tracking_db.db_path, sources_db.db_path)
             article.pop("feed_id", None)
             if article.get("metadata"):
                 try:
                     article["metadata"] = json.loads(article["metadata"])
                 except json.JSONDecodeError:
                     article["metadata"] = {}
-            article["categories"] = await self.get_article_categories(article_id)
             return article
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -9,6 +9,7 @@ from redis.asyncio import ConnectionPool, Redis
 from db.config import get_agent_session_db_path
 from db.agent_config_v2 import PODCAST_DIR, PODCAST_AUIDO_DIR, PODCAST_IMG_DIR, PODCAST_RECORDINGS_DIR, AVAILABLE_LANGS
 from services.celery_tasks import agent_chat
+from services.task_events import stream_events
 from dotenv import load_dotenv
 from services.internal_session_service import SessionService
 
@@ -97,6 +98,11 @@ class PodcastAgentService:
                 },
             )
 
+    async def task_events(self, session_id, task_id=None):
+        """Stage and progress events for the session's task, ending with its ``result`` event (replaces polling ``/status``)."""
+        async for event in stream_events(self.redis, session_id, task_id):
+            yield event
+
     def _browser_recording(self, session_id):
         try:
             recordings_dir = os.path.join("podcasts/recordings", session_id)
@@ -238,10 +244,10 @@ class PodcastAgentService:
                 ) as cursor:
                     rows = await cursor.fetchall()
                     sessions = []
+                    states = SessionService.get_sessions([row["session_id"] for row in rows])
                     for row in rows:
                         try:
-                            session = SessionService.get_session(row["session_id"])
-                            session_state = session.get("state", {})
+                            session_state = states.get(row["session_id"], {}).get("state", {})
                             title = session_state.get("title", "Untitled Podcast")
                             stage = session_state.get("stage", "welcome")
                             updated_at = row["updated_at"]
@@ -1,9 +1,12 @@
 from celery import Celery, Task
+from celery.signals import worker_init, worker_shutdown
 import redis
 import os
+import sys
 import time
 import json
 from dotenv import load_dotenv
+from services.task_events import publish_event, task_context
 
 
 load_dotenv()
@@ -14,6 +17,7 @@ REDIS_DB = int(os.environ.get("REDIS_DB", 0))
 REDIS_LOCK_EXP_TIME_SEC = 60 * 10
 REDIS_LOCK_INFO_EXP_TIME_SEC = 60 * 15
 STALE_LOCK_THRESHOLD_SEC = 60 * 15
+KOKORO_PRELOAD = [code.strip() for code in os.environ.get("KOKORO_PRELOAD", "").split(",") if code.strip()]
 
 redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB + 1)
 
@@ -29,6 +33,23 @@ app.conf.update(
 )
 
 
+@worker_init.connect
+def preload_tts_pipelines(**kwargs):
+    # the worker runs a thread pool, so pipelines loaded here are the ones every task reuses
+    if KOKORO_PRELOAD:
+        from utils.text_to_audio_kokoro import kokoro_pool
+
+        kokoro_pool.preload(KOKORO_PRELOAD)
+
+
+@worker_shutdown.connect
+def close_browsers(**kwargs):
+    # only if a scrape started the shared browser; importing the module would pull in playwright
+    browser_crawler = sys.modules.get("tools.browser_crawler")
+    if browser_crawler is not None:
+        browser_crawler.shutdown_browser_services()
+
+
 class SessionLockedTask(Task):
     def __call__(self, *args, **kwargs):
         session_id = args[0] if args else kwargs.get("session_id")
@@ -53,7 +74,7 @@ class SessionLockedTask(Task):
             redis_client.set(f"lock_info:{session_id}", json.dumps(lock_data), ex=REDIS_LOCK_INFO_EXP_TIME_SEC)
 
         if not acquired:
-            return {
+            busy = {
                 "error": "Session busy",
                 "response": "This session is already processing a message. Please wait.",
                 "session_id": session_id,
@@ -62,6 +83,9 @@ class SessionLockedTask(Task):
                 "is_processing": True,
                 "process_type": "chat",
             }
+            with task_context(self.request.id if hasattr(self, "request") else None):
+                publish_event(session_id, "result", result=busy)
+            return busy
 
         try:
             return super().__call__(*args, **kwargs)
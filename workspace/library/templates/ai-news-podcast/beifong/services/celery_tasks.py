@@ -4,6 +4,7 @@ from agno.storage.sqlite import SqliteStorage
 import os
 from dotenv import load_dotenv
 from services.celery_app import app, SessionLockedTask
+from services.task_events import publish_event, task_context
 from db.config import get_agent_session_db_path
 from db.agent_config_v2 import (
     AGENT_DESCRIPTION,
@@ -28,6 +29,14 @@ db_file = get_agent_session_db_path()
 
 @app.task(bind=True, max_retries=0, base=SessionLockedTask)
 def agent_chat(self, session_id, message):
+    with task_context(self.request.id):
+        publish_event(session_id, "started", stage="processing")
+        result = run_agent_chat(session_id, message)
+        publish_event(session_id, "result", result=result)
+        return result
+
+
+def run_agent_chat(session_id, message):
     try:
         print(f"Processing message for session {session_id}: {message[:50]}...")
         db_file = get_agent_session_db_path()
@@ -5,6 +5,7 @@ import time
 from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
 from services.db_service import get_db_path
+from db.fts import ensure_articles_fts, ensure_posts_fts
 
 
 @contextmanager
@@ -21,6 +22,15 @@ def db_connection(db_path):
         conn.close()
 
 
+def add_missing_columns(cursor, table, columns):
+    """Bring tables created by older versions up to date; CREATE TABLE IF NOT EXISTS won't add columns."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    existing = {row[1] for row in cursor.fetchall()}
+    for name, definition in columns:
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {definition}")
+
+
 def init_sources_db():
     start_time = time.time()
     db_path = get_db_path("sources_db")
@@ -90,9 +100,25 @@ def init_tracking_db():
             last_processed TIMESTAMP,
             last_etag TEXT,
             last_modified TEXT,
-            entry_hash TEXT
+            entry_hash TEXT,
+            next_due_at TIMESTAMP,
+            poll_interval INTEGER,
+            consecutive_unchanged INTEGER DEFAULT 0,
+            consecutive_failures INTEGER DEFAULT 0,
+            last_status TEXT
         )
         """)
+        add_missing_columns(
+            cursor,
+            "feed_tracking",
+            [
+                ("next_due_at", "TIMESTAMP"),
+                ("poll_interval", "INTEGER"),
+                ("consecutive_unchanged", "INTEGER DEFAULT 0"),
+                ("consecutive_failures", "INTEGER DEFAULT 0"),
+                ("last_status", "TEXT"),
+            ],
+        )
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS feed_entries (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -129,9 +155,24 @@ def init_tracking_db():
             crawled_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             processed BOOLEAN DEFAULT 0,
             embedding_status TEXT DEFAULT NULL,
+            canonical_url TEXT,
+            duplicate_of INTEGER,
             FOREIGN KEY (entry_id) REFERENCES feed_entries(id)
         )
         """)
+        add_missing_columns(cursor, "crawled_articles", [("canonical_url", "TEXT"), ("duplicate_of", "INTEGER")])
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS article_fingerprints (
+            article_id INTEGER PRIMARY KEY,
+            content_hash TEXT,
+            simhash INTEGER,
+            band0 INTEGER,
+            band1 INTEGER,
+            band2 INTEGER,
+            band3 INTEGER,
+            FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
+        )
+        """)
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS article_categories (
             article_id INTEGER,
@@ -151,6 +192,14 @@ def init_tracking_db():
             FOREIGN KEY (article_id) REFERENCES crawled_articles(id)
         )
         """)
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS embedding_cache (
+            content_hash TEXT PRIMARY KEY,
+            embedding BLOB NOT NULL,
+            embedding_model TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """)
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_feed_entries_feed_id ON feed_entries(feed_id)",
             "CREATE INDEX IF NOT EXISTS idx_feed_entries_link ON feed_entries(link)",
@@ -164,9 +213,18 @@ def init_tracking_db():
             "CREATE INDEX IF NOT EXISTS idx_article_embeddings_article_id ON article_embeddings(article_id)",
             "CREATE INDEX IF NOT EXISTS idx_article_embeddings_in_faiss ON article_embeddings(in_faiss_index)",
             "CREATE INDEX IF NOT EXISTS idx_crawled_articles_embedding_status ON crawled_articles(embedding_status)",
+            "CREATE INDEX IF NOT EXISTS idx_feed_tracking_next_due_at ON feed_tracking(next_due_at)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_published_date ON crawled_articles(published_date)",
+            "CREATE INDEX IF NOT EXISTS idx_crawled_articles_canonical_url ON crawled_articles(canonical_url)",
+            "CREATE INDEX IF NOT EXISTS idx_article_fingerprints_content_hash ON article_fingerprints(content_hash)",
+            "CREATE INDEX IF NOT EXISTS idx_article_fingerprints_band0 ON article_fingerprints(band0)",
+            "CREATE INDEX IF NOT EXISTS idx_article_fingerprints_band1 ON article_fingerprints(band1)",
+            "CREATE INDEX IF NOT EXISTS idx_article_fingerprints_band2 ON article_fingerprints(band2)",
+            "CREATE INDEX IF NOT EXISTS idx_article_fingerprints_band3 ON article_fingerprints(band3)",
         ]
         for index_sql in indexes:
             cursor.execute(index_sql)
+        ensure_articles_fts(cursor)
         conn.commit()
     elapsed = time.time() - start_time
     print(f"Tracking database initialized in {elapsed:.3f}s")
@@ -288,9 +346,20 @@ def init_internal_sessions_db():
         CREATE TABLE IF NOT EXISTS session_state (
             session_id TEXT PRIMARY KEY,
             state JSON,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            version INTEGER DEFAULT 0,
+            updated_at TIMESTAMP
         )
         """)
+        add_missing_columns(cursor, "session_state", [("version", "INTEGER DEFAULT 0"), ("updated_at", "TIMESTAMP")])
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS session_state_fields (
+            session_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (session_id, key)
+        ) WITHOUT ROWID
+        """)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_session_state_session_id ON session_state(session_id)")
         conn.commit()
     elapsed = time.time() - start_time
@@ -305,7 +374,8 @@ def init_social_media_db():
         cursor.execute("BEGIN TRANSACTION")
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS posts (
-            post_id TEXT PRIMARY KEY,
+            id INTEGER PRIMARY KEY,
+            post_id TEXT NOT NULL UNIQUE,
             platform TEXT,
             user_display_name TEXT,
             user_handle TEXT,
@@ -339,6 +409,7 @@ def init_social_media_db():
         ]
         for index_sql in indexes:
             cursor.execute(index_sql)
+        ensure_posts_fts(cursor)
         conn.commit()
     elapsed = time.time() - start_time
     print(f"Social media database initialized in {elapsed:.3f}s")
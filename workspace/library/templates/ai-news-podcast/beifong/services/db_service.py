@@ -1,9 +1,44 @@
 import os
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Any, Tuple, Union
 from fastapi import HTTPException
 from contextlib import contextmanager
-import sqlite3
 from db.config import get_db_path
+from db.pool import get_pool
+
+DB_READ_WORKERS = int(os.environ.get("DB_READ_WORKERS", 16))
+_read_executor = ThreadPoolExecutor(max_workers=DB_READ_WORKERS, thread_name_prefix="db-read")
+
+
+class _QueryHandle:
+    """Tracks the connection a query is running on so a cancelled request can interrupt it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self.cancelled = False
+
+    def bind(self, func):
+        def run(conn):
+            with self._lock:
+                if self.cancelled:
+                    raise asyncio.CancelledError()
+                self._conn = conn
+            try:
+                return func(conn)
+            finally:
+                with self._lock:
+                    self._conn = None
+
+        return run
+
+    def cancel(self, interrupt: bool):
+        with self._lock:
+            self.cancelled = True
+            if interrupt and self._conn is not None:
+                self._conn.interrupt()
 
 
 @contextmanager
@@ -11,12 +46,8 @@ def db_connection(db_path: str):
     """Context manager for database connections."""
     if not os.path.exists(db_path):
         raise HTTPException(status_code=404, detail=f"Database {db_path} not found. Initialize the database first.")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    with get_pool(db_path).connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 class DatabaseService:
@@ -30,41 +61,72 @@ class DatabaseService:
             db_name: Name of the database (sources_db, tracking_db, etc.)
         """
         self.db_path = get_db_path(db_name)
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-write-{db_name}")
 
-    async def execute_query(
-        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
-    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
-        """Execute a query with error handling for FastAPI."""
+    def _run(self, func):
+        """Run ``func(conn)`` on a pooled connection, retrying while the database is busy."""
         try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-
-                if fetch_one:
-                    result = cursor.fetchone()
-                    return dict(result) if result else None
-                elif fetch:
-                    return [dict(row) for row in cursor.fetchall()]
-                else:
-                    conn.commit()
-                    return cursor.lastrowid
+            if not os.path.exists(self.db_path):
+                raise HTTPException(status_code=404, detail=f"Database {self.db_path} not found. Initialize the database first.")
+            return get_pool(self.db_path).run_with_retry(func)
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    async def execute_write_many(self, query: str, params_list: List[Tuple]) -> int:
-        """Execute multiple write operations in a single transaction."""
+    async def _submit(self, func, write: bool):
+        """
+        Run a database job off the event loop.
+
+        Reads share a thread pool and run concurrently against the WAL database;
+        writes for this database are funnelled through a single writer thread so
+        they queue up instead of contending for the file lock. If the awaiting
+        request is cancelled (e.g. the client disconnected) a queued job is
+        dropped and a running read is interrupted.
+        """
+        handle = _QueryHandle()
+        executor = self._write_executor if write else _read_executor
+        loop = asyncio.get_running_loop()
         try:
-            with db_connection(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.executemany(query, params_list)
+            return await loop.run_in_executor(executor, self._run, handle.bind(func))
+        except asyncio.CancelledError:
+            handle.cancel(interrupt=not write)
+            raise
+
+    async def execute_query(
+        self, query: str, params: Tuple = (), fetch: bool = False, fetch_one: bool = False
+    ) -> Union[List[Dict[str, Any]], Dict[str, Any], int]:
+        """Execute a query with error handling for FastAPI."""
+
+        def run(conn):
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+
+            if fetch_one:
+                result = cursor.fetchone()
+                return dict(result) if result else None
+            elif fetch:
+                return [dict(row) for row in cursor.fetchall()]
+            else:
                 conn.commit()
-                return cursor.rowcount
-        except Exception as e:
-            if isinstance(e, HTTPException):
-                raise e
-            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+                return cursor.lastrowid
+
+        return await self._submit(run, write=not (fetch or fetch_one))
+
+    async def execute_write_many(self, query: str, params_list: List[Tuple]) -> int:
+        """Execute multiple write operations in a single transaction."""
+
+        def run(conn):
+            cursor = conn.cursor()
+            cursor.executemany(query, params_list)
+            conn.commit()
+            return cursor.rowcount
+
+        return await self._submit(run, write=True)
+
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Connection pool counters for this database."""
+        return get_pool(self.db_path).metrics()
 
 
 
@@ -1,23 +1,18 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from fastapi import HTTPException
-import json
-from datetime import datetime
 from db.config import get_db_path
 from db.agent_config_v2 import INITIAL_SESSION_STATE
-import sqlite3
+from db.pool import get_pool
+from services import session_state_store
+from services.task_events import publish_event
 from contextlib import contextmanager
 
 
 @contextmanager
 def get_db_connection(db_name: str):
-    """Get a fresh database connection each time."""
-    db_path = get_db_path(db_name)
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
+    """Check out a pooled connection for the named database."""
+    with get_pool(get_db_path(db_name)).connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
 class SessionService:
@@ -26,65 +21,48 @@ class SessionService:
     @staticmethod
     def get_session(session_id: str) -> Dict[str, Any]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                query = """
-                SELECT session_id, state, created_at
-                FROM session_state
-                WHERE session_id = ?
-                """
-                cursor.execute(query, (session_id,))
-                session = cursor.fetchone()
-                if not session:
-                    return SessionService._initialize_session(session_id)
-                session_dict = dict(session)
-                if session_dict.get("state"):
-                    try:
-                        session_dict["state"] = json.loads(session_dict["state"])
-                    except json.JSONDecodeError:
-                        session_dict["state"] = {}
-                return session_dict
+            return session_state_store.load_session(session_id, INITIAL_SESSION_STATE).as_dict()
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
             raise HTTPException(status_code=500, detail=f"Error fetching session: {str(e)}")
 
     @staticmethod
-    def _initialize_session(session_id: str) -> Dict[str, Any]:
+    def get_sessions(session_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Sessions by id in one round trip, for listings; unlike ``get_session`` unknown ids are skipped, not created."""
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                state_json = json.dumps(INITIAL_SESSION_STATE)
-                insert_query = """
-                INSERT INTO session_state (session_id, state, created_at)
-                VALUES (?, ?, ?)
-                """
-                current_time = datetime.now().isoformat()
-                cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
-                return {"session_id": session_id, "state": INITIAL_SESSION_STATE, "created_at": current_time}
+            return {session_id: entry.as_dict() for session_id, entry in session_state_store.load_sessions(session_ids).items()}
         except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error initializing session: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Error fetching sessions: {str(e)}")
 
     @staticmethod
-    def save_session(session_id: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    def save_session(session_id: str, state: Dict[str, Any], version: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Persist ``state``, read from ``get_session`` at ``version``.
+
+        Only the changes made since that read are written, so concurrent
+        writers' updates to other keys are kept.
+        """
         try:
-            state_json = json.dumps(state)
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                conn.execute("BEGIN IMMEDIATE")
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if existing_session:
-                    update_query = "UPDATE session_state SET state = ? WHERE session_id = ?"
-                    cursor.execute(update_query, (state_json, session_id))
-                else:
-                    insert_query = "INSERT INTO session_state (session_id, state, created_at) VALUES (?, ?, ?)"
-                    current_time = datetime.now().isoformat()
-                    cursor.execute(insert_query, (session_id, state_json, current_time))
-                conn.commit()
-            return SessionService.get_session(session_id)
+            entry = session_state_store.save_state(session_id, state, INITIAL_SESSION_STATE, version)
+            session = entry.as_dict()
+            publish_event(session_id, "stage", stage=session["state"].get("stage"), session_state=entry.state_json())
+            return session
+        except session_state_store.VersionConflict as e:
+            raise HTTPException(status_code=409, detail=f"Error saving session: {str(e)}")
+        except Exception as e:
+            if isinstance(e, HTTPException):
+                raise e
+            raise HTTPException(status_code=500, detail=f"Error saving session: {str(e)}")
+
+    @staticmethod
+    def patch_session(session_id: str, ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply JSON-patch ``add``/``replace``/``remove`` operations, e.g. ``{"op": "replace", "path": "/stage", "value": "script"}``."""
+        try:
+            entry = session_state_store.patch_session(session_id, ops, INITIAL_SESSION_STATE)
+            session = entry.as_dict()
+            publish_event(session_id, "stage", stage=session["state"].get("stage"), session_state=entry.state_json())
+            return session
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
@@ -93,17 +71,9 @@ class SessionService:
     @staticmethod
     def delete_session(session_id: str) -> Dict[str, str]:
         try:
-            with get_db_connection("internal_sessions_db") as conn:
-                cursor = conn.cursor()
-                existing_query = "SELECT session_id FROM session_state WHERE session_id = ?"
-                cursor.execute(existing_query, (session_id,))
-                existing_session = cursor.fetchone()
-                if not existing_session:
-                    raise HTTPException(status_code=404, detail="Session not found")
-                delete_query = "DELETE FROM session_state WHERE session_id = ?"
-                cursor.execute(delete_query, (session_id,))
-                conn.commit()
-                return {"message": f"Session with ID {session_id} successfully deleted"}
+            if not session_state_store.delete_session(session_id):
+                raise HTTPException(status_code=404, detail="Session not found")
+            return {"message": f"Session with ID {session_id} successfully deleted"}
         except Exception as e:
             if isinstance(e, HTTPException):
                 raise e
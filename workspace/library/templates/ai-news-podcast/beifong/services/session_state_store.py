@@ -0,0 +1,425 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import redis
+from db.config import get_db_path
+from db.pool import get_pool
+from services.task_events import REDIS_DB, REDIS_HOST, REDIS_PORT
+
+INVALIDATION_CHANNEL = "session_state_invalidate"
+MAX_SAVE_ATTEMPTS = 5
+LISTENER_RETRY_SEC = 5
+SESSION_LOOKUP_CHUNK = 500
+SESSION_CACHE_SIZE = int(os.environ.get("SESSION_CACHE_SIZE", "512"))
+
+
+class VersionConflict(Exception):
+    """The session was written by someone else since it was read."""
+
+
+def _escape(key: str) -> str:
+    return key.replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def split_path(path: str) -> List[str]:
+    return [_unescape(token) for token in path.lstrip("/").split("/")] if path not in ("", "/") else []
+
+
+def diff_state(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[Dict[str, Any]]:
+    """JSON-patch (RFC 6902 ``add``/``replace``/``remove``) operations turning ``old`` into ``new``; nested objects are diffed key by key."""
+    ops = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        key_path = f"{path}/{_escape(key)}"
+        if key not in old:
+            ops.append({"op": "add", "path": key_path, "value": value})
+        elif isinstance(old[key], dict) and isinstance(value, dict):
+            ops.extend(diff_state(old[key], value, key_path))
+        elif old[key] != value:
+            ops.append({"op": "replace", "path": key_path, "value": value})
+    return ops
+
+
+def apply_patch(state: Dict[str, Any], ops: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply ``add``/``replace``/``remove`` operations to ``state`` in place; missing parents are created, missing targets of ``remove`` ignored."""
+    for op in ops:
+        tokens = split_path(op["path"])
+        if not tokens:
+            if op["op"] == "remove":
+                state.clear()
+            else:
+                state.clear()
+                state.update(op["value"])
+            continue
+        parent = state
+        for token in tokens[:-1]:
+            if isinstance(parent, list):
+                parent = parent[int(token)]
+            else:
+                if not isinstance(parent.get(token), (dict, list)):
+                    parent[token] = {}
+                parent = parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            if op["op"] == "remove":
+                if int(last) < len(parent):
+                    del parent[int(last)]
+            elif last == "-":
+                parent.append(op["value"])
+            elif op["op"] == "add":
+                parent.insert(int(last), op["value"])
+            else:
+                parent[int(last)] = op["value"]
+        elif op["op"] == "remove":
+            parent.pop(last, None)
+        elif op["op"] in ("add", "replace"):
+            parent[last] = op["value"]
+        else:
+            raise ValueError(f"Unsupported session patch operation: {op['op']}")
+    return state
+
+
+class StoredSession:
+    """
+    One session as persisted: top-level state keys mapped to their JSON text.
+
+    Instances are never mutated once built, so cached ones can be shared
+    between threads; ``state()`` parses a fresh copy for callers to modify.
+    """
+
+    __slots__ = ("session_id", "created_at", "version", "fields", "legacy")
+
+    def __init__(self, session_id: str, created_at: Optional[str], version: int, fields: Dict[str, str], legacy: bool = False):
+        self.session_id = session_id
+        self.created_at = created_at
+        self.version = version
+        self.fields = fields
+        self.legacy = legacy
+
+    def state(self) -> Dict[str, Any]:
+        return {key: json.loads(value) for key, value in self.fields.items()}
+
+    def state_json(self) -> str:
+        return "{" + ", ".join(f"{json.dumps(key)}: {value}" for key, value in self.fields.items()) + "}"
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"session_id": self.session_id, "state": self.state(), "created_at": self.created_at, "version": self.version}
+
+
+class SessionCache:
+    """
+    Per-process read-through LRU cache of ``StoredSession`` entries.
+
+    At most ``max_entries`` sessions (``SESSION_CACHE_SIZE``) are kept, the
+    least recently used one being evicted first, so long-lived workers do not
+    hold every session they ever read. A background thread subscribes to
+    ``INVALIDATION_CHANNEL`` and drops entries other processes have written
+    past. The cache only serves reads while that subscription is live, so
+    without Redis every read goes to SQLite; writes are version-checked
+    either way.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, StoredSession]" = OrderedDict()
+        self.max_entries = max_entries
+        self._pid = None
+        self._publisher = None
+        self.enabled = False
+
+    def _ensure_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._entries = OrderedDict()
+            self._publisher = None
+            self.enabled = False
+            threading.Thread(target=self._listen, name="session-cache-invalidation", daemon=True).start()
+
+    def _listen(self):
+        while True:
+            try:
+                client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB + 1)
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATION_CHANNEL)
+                self.clear()
+                self.enabled = True
+                for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = json.loads(message["data"])
+                    self.invalidate(data["session_id"], data.get("version"))
+            except Exception as e:
+                self.enabled = False
+                self.clear()
+                print(f"WARNING: Session cache invalidation unavailable ({e}), reading sessions from SQLite")
+                time.sleep(LISTENER_RETRY_SEC)
+
+    def get(self, session_id: str) -> Optional[StoredSession]:
+        self._ensure_listener()
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+            return entry
+
+    def put(self, entry: StoredSession) -> None:
+        self._ensure_listener()
+        if not self.enabled:
+            return
+        with self._lock:
+            current = self._entries.get(entry.session_id)
+            if current is None or current.version <= entry.version:
+                self._entries[entry.session_id] = entry
+            self._entries.move_to_end(entry.session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, session_id: str, version: Optional[int] = None) -> None:
+        """Drop ``session_id`` unless the cached entry is already at ``version``; no version drops it regardless."""
+        with self._lock:
+            current = self._entries.get(session_id)
+            if current is not None and (version is None or current.version < version):
+                del self._entries[session_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+
+    def publish(self, session_id: str, version: Optional[int]) -> None:
+        try:
+            if self._publisher is None:
+                self._publisher = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB + 1)
+            self._publisher.publish(INVALIDATION_CHANNEL, json.dumps({"session_id": session_id, "version": version}))
+        except Exception as e:
+            print(f"WARNING: Could not publish session invalidation for {session_id}: {e}")
+
+
+session_cache = SessionCache()
+
+
+class ReadSnapshots:
+    """
+    The last ``max_entries`` session versions this process handed out, kept so a save can be diffed against what its caller read.
+
+    Unlike ``SessionCache`` this works without Redis and keeps superseded
+    versions, since a caller may save long after another writer moved on.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE):
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], StoredSession]" = OrderedDict()
+        self.max_entries = max_entries
+
+    def remember(self, entry: StoredSession) -> None:
+        key = (entry.session_id, entry.version)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, session_id: str, version: int) -> Optional[StoredSession]:
+        with self._lock:
+            return self._entries.get((session_id, version))
+
+
+read_snapshots = ReadSnapshots()
+
+
+def _pool():
+    return get_pool(get_db_path("internal_sessions_db"))
+
+
+def _load(conn, session_ids: List[str]) -> Dict[str, StoredSession]:
+    sessions: Dict[str, StoredSession] = {}
+    blobs: Dict[str, Optional[str]] = {}
+    cursor = conn.cursor()
+    for start in range(0, len(session_ids), SESSION_LOOKUP_CHUNK):
+        chunk = session_ids[start : start + SESSION_LOOKUP_CHUNK]
+        placeholders = ",".join(["?"] * len(chunk))
+        cursor.execute(f"SELECT session_id, state, created_at, version FROM session_state WHERE session_id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            sessions[row["session_id"]] = StoredSession(row["session_id"], row["created_at"], row["version"] or 0, {})
+            blobs[row["session_id"]] = row["state"]
+        cursor.execute(f"SELECT session_id, key, value FROM session_state_fields WHERE session_id IN ({placeholders})", chunk)
+        for row in cursor.fetchall():
+            if row["session_id"] in sessions:
+                sessions[row["session_id"]].fields[row["key"]] = row["value"]
+    for session_id, entry in sessions.items():
+        blob = blobs.get(session_id)
+        if not entry.fields and blob:
+            # written before state was stored per key; migrated on its next save
+            try:
+                state = json.loads(blob)
+            except json.JSONDecodeError:
+                state = {}
+            entry.fields = {key: json.dumps(value) for key, value in (state if isinstance(state, dict) else {}).items()}
+            entry.legacy = True
+    return sessions
+
+
+def load_sessions(session_ids: Iterable[str]) -> Dict[str, StoredSession]:
+    """Stored sessions by id, from the cache where possible and one round trip for the rest; unknown ids are left out."""
+    session_ids = list(dict.fromkeys(session_ids))
+    found: Dict[str, StoredSession] = {}
+    missing = []
+    for session_id in session_ids:
+        entry = session_cache.get(session_id)
+        if entry is not None:
+            found[session_id] = entry
+        else:
+            missing.append(session_id)
+    if missing:
+        with _pool().connection() as conn:
+            loaded = _load(conn, missing)
+        for entry in loaded.values():
+            session_cache.put(entry)
+        found.update(loaded)
+    for entry in found.values():
+        read_snapshots.remember(entry)
+    return found
+
+
+def load_session(session_id: str, initial_state: Optional[Dict[str, Any]] = None) -> StoredSession:
+    """The stored session, created with ``initial_state`` if it does not exist yet."""
+    entry = load_sessions([session_id]).get(session_id)
+    if entry is not None:
+        return entry
+    fields = {key: json.dumps(value) for key, value in (initial_state or {}).items()}
+    created_at = datetime.now().isoformat()
+    with _pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            "INSERT OR IGNORE INTO session_state (session_id, state, created_at, version, updated_at) VALUES (?, NULL, ?, 0, ?)",
+            (session_id, created_at, created_at),
+        )
+        if cursor.rowcount:
+            conn.executemany(
+                "INSERT OR REPLACE INTO session_state_fields (session_id, key, value) VALUES (?, ?, ?)",
+                [(session_id, key, value) for key, value in fields.items()],
+            )
+            conn.commit()
+            entry = StoredSession(session_id, created_at, 0, fields)
+        else:
+            conn.rollback()
+            entry = _load(conn, [session_id])[session_id]
+    session_cache.put(entry)
+    read_snapshots.remember(entry)
+    return entry
+
+
+def _write_patch(base: StoredSession, ops: List[Dict[str, Any]]) -> StoredSession:
+    paths = [split_path(op["path"]) for op in ops]
+    touched = None if any(not tokens for tokens in paths) else {tokens[0] for tokens in paths}
+    state = apply_patch(base.state(), ops)
+    fields = dict(base.fields)
+    for key in list(fields) if touched is None else touched:
+        if key not in state:
+            fields.pop(key, None)
+    for key in state if touched is None else touched:
+        if key in state:
+            fields[key] = json.dumps(state[key])
+    changed = fields if base.legacy else {key: value for key, value in fields.items() if base.fields.get(key) != value}
+    removed = [key for key in base.fields if key not in fields]
+    if not changed and not removed:
+        return base
+    with _pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute(
+            "UPDATE session_state SET version = version + 1, updated_at = ?, state = NULL WHERE session_id = ? AND version = ?",
+            (datetime.now().isoformat(), base.session_id, base.version),
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
+            raise VersionConflict(base.session_id)
+        conn.executemany(
+            "INSERT OR REPLACE INTO session_state_fields (session_id, key, value) VALUES (?, ?, ?)",
+            [(base.session_id, key, value) for key, value in changed.items()],
+        )
+        conn.executemany("DELETE FROM session_state_fields WHERE session_id = ? AND key = ?", [(base.session_id, key) for key in removed])
+        conn.commit()
+    return StoredSession(base.session_id, base.created_at, base.version + 1, fields)
+
+
+def patch_session(
+    session_id: str,
+    ops: List[Dict[str, Any]],
+    initial_state: Optional[Dict[str, Any]] = None,
+    base: Optional[StoredSession] = None,
+) -> StoredSession:
+    """
+    Apply JSON-patch ``ops`` to a session and persist only the top-level keys they change.
+
+    The write is conditional on the version that was read; if another
+    writer got there first, the session is re-read and the same operations
+    are applied on top of its changes.
+    """
+    if base is None:
+        base = load_session(session_id, initial_state)
+    for _ in range(MAX_SAVE_ATTEMPTS):
+        try:
+            entry = _write_patch(base, ops)
+        except VersionConflict:
+            session_cache.invalidate(session_id)
+            base = load_session(session_id, initial_state)
+            continue
+        if entry is not base:
+            session_cache.put(entry)
+            session_cache.publish(session_id, entry.version)
+            read_snapshots.remember(entry)
+        return entry
+    raise VersionConflict(f"Session {session_id} kept changing while saving; gave up after {MAX_SAVE_ATTEMPTS} attempts")
+
+
+def save_state(
+    session_id: str,
+    state: Dict[str, Any],
+    initial_state: Optional[Dict[str, Any]] = None,
+    version: Optional[int] = None,
+) -> StoredSession:
+    """
+    Persist a full state as the patch from ``version``, the version its caller read.
+
+    Only what the caller changed since that read is written, on top of
+    whatever other writers saved in between, so keys it never touched are
+    not reverted. Raises ``VersionConflict`` when that version is no longer
+    known to this process. Without ``version`` the state is diffed against
+    the current stored session, and the caller's copy wins for every key.
+    """
+    if version is None:
+        base = load_session(session_id, initial_state)
+    else:
+        base = read_snapshots.get(session_id, version)
+        if base is None:
+            base = load_session(session_id, initial_state)
+            if base.version != version:
+                raise VersionConflict(f"Session {session_id} changed since version {version} was read, which is no longer known")
+    return patch_session(session_id, diff_state(base.state(), state), initial_state, base)
+
+
+def delete_session(session_id: str) -> bool:
+    with _pool().connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        cursor = conn.execute("DELETE FROM session_state WHERE session_id = ?", (session_id,))
+        deleted = cursor.rowcount > 0
+        conn.execute("DELETE FROM session_state_fields WHERE session_id = ?", (session_id,))
+        conn.commit()
+    session_cache.invalidate(session_id)
+    session_cache.publish(session_id, None)
+    return deleted
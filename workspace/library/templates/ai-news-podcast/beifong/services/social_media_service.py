@@ -2,6 +2,7 @@ import json
 from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from services.db_service import social_media_db
+from db.fts import POSTS_FTS, POSTS_RANK, build_match_query, has_fts
 from models.social_media_schemas import PaginatedPosts, Post
 from datetime import datetime, timedelta
 
@@ -47,14 +48,27 @@ class SocialMediaService:
             if date_to:
                 query_parts.append("AND datetime(post_timestamp) <= datetime(?)")
                 query_params.append(date_to)
-            if search:
+            match = build_match_query(search.split(), operator="AND") if search else None
+            use_fts = match is not None and has_fts(social_media_db.db_path, POSTS_FTS)
+            select_clause = "SELECT *"
+            if use_fts:
+                select_clause = "SELECT posts.*"
+                query_parts[0] = (
+                    f"{select_clause} FROM posts JOIN (SELECT rowid AS match_rowid, {POSTS_RANK} AS match_rank "
+                    f"FROM {POSTS_FTS} WHERE {POSTS_FTS} MATCH ?) m ON m.match_rowid = posts.id"
+                )
+                query_params.insert(0, match)
+            elif search:
                 query_parts.append("AND (post_text LIKE ? OR user_display_name LIKE ? OR user_handle LIKE ?)")
                 search_param = f"%{search}%"
                 query_params.extend([search_param, search_param, search_param])
-            count_query = " ".join(query_parts).replace("SELECT *", "SELECT COUNT(*)")
+            count_query = " ".join(query_parts).replace(select_clause, "SELECT COUNT(*)", 1)
             total_posts = await social_media_db.execute_query(count_query, tuple(query_params), fetch=True, fetch_one=True)
             total_count = total_posts.get("COUNT(*)", 0) if total_posts else 0
-            query_parts.append("ORDER BY datetime(post_timestamp) DESC, post_id DESC")
+            if use_fts:
+                query_parts.append("ORDER BY m.match_rank, datetime(post_timestamp) DESC, post_id DESC")
+            else:
+                query_parts.append("ORDER BY datetime(post_timestamp) DESC, post_id DESC")
             query_parts.append("LIMIT ? OFFSET ?")
             query_params.extend([per_page, offset])
             posts_query = " ".join(query_parts)
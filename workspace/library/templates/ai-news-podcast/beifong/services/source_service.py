@@ -2,6 +2,7 @@ from typing import List, Optional, Dict, Any
 from fastapi import HTTPException
 from datetime import datetime
 from services.db_service import sources_db, tracking_db
+from db.hydration import source_names
 from models.source_schemas import SourceCreate, SourceUpdate, SourceFeedCreate, PaginatedSources
 
 
@@ -223,6 +224,7 @@ class SourceService:
                 WHERE id = ?
                 """
                 await sources_db.execute_query(update_query, tuple(update_params))
+                source_names.invalidate()
             if source_data.categories is not None:
                 delete_categories_query = "DELETE FROM source_categories WHERE source_id = ?"
                 await sources_db.execute_query(delete_categories_query, (source_id,))
@@ -283,6 +285,7 @@ class SourceService:
             WHERE id = ?
             """
             await sources_db.execute_query(delete_source_query, (source_id,))
+            source_names.invalidate()
             return {"message": f"Source '{source['name']}' has been permanently deleted"}
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -313,6 +316,7 @@ class SourceService:
             """
             feed_params = (source_id, feed_data.feed_url, feed_data.feed_type, feed_data.is_active, datetime.now().isoformat())
             await sources_db.execute_query(feed_query, feed_params)
+            source_names.invalidate()
             return await self.get_source_feeds(source_id)
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -365,6 +369,7 @@ class SourceService:
                 raise HTTPException(status_code=404, detail="Feed not found")
             delete_query = "DELETE FROM source_feeds WHERE id = ?"
             await sources_db.execute_query(delete_query, (feed_id,))
+            source_names.invalidate()
             return {"message": "Feed has been deleted"}
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -0,0 +1,102 @@
+import os
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+import redis
+from dotenv import load_dotenv
+
+load_dotenv()
+
+REDIS_HOST = os.environ.get("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("REDIS_DB", 0))
+EVENT_CHANNEL_PREFIX = "task_events:"
+LAST_EVENT_PREFIX = "task_event_last:"
+LAST_EVENT_TTL_SEC = 60 * 15
+KEEPALIVE_SEC = 15
+TERMINAL_EVENTS = ("result",)
+
+_current_task_id: ContextVar[Optional[str]] = ContextVar("current_task_id", default=None)
+_redis_client = None
+
+
+def _client():
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB + 1)
+    return _redis_client
+
+
+def event_channel(session_id: str) -> str:
+    return f"{EVENT_CHANNEL_PREFIX}{session_id}"
+
+
+@contextmanager
+def task_context(task_id: Optional[str]):
+    """Tag every event published from this context (tools included) with ``task_id``."""
+    token = _current_task_id.set(task_id)
+    try:
+        yield
+    finally:
+        _current_task_id.reset(token)
+
+
+def publish_event(session_id: str, event_type: str, **data: Any) -> None:
+    """
+    Publish a task event for ``session_id`` and keep it as the session's latest event.
+
+    Events are best effort: a Redis failure is logged and swallowed, and
+    ``/status`` keeps working for clients that poll.
+    """
+    if not session_id:
+        return
+    event = {"type": event_type, "session_id": session_id, "task_id": _current_task_id.get(), "timestamp": time.time(), **data}
+    payload = json.dumps(event, default=str)
+    try:
+        pipe = _client().pipeline(transaction=False)
+        pipe.publish(event_channel(session_id), payload)
+        pipe.set(f"{LAST_EVENT_PREFIX}{session_id}", payload, ex=LAST_EVENT_TTL_SEC)
+        pipe.execute()
+    except Exception as e:
+        print(f"Error publishing task event: {e}")
+
+
+async def stream_events(redis_client, session_id: str, task_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield events for ``session_id`` from Redis pub/sub until the task's ``result`` event.
+
+    The channel is subscribed before the latest stored event is read, so a
+    task that finishes between ``/chat`` and the subscription is still
+    delivered. The stored event is replayed when it belongs to ``task_id``,
+    or, without ``task_id``, when it is terminal. With ``task_id``, events
+    from other tasks are skipped. A ``keepalive`` event is yielded every
+    ``KEEPALIVE_SEC`` seconds of silence.
+    """
+    pubsub = redis_client.pubsub()
+    await pubsub.subscribe(event_channel(session_id))
+    try:
+        last = await redis_client.get(f"{LAST_EVENT_PREFIX}{session_id}")
+        if last:
+            event = json.loads(last)
+            terminal = event["type"] in TERMINAL_EVENTS
+            # without a task_id only a finished task's result is replayed; an older progress event would be stale
+            if (event.get("task_id") == task_id) if task_id else terminal:
+                yield event
+                if terminal:
+                    return
+        while True:
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=KEEPALIVE_SEC)
+            if message is None:
+                yield {"type": "keepalive", "session_id": session_id, "task_id": task_id, "timestamp": time.time()}
+                continue
+            event = json.loads(message["data"])
+            if task_id and event.get("task_id") not in (None, task_id):
+                continue
+            yield event
+            if event["type"] in TERMINAL_EVENTS:
+                return
+    finally:
+        await pubsub.unsubscribe(event_channel(session_id))
+        await pubsub.aclose()
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import time
+import aiohttp
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def client_loop(session, url, params, requests_per_client, latencies, errors):
+    for _ in range(requests_per_client):
+        start = time.perf_counter()
+        try:
+            async with session.get(url, params=params) as response:
+                await response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    continue
+        except Exception as e:
+            errors.append(type(e).__name__)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+async def run_load(base_url, clients, requests_per_client, params):
+    url = f"{base_url.rstrip('/')}/api/articles/"
+    latencies = []
+    errors = []
+    connector = aiohttp.TCPConnector(limit=clients)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*[client_loop(session, url, params, requests_per_client, latencies, errors) for _ in range(clients)])
+        elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test GET /api/articles against a running Beifong API")
+    parser.add_argument("--base-url", default="http://localhost:7000")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=10, help="requests per client")
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--search", default=None)
+    args = parser.parse_args()
+    params = {"page": 1, "per_page": args.per_page}
+    if args.search:
+        params["search"] = args.search
+    latencies, errors, elapsed = asyncio.run(run_load(args.base_url, args.clients, args.requests, params))
+    total = len(latencies) + len(errors)
+    print(f"Requests: {total} ({len(errors)} errors) from {args.clients} concurrent clients in {elapsed:.2f}s")
+    print(f"Throughput: {total / elapsed:.1f} req/s")
+    print(f"p50: {percentile(latencies, 50):.1f} ms")
+    print(f"p90: {percentile(latencies, 90):.1f} ms")
+    print(f"p99: {percentile(latencies, 99):.1f} ms")
+    print(f"max: {max(latencies) if latencies else 0:.1f} ms")
+    if errors:
+        print(f"Errors: {sorted(set(map(str, errors)))}")
+
+
+if __name__ == "__main__":
+    main()
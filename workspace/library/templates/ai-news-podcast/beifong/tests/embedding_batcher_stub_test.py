@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+import numpy as np
+from aiohttp import web
+from utils.embedding_batcher import EmbeddingBatcher
+
+DIMENSION = 1536
+
+
+def fake_vector(text):
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    return np.random.default_rng(seed).random(DIMENSION, dtype=np.float32).tolist()
+
+
+def create_stub_app(latency_ms, rate_limit_every):
+    counter = {"requests": 0, "inputs": 0}
+
+    async def embeddings(request):
+        body = await request.json()
+        counter["requests"] += 1
+        if rate_limit_every and counter["requests"] % rate_limit_every == 0:
+            return web.json_response({"error": {"message": "rate limited", "type": "rate_limit"}}, status=429, headers={"retry-after": "0.05"})
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        counter["inputs"] += len(inputs)
+        await asyncio.sleep(latency_ms / 1000)
+        data = [{"object": "embedding", "index": i, "embedding": fake_vector(text)} for i, text in enumerate(inputs)]
+        return web.json_response({"object": "list", "data": data, "model": body["model"], "usage": {"prompt_tokens": 0, "total_tokens": 0}})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/v1/embeddings", embeddings)
+    return app, counter
+
+
+async def run(args):
+    app, counter = create_stub_app(args.latency_ms, args.rate_limit_every)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    unique = [f"Title: article {i}\n\nSummary: {'lorem ipsum ' * random.randint(20, 200)}" for i in range(args.articles)]
+    texts = unique + random.sample(unique, int(len(unique) * args.duplicate_ratio))
+    batcher = EmbeddingBatcher(api_key="stub", base_url=f"http://127.0.0.1:{args.port}/v1", max_concurrency=args.concurrency)
+    start = time.perf_counter()
+    vectors = await batcher.embed(texts)
+    elapsed = time.perf_counter() - start
+    await batcher.close()
+    await runner.cleanup()
+    assert all(v is not None for v in vectors), "some embeddings failed"
+    assert vectors[0] == fake_vector(batcher._fit(texts[0])[0])
+    print(f"Embedded {len(texts)} texts ({len(unique)} unique) in {elapsed:.2f}s -> {len(texts) / elapsed:.1f} texts/s")
+    print(f"HTTP requests: {counter['requests']} (retries: {batcher.retries}), inputs sent: {counter['inputs']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of EmbeddingBatcher against a local stub embeddings server")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--rate-limit-every", type=int, default=7, help="answer every Nth request with HTTP 429 (0 disables)")
+    parser.add_argument("--port", type=int, default=8765)
+    asyncio.run(run(parser.parse_args()))
@@ -0,0 +1,68 @@
+import sys
+import time
+import numpy as np
+import faiss
+from db.config import get_tracking_db_path
+from db.connection import db_connection
+from processors.faiss_indexing_processor import (
+    LATEST_EMBEDDINGS_SQL,
+    choose_n_list,
+    create_base_index,
+    decode_embeddings,
+    detect_embedding_dimension,
+    required_training_vectors,
+)
+
+k = 10
+nb_queries = 200
+tracking_db_path = get_tracking_db_path()
+dimension = detect_embedding_dimension(tracking_db_path)
+if dimension is None:
+    sys.exit("No embeddings in article_embeddings; run the embedding processor first")
+with db_connection(tracking_db_path) as conn:
+    rows = conn.execute(LATEST_EMBEDDINGS_SQL).fetchall()
+_, _, vectors = decode_embeddings(rows, dimension)
+rng = np.random.default_rng(42)
+rng.shuffle(vectors)
+queries, database = vectors[:nb_queries], vectors[nb_queries:]
+print(f"Benchmarking on {len(database)} article embeddings (d={dimension}) with {len(queries)} held-out queries, k={k}")
+
+exact = faiss.IndexFlatL2(dimension)
+exact.add(database)
+_, ground_truth = exact.search(queries, k)
+
+
+def recall_at_k(labels):
+    return np.mean([len(set(found) & set(truth)) / k for found, truth in zip(labels, ground_truth)])
+
+
+def benchmark(name, index, params):
+    for param in params:
+        if isinstance(index, faiss.IndexIVF):
+            index.nprobe = param
+        elif hasattr(index, "hnsw"):
+            index.hnsw.efSearch = param
+        start_time = time.time()
+        _, labels = index.search(queries, k)
+        elapsed = time.time() - start_time
+        label = f"{name} ({'nprobe' if isinstance(index, faiss.IndexIVF) else 'efSearch'}={param})" if param else name
+        print(f"{label:<28} recall@{k}: {recall_at_k(labels):.3f}   QPS: {len(queries) / elapsed:10.0f}")
+
+
+for index_type in ["flat", "ivfflat", "ivfpq", "hnsw"]:
+    if len(database) < required_training_vectors(index_type):
+        print(f"{index_type:<28} skipped: needs {required_training_vectors(index_type)} vectors to train")
+        continue
+    n_list = choose_n_list(len(database))
+    index = create_base_index(dimension, index_type, n_list)
+    start_time = time.time()
+    if not index.is_trained:
+        index.train(database[rng.choice(len(database), size=min(len(database), n_list * 256), replace=False)])
+    index.add(database)
+    print(f"\n{index_type}: built in {time.time() - start_time:.2f} seconds, {faiss.serialize_index(index).nbytes / 1e6:.1f} MB")
+    if isinstance(index, faiss.IndexIVF):
+        benchmark(index_type, index, sorted({1, 4, max(1, n_list // 16), max(1, n_list // 4), n_list}))
+    elif index_type == "hnsw":
+        benchmark(index_type, index, [16, 32, 64, 128])
+    else:
+        benchmark(index_type, index, [None])
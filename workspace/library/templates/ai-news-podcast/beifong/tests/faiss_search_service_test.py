@@ -0,0 +1,49 @@
+import os
+import tempfile
+import time
+import numpy as np
+import faiss
+from utils.faiss_search import FaissSearchService
+
+dimension = 1536
+nb_vectors = 20000
+np.random.seed(42)
+database = np.random.random((nb_vectors, dimension)).astype("float32")
+article_ids = np.arange(1000, 1000 + nb_vectors)
+
+workdir = tempfile.mkdtemp()
+index_path = os.path.join(workdir, "article_index.faiss")
+mapping_path = os.path.join(workdir, "article_id_map.npy")
+index = faiss.IndexFlatL2(dimension)
+index.add(database)
+faiss.write_index(index, index_path)
+np.save(mapping_path, article_ids)
+
+start_time = time.time()
+index = faiss.read_index(index_path)
+id_map = np.load(mapping_path).tolist()
+index.search(database[:1], 5)
+print(f"Per-query load + search (old path): {(time.time() - start_time) * 1000:.2f} ms")
+
+service = FaissSearchService(index_path=index_path, mapping_path=mapping_path)
+service.search(database[:1], 5)
+start_time = time.time()
+for i in range(100):
+    results = service.search(database[i : i + 1], 5)
+    assert results[0][0][0] == article_ids[i]
+print(f"Resident single-query search: {(time.time() - start_time) * 10:.2f} ms/query")
+
+start_time = time.time()
+results = service.search(database[:100], 5)
+print(f"Resident batched search of 100 queries: {(time.time() - start_time) * 1000:.2f} ms total")
+assert [row[0][0] for row in results] == article_ids[:100].tolist()
+
+extra = np.random.random((10, dimension)).astype("float32")
+index.add(extra)
+faiss.write_index(index, index_path + ".tmp")
+os.replace(index_path + ".tmp", index_path)
+np.save(mapping_path + ".tmp.npy", np.concatenate([article_ids, np.arange(9000000, 9000010)]))
+os.replace(mapping_path + ".tmp.npy", mapping_path)
+service._last_check = 0
+assert service.search(extra[:1], 1)[0][0][0] == 9000000
+print("Hot reload picked up the new index")
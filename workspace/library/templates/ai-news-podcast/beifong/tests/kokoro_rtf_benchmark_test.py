@@ -0,0 +1,44 @@
+import os
+import sys
+import time
+import tempfile
+import soundfile as sf
+from utils.text_to_audio_kokoro import KokoroPool, render_podcast, text_to_speech
+
+# CPU real-time factor (synthesis seconds / audio seconds) for the pooled, voice-batched renderer
+# against the old one-pipeline-per-podcast, line-by-line path. Pass a lang code ("b", "h", ...) to override.
+lang_code = sys.argv[1] if len(sys.argv) > 1 else "b"
+sampling_rate = 24_000
+script = [
+    {"speaker": 1, "text": "Welcome back to the show. Today we are looking at what changed in open source AI this week."},
+    {"speaker": 2, "text": "Thanks for having me. It has been a busy week, with three major model releases and a lot of debate."},
+    {"speaker": 1, "text": "Let's start with the benchmarks, because the headline numbers don't tell the whole story."},
+    {"speaker": 2, "text": "Right. Most of the gains come from better data filtering rather than larger models."},
+    {"speaker": 1, "text": "Which is good news for anyone running these models on their own hardware."},
+    {"speaker": 2, "text": "Exactly, and the smaller checkpoints now fit comfortably on a single consumer GPU."},
+] * 4
+print(f"Benchmarking Kokoro '{lang_code}' on {len(script)} lines, {os.cpu_count()} CPUs")
+
+pool = KokoroPool()
+start_time = time.time()
+pipeline, _ = pool.get(lang_code)
+print(f"{'cold pipeline load':<30} {time.time() - start_time:8.2f}s")
+
+start_time = time.time()
+pipeline, _ = pool.get(lang_code)
+print(f"{'warm pipeline lookup':<30} {time.time() - start_time:8.4f}s")
+
+start_time = time.time()
+audio_seconds = sum(len(text_to_speech(pipeline, e["text"], e["speaker"], sampling_rate, lang_code)) for e in script) / sampling_rate
+elapsed = time.time() - start_time
+print(f"{'line by line':<30} {elapsed:8.2f}s for {audio_seconds:6.1f}s of audio   RTF: {elapsed / audio_seconds:.3f}")
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    output_path = os.path.join(temp_dir, "podcast.wav")
+    for run in range(2):
+        start_time = time.time()
+        audio_seconds = render_podcast(script, output_path, silence_duration=0.0, sampling_rate=sampling_rate, lang_code=lang_code, pool=pool)
+        elapsed = time.time() - start_time
+        label = f"pooled + batched (run {run + 1})"
+        print(f"{label:<30} {elapsed:8.2f}s for {audio_seconds:6.1f}s of audio   RTF: {elapsed / audio_seconds:.3f}")
+    print(f"Output: {sf.info(output_path).duration:.1f}s at {sf.info(output_path).samplerate} Hz")
@@ -1,140 +1,247 @@
-from playwright.sync_api import sync_playwright
-import newspaper
+import os
 import time
-from typing import Dict, List
+import asyncio
+import threading
+from typing import Dict, List, Optional
 from datetime import datetime
+import newspaper
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+EXTRA_HTTP_HEADERS = {
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+}
+BROWSER_MAX_PAGES = int(os.environ.get("BROWSER_MAX_PAGES", "6"))
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+NETWORK_IDLE_TIMEOUT = 3000
+PAGE_RECYCLE_AFTER = 50
+# pages that keep polling never reach network idle; treat them as ready once the body holds some text
+READY_SCRIPT = "() => document.readyState !== 'loading' && !!document.body && document.body.innerText.length > 500"
 
-class PlaywrightScraper:
-    def __init__(
-        self,
-        headless: bool = True,
-        timeout: int = 20000,
-        fresh_context_per_url: bool = False,
-    ):
+
+def parse_rendered_html(original_url: str, final_url: str, html: str) -> Dict:
+    """Run newspaper over HTML the browser already rendered instead of downloading the page a second time."""
+    try:
+        article = newspaper.Article(final_url)
+        article.download(input_html=html)
+        article.parse()
+        return {
+            "original_url": original_url,
+            "final_url": final_url,
+            "title": article.title or "",
+            "authors": article.authors or [],
+            "published_date": article.publish_date.isoformat() if article.publish_date else None,
+            "full_text": article.text or "",
+            "success": True,
+        }
+    except Exception as e:
+        return {
+            "original_url": original_url,
+            "final_url": final_url,
+            "error": f"Newspaper4k parsing failed: {str(e)}",
+            "success": False,
+        }
+
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class PageSlot:
+    def __init__(self, context, page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+
+
+class BrowserService:
+    """
+    Headless Chromium kept running for the life of the process and shared by every scrape.
+
+    Playwright runs on its own event-loop thread, so synchronous callers
+    (agent tools in Celery worker threads) just submit a batch and wait. Up to
+    ``max_pages`` URLs load in parallel, each in a pooled context that blocks
+    images, fonts and media; contexts are reused between batches and
+    recycled every ``PAGE_RECYCLE_AFTER`` loads. A crashed browser is
+    relaunched on the next batch.
+    """
+
+    def __init__(self, headless: bool = True, max_pages: int = BROWSER_MAX_PAGES):
         self.headless = headless
-        self.timeout = timeout
-        self.fresh_context_per_url = fresh_context_per_url
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pid = None
+        self._loop = None
+        self._playwright = None
+        self._browser = None
+        self._browser_lock = None
+        self._slots = None
+        self._idle: List[PageSlot] = []
 
-    def scrape_urls(self, urls: List[str]) -> List[Dict]:
-        with sync_playwright() as playwright:
-            browser = playwright.chromium.launch(
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                return self._loop
+            # first use, or a forked child that inherited a loop whose thread did not survive the fork
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="browser-service", daemon=True).start()
+            self._pid = os.getpid()
+            self._loop = loop
+            self._playwright = None
+            self._browser = None
+            self._browser_lock = asyncio.Lock()
+            self._slots = asyncio.Semaphore(self.max_pages)
+            self._idle = []
+            return loop
+
+    def scrape(self, urls: List[str], timeout: int = 20000, fresh_context_per_url: bool = False) -> List[Dict]:
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._scrape_all(urls, timeout, fresh_context_per_url), loop).result()
+
+    async def _ensure_browser(self):
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+            self._idle = []
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            start = time.time()
+            self._browser = await self._playwright.chromium.launch(
                 headless=self.headless,
                 args=["--no-sandbox", "--disable-setuid-sandbox"],
             )
-            if self.fresh_context_per_url:
-                results = []
-                for url in urls:
-                    result = self._scrape_single_with_new_context(browser, url)
-                    results.append(result)
-            else:
-                results = self._scrape_with_reused_page(browser, urls)
-            browser.close()
-            return results
-
-    def _scrape_with_reused_page(self, browser, urls: List[str]) -> List[Dict]:
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            viewport={"width": 1920, "height": 1080},
-        )
-        page = context.new_page()
-        page.set_extra_http_headers(
-            {
-                "Accept-Language": "en-US,en;q=0.9",
-                "Accept-Encoding": "gzip, deflate, br",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-            }
-        )
-        results = []
+            print(f"INFO: Launched Chromium in {time.time() - start:.1f}s")
+            return self._browser
+
+    async def _open_slot(self, timeout: int) -> PageSlot:
+        browser = await self._ensure_browser()
+        context = await browser.new_context(user_agent=USER_AGENT, viewport={"width": 1920, "height": 1080}, extra_http_headers=EXTRA_HTTP_HEADERS)
+        context.set_default_timeout(timeout)
+        await context.route("**/*", _block_heavy_resources)
+        return PageSlot(context, await context.new_page())
+
+    async def _take_slot(self, timeout: int, fresh_context: bool) -> PageSlot:
+        if not fresh_context and self._idle and self._browser is not None and self._browser.is_connected():
+            return self._idle.pop()
+        return await self._open_slot(timeout)
+
+    async def _release_slot(self, slot: PageSlot, reuse: bool):
+        # a slot opened on a browser that has since crashed and been relaunched must not go back into the pool
+        current = slot.context.browser is self._browser and self._browser is not None and self._browser.is_connected()
+        if reuse and current and slot.uses < PAGE_RECYCLE_AFTER and not slot.page.is_closed():
+            self._idle.append(slot)
+            return
         try:
-            for i, url in enumerate(urls):
-                print(f"Scraping {i+1}/{len(urls)}")
-                result = self._scrape_single_url(page, url)
-                results.append(result)
-                if i < len(urls) - 1:
-                    time.sleep(1)
-        finally:
-            context.close()
-        return results
+            await slot.context.close()
+        except Exception:
+            pass
 
-    def _scrape_single_url(self, page, url: str) -> Dict:
-        max_retries = 0
-        for attempt in range(max_retries + 1):
+    async def _settle(self, page):
+        try:
+            await page.wait_for_load_state("networkidle", timeout=NETWORK_IDLE_TIMEOUT)
+        except PlaywrightTimeoutError:
             try:
-                page.goto(url, wait_until="load", timeout=self.timeout)
-                page.wait_for_selector("body", timeout=5000)
-                page.wait_for_timeout(2000)
-                final_url = page.url
-                return self._parse_with_newspaper(url, final_url)
-            except Exception as e:
-                if attempt < max_retries:
-                    print(f"Retry {attempt + 1} for {url}")
-                    time.sleep(2**attempt)
-                    continue
-                else:
-                    return {
-                        "originalUrl": url,
-                        "error": str(e),
-                        "success": False,
-                        "timestamp": datetime.now().isoformat(),
-                    }
-
-    def _scrape_single_with_new_context(self, browser, url: str) -> Dict:
-        max_retries = 0
-        for attempt in range(max_retries + 1):
-            context = None
+                await page.wait_for_function(READY_SCRIPT, timeout=NETWORK_IDLE_TIMEOUT)
+            except PlaywrightTimeoutError:
+                pass
+
+    async def _scrape_one(self, index: int, total: int, url: str, timeout: int, fresh_context: bool) -> Dict:
+        async with self._slots:
+            slot = None
+            reuse = not fresh_context
             try:
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    viewport={"width": 1920, "height": 1080},
-                )
-                page = context.new_page()
-                page.set_extra_http_headers(
-                    {
-                        "Accept-Language": "en-US,en;q=0.9",
-                        "Accept-Encoding": "gzip, deflate, br",
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    }
-                )
-                page.goto(url, wait_until="load", timeout=self.timeout)
-                page.wait_for_selector("body", timeout=5000)
-                page.wait_for_timeout(2000)
-                final_url = page.url
-                return self._parse_with_newspaper(url, final_url)
+                slot = await self._take_slot(timeout, fresh_context)
+                slot.uses += 1
+                print(f"Scraping {index + 1}/{total}")
+                await slot.page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+                await self._settle(slot.page)
+                final_url = slot.page.url
+                html = await slot.page.content()
             except Exception as e:
-                if attempt < max_retries:
-                    time.sleep(2**attempt)
-                    continue
-                else:
-                    return {
-                        "originalUrl": url,
-                        "error": str(e),
-                        "success": False,
-                        "timestamp": datetime.now().isoformat(),
-                    }
+                reuse = False
+                return {
+                    "original_url": url,
+                    "error": str(e),
+                    "success": False,
+                    "timestamp": datetime.now().isoformat(),
+                }
             finally:
-                if context:
-                    context.close()
+                if slot is not None:
+                    await self._release_slot(slot, reuse)
+        return await asyncio.get_running_loop().run_in_executor(None, parse_rendered_html, url, final_url, html)
+
+    async def _scrape_all(self, urls: List[str], timeout: int, fresh_context: bool) -> List[Dict]:
+        return await asyncio.gather(*[self._scrape_one(i, len(urls), url, timeout, fresh_context) for i, url in enumerate(urls)])
 
-    def _parse_with_newspaper(self, original_url: str, final_url: str) -> Dict:
+    async def _close(self):
+        for slot in self._idle:
+            try:
+                await slot.context.close()
+            except Exception:
+                pass
+        self._idle = []
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    def shutdown(self):
+        with self._lock:
+            loop = self._loop if self._pid == os.getpid() else None
+            self._loop = None
+        if loop is None:
+            return
         try:
-            article = newspaper.article(final_url)
-            return {
-                "original_url": original_url,
-                "final_url": final_url,
-                "title": article.title or "",
-                "authors": article.authors or [],
-                "published_date": article.publish_date.isoformat() if article.publish_date else None,
-                "full_text": article.text or "",
-                "success": True,
-            }
+            asyncio.run_coroutine_threadsafe(self._close(), loop).result(timeout=10)
         except Exception as e:
-            return {
-                "original_url": original_url,
-                "final_url": final_url,
-                "error": f"Newspaper4k parsing failed: {str(e)}",
-                "success": False,
-            }
+            print(f"WARNING: Browser did not shut down cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+_services: Dict[bool, BrowserService] = {}
+_services_lock = threading.Lock()
+
+
+def get_browser_service(headless: bool = True) -> BrowserService:
+    with _services_lock:
+        if headless not in _services:
+            _services[headless] = BrowserService(headless=headless)
+        return _services[headless]
+
+
+def shutdown_browser_services():
+    for service in list(_services.values()):
+        service.shutdown()
+
+
+class PlaywrightScraper:
+    def __init__(
+        self,
+        headless: bool = True,
+        timeout: int = 20000,
+        fresh_context_per_url: bool = False,
+        service: Optional[BrowserService] = None,
+    ):
+        self.headless = headless
+        self.timeout = timeout
+        self.fresh_context_per_url = fresh_context_per_url
+        self.service = service or get_browser_service(headless)
+
+    def scrape_urls(self, urls: List[str]) -> List[Dict]:
+        """Scrape ``urls`` in parallel on the shared browser; results come back in input order."""
+        if not urls:
+            return []
+        start = time.time()
+        results = self.service.scrape(urls, timeout=self.timeout, fresh_context_per_url=self.fresh_context_per_url)
+        print(f"INFO: Scraped {len(urls)} URLs in {time.time() - start:.1f}s")
+        return results
 
 
 def create_browser_crawler(headless=True, timeout=20000, fresh_context_per_url=False):
@@ -143,4 +250,4 @@ def create_browser_crawler(headless=True, timeout=20000, fresh_context_per_url=F
         headless=headless,
         timeout=timeout,
         fresh_context_per_url=fresh_context_per_url
-    )
\ No newline at end of file
+    )
@@ -2,6 +2,8 @@ import sqlite3
 from typing import List, Union
 from agno.agent import Agent
 from db.config import get_tracking_db_path
+from db.fts import ARTICLES_FTS, ARTICLES_RANK, build_match_query
+from db.hydration import hydrate_articles
 import json
 
 
@@ -27,9 +29,7 @@ def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
             results = execute_simple_search(conn, search_terms, limit)
             if not results:
                 return "No relevant articles found in our database. Would you like to try a different topic or provide specific URLs?"
-            for article in results:
-                article["categories"] = get_article_categories(conn, article["id"])
-                article["source_name"] = article.get("source_id", "Unknown Source")
+            hydrate_articles(results, tracking_db_path=db_path)
             return f"is_scrapping_required: False, Found {len(results)}, {json.dumps(results, indent=2)} potential sources that might be relevant to your topic careful my search is text bassed do quality check and ignore invalid resutls."
     except Exception as e:
         print(f"Error searching articles: {e}")
@@ -37,6 +37,21 @@ def search_articles(agent: Agent, terms: Union[str, List[str]]) -> str:
 
 
 def execute_simple_search(conn, terms, limit):
+    match = build_match_query(terms)
+    if match is None:
+        return []
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (ARTICLES_FTS,)).fetchone():
+        query = f"""
+            SELECT ca.id, ca.title, ca.url, ca.published_date,
+                   COALESCE(ca.summary, ca.content) as content,
+                   ca.source_id, ca.feed_id
+            FROM {ARTICLES_FTS} JOIN crawled_articles ca ON ca.id = {ARTICLES_FTS}.rowid
+            WHERE {ARTICLES_FTS} MATCH ? AND ca.processed = 1
+            ORDER BY {ARTICLES_RANK}, ca.published_date DESC
+            LIMIT ?
+        """
+        cursor = conn.execute(query, (match, limit))
+        return [dict(row) for row in cursor.fetchall()]
     base_query = """
         SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, 
                COALESCE(ca.summary, ca.content) as content,
@@ -57,11 +72,3 @@ def execute_simple_search(conn, terms, limit):
     cursor = conn.execute(query, params)
     return [dict(row) for row in cursor.fetchall()]
 
-
-def get_article_categories(conn, article_id):
-    try:
-        cursor = conn.execute("SELECT category_name FROM article_categories WHERE article_id = ?", (article_id,))
-        return [row["category_name"] for row in cursor.fetchall()]
-    except Exception as e:
-        print(f"Error fetching article categories: {e}")
-        return []
\ No newline at end of file
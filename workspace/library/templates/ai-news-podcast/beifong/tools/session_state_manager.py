@@ -125,7 +125,7 @@ def update_language(agent: Agent, language_code: str) -> str:
         "code": language_code,
         "name": language_name,
     }
-    SessionService.save_session(session_id, session_state)
+    SessionService.save_session(session_id, session_state, session["version"])
     return f"Podcast language set to: {language_name} ({language_code})"
 
 
@@ -146,7 +146,7 @@ def update_chat_title(agent: Agent, title: str) -> str:
     current_state = session["state"]
     current_state["title"] = title
     current_state["created_at"] = datetime.now().isoformat()
-    SessionService.save_session(session_id, current_state)
+    SessionService.save_session(session_id, current_state, session["version"])
     return f"Chat title updated to: {title}"
 
 
@@ -200,5 +200,5 @@ def mark_session_finished(agent: Agent) -> str:
     session_state["finished"] = True
     session_state["stage"] = "complete"
     toggle_podcast_generated(session_state, True)
-    SessionService.save_session(session_id, session_state)
+    SessionService.save_session(session_id, session_state, session["version"])
     return "Session marked as finished and generated podcast stored into podcasts database and No further conversation are allowed and only new session can be started."
@@ -1,5 +1,6 @@
 import sqlite3
 import json
+from db.fts import ensure_posts_fts
 
 
 def create_connection(db_file="x_posts.db"):
@@ -11,7 +12,8 @@ def create_connection(db_file="x_posts.db"):
 def setup_database(conn):
     create_posts_table = """
     CREATE TABLE IF NOT EXISTS posts (
-        post_id TEXT PRIMARY KEY,
+        id INTEGER PRIMARY KEY,
+        post_id TEXT NOT NULL UNIQUE,
         platform TEXT,
         user_display_name TEXT,
         user_handle TEXT,
@@ -43,6 +45,7 @@ def setup_database(conn):
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_user_handle ON posts(user_handle)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_post_timestamp ON posts(post_timestamp)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_posts_sentiment ON posts(sentiment)")
+    ensure_posts_fts(conn.cursor())
     conn.commit()
 
 
@@ -85,54 +88,64 @@ def process_post_data(post_data):
     return data
 
 
-def get_post(conn, post_id):
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM posts WHERE post_id = ?", (post_id,))
-    return cursor.fetchone()
-
+POST_COLUMNS = [
+    "post_id",
+    "platform",
+    "user_display_name",
+    "user_handle",
+    "user_profile_pic_url",
+    "post_timestamp",
+    "post_display_time",
+    "post_url",
+    "post_text",
+    "post_mentions",
+    "engagement_reply_count",
+    "engagement_retweet_count",
+    "engagement_like_count",
+    "engagement_bookmark_count",
+    "engagement_view_count",
+    "media",
+    "media_count",
+    "is_ad",
+    "sentiment",
+    "categories",
+    "tags",
+    "analysis_reasoning",
+]
+METRIC_COLUMNS = ["engagement_reply_count", "engagement_retweet_count", "engagement_like_count", "engagement_bookmark_count", "engagement_view_count"]
+UPSERT_POST_SQL = f"""
+INSERT INTO posts ({", ".join(POST_COLUMNS)}) VALUES ({", ".join(["?"] * len(POST_COLUMNS))})
+ON CONFLICT(post_id) DO UPDATE SET
+    {", ".join(f"{metric} = COALESCE(excluded.{metric}, posts.{metric})" for metric in METRIC_COLUMNS)},
+    updated_at = CURRENT_TIMESTAMP
+WHERE {" OR ".join(f"(excluded.{metric} IS NOT NULL AND excluded.{metric} IS NOT posts.{metric})" for metric in METRIC_COLUMNS)}
+"""
+
+
+def upsert_posts(conn, posts):
+    """
+    Store a batch of scraped posts in one transaction; returns ``(stored, new_posts)``.
 
-def insert_post(conn, post_data):
-    data = process_post_data(post_data)
-    columns = ", ".join(data.keys())
-    placeholders = ", ".join(["?"] * len(data))
-    values = list(data.values())
-    sql = f"INSERT INTO posts ({columns}) VALUES ({placeholders})"
-    conn.execute(sql, values)
+    New posts are inserted, known posts only get their engagement counts
+    refreshed when they changed, and ads or posts without an id are skipped.
+    ``stored`` counts the rows inserted or updated. Posts that were new and
+    have text are the ones still needing analysis.
+    """
+    rows = {}
+    for post_data in posts:
+        post_id = post_data.get("post_id")
+        if not post_id or post_data.get("is_ad", False):
+            continue
+        rows[post_id] = process_post_data(post_data)
+    if not rows:
+        return 0, []
+    post_ids = list(rows)
+    placeholders = ",".join(["?"] * len(post_ids))
+    existing = {row["post_id"] for row in conn.execute(f"SELECT post_id FROM posts WHERE post_id IN ({placeholders})", post_ids)}
+    cursor = conn.executemany(UPSERT_POST_SQL, [[data.get(column) for column in POST_COLUMNS] for data in rows.values()])
+    stored = cursor.rowcount
     conn.commit()
-
-
-def check_and_store_post(conn, post_data):
-    post_id = post_data.get("post_id")
-    if not post_id:
-        return False
-    if post_data.get("is_ad", False):
-        return False
-    data = process_post_data(post_data)
-    existing_post = get_post(conn, post_id)
-    if not existing_post:
-        needs_analysis = bool(data.get("post_text"))
-        insert_post(conn, data)
-        return needs_analysis
-    else:
-        update_changed_metrics(conn, existing_post, data)
-        return False
-
-
-def update_changed_metrics(conn, existing_post, new_data):
-    metrics = ["engagement_reply_count", "engagement_retweet_count", "engagement_like_count", "engagement_bookmark_count", "engagement_view_count"]
-    changes = {}
-    for metric in metrics:
-        if metric in new_data and metric in existing_post:
-            if new_data[metric] != existing_post[metric]:
-                changes[metric] = new_data[metric]
-    if changes:
-        set_clauses = [f"{metric} = ?" for metric in changes]
-        set_sql = ", ".join(set_clauses)
-        set_sql += ", updated_at = CURRENT_TIMESTAMP"
-        sql = f"UPDATE posts SET {set_sql} WHERE post_id = ?"
-        params = list(changes.values()) + [existing_post["post_id"]]
-        conn.execute(sql, params)
-        conn.commit()
+    return stored, [data for post_id, data in rows.items() if post_id not in existing]
 
 
 def update_posts_with_analysis(conn, post_ids, analysis_results):
@@ -143,19 +156,24 @@ def update_posts_with_analysis(conn, post_ids, analysis_results):
         post_id = analysis.get("post_id")
         if post_id:
             analysis_by_id[post_id] = analysis
-    for post_id in post_ids:
-        if post_id in analysis_by_id:
-            analysis = analysis_by_id[post_id]
-            categories = json.dumps(analysis.get("categories", []))
-            tags = json.dumps(analysis.get("tags", []))
-            conn.execute(
-                """UPDATE posts SET 
-                   sentiment = ?, 
-                   categories = ?, 
-                   tags = ?, 
-                   analysis_reasoning = ?,
-                   updated_at = CURRENT_TIMESTAMP 
-                   WHERE post_id = ?""",
-                (analysis.get("sentiment"), categories, tags, analysis.get("reasoning"), post_id),
+    conn.executemany(
+        """UPDATE posts SET 
+           sentiment = ?, 
+           categories = ?, 
+           tags = ?, 
+           analysis_reasoning = ?,
+           updated_at = CURRENT_TIMESTAMP 
+           WHERE post_id = ?""",
+        [
+            (
+                analysis_by_id[post_id].get("sentiment"),
+                json.dumps(analysis_by_id[post_id].get("categories", [])),
+                json.dumps(analysis_by_id[post_id].get("tags", [])),
+                analysis_by_id[post_id].get("reasoning"),
+                post_id,
             )
-    conn.commit()
\ No newline at end of file
+            for post_id in post_ids
+            if post_id in analysis_by_id
+        ],
+    )
+    conn.commit()
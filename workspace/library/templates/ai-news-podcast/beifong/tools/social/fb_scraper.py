@@ -2,8 +2,7 @@ import time
 import json
 from tools.social.browser import create_browser_context
 from tools.social.fb_post_extractor import parse_facebook_posts, normalize_facebook_posts_batch
-from tools.social.x_agent import analyze_posts_sentiment
-from tools.social.db import create_connection, setup_database, check_and_store_post, update_posts_with_analysis
+from tools.social.ingest import PostIngestor
 
 
 def contains_facebook_posts(json_obj):
@@ -26,7 +25,7 @@ def contains_facebook_posts(json_obj):
         return False
 
 
-def process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, conn):
+def process_facebook_graphql_response(response_text, seen_post_ids, ingestor):
     posts_processed = 0
     if not response_text:
         return posts_processed
@@ -48,10 +47,7 @@ def process_facebook_graphql_response(response_text, seen_post_ids, analysis_que
                         continue
                     seen_post_ids.add(post_id)
                     posts_processed += 1
-                    needs_analysis = check_and_store_post(conn, post_data)
-                    if needs_analysis and post_data.get("post_text"):
-                        analysis_queue.append(post_data)
-                        queue_post_ids.append(post_id)
+                    ingestor.submit(post_data)
         except json.JSONDecodeError:
             continue
         except Exception as e:
@@ -62,19 +58,14 @@ def process_facebook_graphql_response(response_text, seen_post_ids, analysis_que
 
 
 def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"):
-    conn = create_connection(db_file)
-    setup_database(conn)
     seen_post_ids = set()
-    analysis_queue = []
-    queue_post_ids = []
     post_count = 0
-    batch_size = 5
     scroll_count = 0
 
-    with create_browser_context() as (browser_context, page):
+    with PostIngestor(db_file) as ingestor, create_browser_context() as (browser_context, page):
 
         def handle_response(response):
-            nonlocal post_count, analysis_queue, queue_post_ids
+            nonlocal post_count
             url = response.url
             if "/api/graphql/" not in url:
                 return
@@ -83,19 +74,9 @@ def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"
                 if 'text/html; charset="utf-8"' not in content_type:
                     return
                 response_text = response.text()
-                posts_found = process_facebook_graphql_response(response_text, seen_post_ids, analysis_queue, queue_post_ids, conn)
+                posts_found = process_facebook_graphql_response(response_text, seen_post_ids, ingestor)
                 if posts_found > 0:
                     post_count += posts_found
-                if len(analysis_queue) >= batch_size:
-                    analysis_batch = analysis_queue[:batch_size]
-                    batch_post_ids = queue_post_ids[:batch_size]
-                    analysis_queue = analysis_queue[batch_size:]
-                    queue_post_ids = queue_post_ids[batch_size:]
-                    try:
-                        analysis_results = analyze_posts_sentiment(analysis_batch)
-                        update_posts_with_analysis(conn, batch_post_ids, analysis_results)
-                    except Exception:
-                        pass
             except Exception:
                 pass
 
@@ -116,12 +97,4 @@ def crawl_facebook_feed(target_url="https://facebook.com", db_file="fb_posts.db"
         except KeyboardInterrupt:
             pass
 
-        if analysis_queue:
-            try:
-                analysis_results = analyze_posts_sentiment(analysis_queue)
-                update_posts_with_analysis(conn, queue_post_ids, analysis_results)
-            except Exception:
-                pass
-
-        conn.close()
-        return post_count
+    return post_count
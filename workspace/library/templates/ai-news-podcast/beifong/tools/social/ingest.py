@@ -0,0 +1,204 @@
+import os
+import time
+import queue
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+from tools.social.db import create_connection, setup_database, update_posts_with_analysis, upsert_posts
+
+WRITE_BATCH_SIZE = 50
+WRITE_FLUSH_SEC = 1.0
+ANALYSIS_BATCH_SIZE = 5
+ANALYSIS_FLUSH_SEC = 10.0
+ANALYSIS_WORKERS = int(os.environ.get("SOCIAL_ANALYSIS_WORKERS", "3"))
+_STOP = object()
+
+
+def _collect_batch(items: queue.Queue, batch: List, batch_size: int, flush_sec: float) -> bool:
+    """Fill ``batch`` until it holds ``batch_size`` items or ``flush_sec`` pass without one; ``False`` once the stop marker is read."""
+    deadline = time.monotonic() + flush_sec
+    while len(batch) < batch_size:
+        try:
+            item = items.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            return True
+        if item is _STOP:
+            items.task_done()
+            return False
+        batch.append(item)
+    return True
+
+
+class PostWriter:
+    """
+    Single background thread that owns the social media database connection.
+
+    Posts and analysis results are queued from the scraper and written in
+    batches, one transaction per batch, so page callbacks never wait on
+    SQLite. Posts that turn out to be new and have text go to ``on_new_posts``.
+    """
+
+    def __init__(self, db_file: str, on_new_posts: Optional[Callable[[List[Dict]], None]] = None):
+        self.db_file = db_file
+        self.on_new_posts = on_new_posts
+        self.posts_written = 0
+        self.new_posts = 0
+        self._items: queue.Queue = queue.Queue()
+        self._ready = threading.Event()
+        self._error: Optional[BaseException] = None
+        # background threads run in the caller's context so scheduler runs capture what they print
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,), name="social-post-writer", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def submit(self, post_data: Dict) -> None:
+        self._items.put(("post", post_data))
+
+    def submit_analysis(self, post_ids: List[str], analysis_results: List[Dict]) -> None:
+        self._items.put(("analysis", (post_ids, analysis_results)))
+
+    def flush(self) -> None:
+        """Block until everything queued so far is committed."""
+        self._items.join()
+
+    def close(self) -> None:
+        self._items.put(_STOP)
+        self._thread.join()
+
+    def _write(self, conn, batch: List) -> None:
+        posts = [payload for kind, payload in batch if kind == "post"]
+        try:
+            if posts:
+                stored, new_posts = upsert_posts(conn, posts)
+                self.posts_written += stored
+                self.new_posts += len(new_posts)
+                needs_analysis = [post for post in new_posts if post.get("post_text")]
+                if needs_analysis and self.on_new_posts:
+                    self.on_new_posts(needs_analysis)
+            for kind, payload in batch:
+                if kind == "analysis":
+                    update_posts_with_analysis(conn, *payload)
+        except Exception as e:
+            conn.rollback()
+            print(f"Error writing {len(batch)} social posts: {e}")
+
+    def _run(self) -> None:
+        try:
+            conn = create_connection(self.db_file)
+            setup_database(conn)
+        except BaseException as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        running = True
+        try:
+            while running:
+                batch: List = []
+                running = _collect_batch(self._items, batch, WRITE_BATCH_SIZE, WRITE_FLUSH_SEC)
+                if batch:
+                    self._write(conn, batch)
+                    for _ in batch:
+                        self._items.task_done()
+        finally:
+            conn.close()
+
+
+class AnalysisQueue:
+    """
+    Batches posts for sentiment analysis and runs the batches on a small worker pool.
+
+    A batch goes out once it holds ``ANALYSIS_BATCH_SIZE`` posts or
+    ``ANALYSIS_FLUSH_SEC`` pass without new ones, and up to
+    ``ANALYSIS_WORKERS`` batches are analyzed at a time; results are handed
+    to ``on_results`` for the writer to store.
+    """
+
+    def __init__(
+        self, analyze: Callable[[List[Dict]], List[Dict]], on_results: Callable[[List[str], List[Dict]], None], workers: int = ANALYSIS_WORKERS
+    ):
+        self.analyze = analyze
+        self.on_results = on_results
+        self.batches = 0
+        self.failed_batches = 0
+        self._items: queue.Queue = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="social-analysis")
+        self._thread = threading.Thread(target=contextvars.copy_context().run, args=(self._run,), name="social-analysis-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, posts: List[Dict]) -> None:
+        for post in posts:
+            self._items.put(post)
+
+    def close(self) -> None:
+        """Send the last partial batch and wait for every batch to finish."""
+        self._items.put(_STOP)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _analyze_batch(self, batch: List[Dict]) -> None:
+        post_ids = [post["post_id"] for post in batch]
+        try:
+            results = self.analyze(batch)
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Sentiment analysis failed for {len(batch)} posts: {e}")
+            return
+        self.on_results(post_ids, results)
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch: List[Dict] = []
+            running = _collect_batch(self._items, batch, ANALYSIS_BATCH_SIZE, ANALYSIS_FLUSH_SEC)
+            for _ in batch:
+                self._items.task_done()
+            if batch:
+                self.batches += 1
+                self._pool.submit(contextvars.copy_context().run, self._analyze_batch, batch)
+
+
+class PostIngestor:
+    """
+    Scraper-facing entry point: ``submit`` parsed posts and return to scrolling.
+
+    Storage and analysis happen on background threads. Leaving the ``with``
+    block commits pending posts, analyzes the remaining ones and stores
+    their results before the connection closes.
+    """
+
+    def __init__(self, db_file: str, analyze: Optional[Callable[[List[Dict]], List[Dict]]] = None):
+        if analyze is None:
+            from tools.social.x_agent import analyze_posts_sentiment
+
+            analyze = analyze_posts_sentiment
+        self._analysis: Optional[AnalysisQueue] = None
+        self.writer = PostWriter(db_file, on_new_posts=self._queue_analysis)
+        self._analysis = AnalysisQueue(analyze, self.writer.submit_analysis)
+        self.submitted = 0
+
+    def _queue_analysis(self, posts: List[Dict]) -> None:
+        if self._analysis is not None:
+            self._analysis.submit(posts)
+
+    def submit(self, post_data: Dict) -> None:
+        self.submitted += 1
+        self.writer.submit(post_data)
+
+    def close(self) -> None:
+        self.writer.flush()
+        self._analysis.close()
+        self.writer.close()
+        print(
+            f"INFO: Ingested {self.writer.posts_written} posts ({self.writer.new_posts} new), "
+            f"{self._analysis.batches} analysis batches ({self._analysis.failed_batches} failed)"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
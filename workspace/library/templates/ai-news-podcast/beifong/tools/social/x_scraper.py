@@ -1,24 +1,18 @@
 import time
 from tools.social.browser import create_browser_context
 from tools.social.x_post_extractor import x_post_extractor
-from tools.social.x_agent import analyze_posts_sentiment
-from tools.social.db import create_connection, setup_database, check_and_store_post, update_posts_with_analysis
+from tools.social.ingest import PostIngestor
 
 
 def crawl_x_profile(profile_url, db_file="x_posts.db"):
     if not profile_url.startswith("http"):
         profile_url = f"https://x.com/{profile_url}"
 
-    conn = create_connection(db_file)
-    setup_database(conn)
     seen_post_ids = set()
-    analysis_queue = []
-    queue_post_ids = []
     post_count = 0
-    batch_size = 5
     scroll_count = 0
 
-    with create_browser_context() as (browser_context, page):
+    with PostIngestor(db_file) as ingestor, create_browser_context() as (browser_context, page):
         page.goto(profile_url)
         time.sleep(5)
 
@@ -47,26 +41,7 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
 
                     seen_post_ids.add(post_id)
                     post_count += 1
-
-                    needs_analysis = check_and_store_post(conn, post_data)
-
-                    if needs_analysis and post_data.get("post_text"):
-                        analysis_queue.append(post_data)
-                        queue_post_ids.append(post_id)
-
-                if len(analysis_queue) >= batch_size:
-                    analysis_batch = analysis_queue[:batch_size]
-                    batch_post_ids = queue_post_ids[:batch_size]
-
-                    analysis_queue = analysis_queue[batch_size:]
-                    queue_post_ids = queue_post_ids[batch_size:]
-
-                    try:
-                        analysis_results = analyze_posts_sentiment(analysis_batch)
-
-                        update_posts_with_analysis(conn, batch_post_ids, analysis_results)
-                    except Exception:
-                        pass
+                    ingestor.submit(post_data)
 
                 page.evaluate("window.scrollBy(0, 800)")
                 time.sleep(3)
@@ -76,13 +51,5 @@ def crawl_x_profile(profile_url, db_file="x_posts.db"):
                     break
 
         except KeyboardInterrupt:
-            if analysis_queue:
-                try:
-                    analysis_results = analyze_posts_sentiment(analysis_queue)
-                    update_posts_with_analysis(conn, queue_post_ids, analysis_results)
-                except Exception:
-                    pass
-
-            conn.close()
-            return post_count
-        return post_count
\ No newline at end of file
+            pass
+    return post_count
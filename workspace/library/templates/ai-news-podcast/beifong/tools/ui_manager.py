@@ -29,5 +29,5 @@ def ui_manager_run(
     for ui_state in all_ui_states:
         if ui_state != state_type:
             current_state[ui_state] = False
-    SessionService.save_session(session_id, current_state)
+    SessionService.save_session(session_id, current_state, session["version"])
     return f"Updated {state_type} to {active}{' and all other UI states to False' if all_ui_states else ''}."
\ No newline at end of file
@@ -26,5 +26,5 @@ def user_source_selection_run(
             src["confirmed"] = True
         else:
             src["confirmed"] = False
-    SessionService.save_session(session_id, session_state)
+    SessionService.save_session(session_id, session_state, session["version"])
     return f"Updated selected sources to {selected_sources}."
@@ -0,0 +1,170 @@
+import os
+from typing import Iterable, Optional
+import numpy as np
+import soundfile as sf
+from utils.tts_render import Audio, decode_audio_bytes, resample
+
+PODCAST_AUDIO_FORMAT = os.environ.get("PODCAST_AUDIO_FORMAT", "mp3").lower()
+TARGET_PEAK = 0.95
+PARTIAL_SUFFIX = ".partial"
+
+# extension -> (libsndfile container, subtype, media type, sample rates the encoder accepts or None for any)
+AUDIO_FORMATS = {
+    ".mp3": ("MP3", "MPEG_LAYER_III", "audio/mpeg", (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)),
+    ".opus": ("OGG", "OPUS", "audio/ogg", (8000, 12000, 16000, 24000, 48000)),
+    ".wav": ("WAV", "PCM_16", "audio/wav", None),
+}
+
+
+def _encoder_available(extension: str) -> bool:
+    if extension not in AUDIO_FORMATS:
+        return False
+    container, subtype, _, _ = AUDIO_FORMATS[extension]
+    return container in sf.available_formats() and subtype in sf.available_subtypes(container)
+
+
+def audio_extension(audio_format: Optional[str] = None) -> str:
+    """File extension for newly rendered podcasts (``PODCAST_AUDIO_FORMAT``), falling back to ``.wav`` if libsndfile cannot encode it."""
+    extension = "." + (audio_format or PODCAST_AUDIO_FORMAT).lower().lstrip(".")
+    if _encoder_available(extension):
+        return extension
+    if extension != ".wav":
+        print(f"WARNING: libsndfile {sf.__libsndfile_version__} cannot encode {extension}, writing WAV instead")
+    return ".wav"
+
+
+def media_type(path: str) -> str:
+    entry = AUDIO_FORMATS.get(os.path.splitext(path)[1].lower())
+    return entry[2] if entry else "application/octet-stream"
+
+
+def is_rendering(path: str) -> bool:
+    """Whether ``path`` is still being written by a ``StreamingMixer``."""
+    return os.path.exists(path + PARTIAL_SUFFIX)
+
+
+class StreamingMixer:
+    """
+    Append-only mono podcast writer that encodes while the show is still being synthesized.
+
+    Every block goes straight to the encoder, so memory stays at one segment
+    however long the show is. Speech is only ever attenuated, never boosted:
+    a block that pushes the running peak above ``target_peak`` is scaled down
+    to it, and so is everything after it. Output stays below ``target_peak``
+    without a second pass over the whole file, and quiet lines keep their
+    level instead of being raised to full scale. The file sits at its final
+    path from the first block, with a ``.partial`` marker beside it until
+    ``close``, so ``/stream-audio`` can start serving it straight away.
+    """
+
+    def __init__(self, output_path: str, sampling_rate: int, target_peak: float = TARGET_PEAK):
+        extension = os.path.splitext(output_path)[1].lower()
+        if not _encoder_available(extension):
+            raise ValueError(f"Unsupported podcast audio format: {extension or output_path}")
+        container, subtype, _, rates = AUDIO_FORMATS[extension]
+        self.output_path = output_path
+        self.input_rate = sampling_rate
+        self.sampling_rate = sampling_rate if rates is None or sampling_rate in rates else max(rates)
+        self.target_peak = target_peak
+        self.peak = 0.0
+        self.frames = 0
+        with open(output_path + PARTIAL_SUFFIX, "w"):
+            pass
+        try:
+            self._file = sf.SoundFile(output_path, "w", samplerate=self.sampling_rate, channels=1, format=container, subtype=subtype)
+        except Exception:
+            os.remove(output_path + PARTIAL_SUFFIX)
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(success=exc_type is None)
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sampling_rate
+
+    def _write(self, audio: np.ndarray) -> None:
+        if not len(audio):
+            return
+        self._file.write(np.clip(audio, -1.0, 1.0))
+        self._file.flush()
+        self.frames += len(audio)
+
+    def append(self, audio: np.ndarray, sampling_rate: Optional[int] = None, normalize: bool = True) -> None:
+        audio = np.asarray(audio, dtype=np.float32)
+        if audio.ndim == 2:
+            audio = audio.mean(axis=1)
+        audio = resample(audio, sampling_rate or self.input_rate, self.sampling_rate)
+        if normalize and len(audio):
+            self.peak = max(self.peak, float(np.max(np.abs(audio))))
+            if self.peak > self.target_peak:
+                audio = audio * (self.target_peak / self.peak)
+        self._write(audio)
+
+    def append_silence(self, seconds: float) -> None:
+        self._write(np.zeros(int(self.sampling_rate * seconds), dtype=np.float32))
+
+    def append_file(self, path: Optional[str]) -> bool:
+        """Append a music bed such as an intro or outro at its own level; a missing or unreadable file is skipped."""
+        if not path or not os.path.exists(path):
+            return False
+        with open(path, "rb") as f:
+            decoded = decode_audio_bytes(f.read(), os.path.splitext(path)[1].lstrip(".") or "mp3")
+        if decoded is None:
+            print(f"WARNING: Could not add {path}, continuing without it")
+            return False
+        audio, rate = decoded
+        self.append(audio, rate, normalize=False)
+        print(f"INFO: Added {os.path.basename(path)} ({len(audio) / rate:.1f} seconds)")
+        return True
+
+    def close(self, success: bool = True) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        if not success and os.path.exists(self.output_path):
+            os.remove(self.output_path)
+        if os.path.exists(self.output_path + PARTIAL_SUFFIX):
+            os.remove(self.output_path + PARTIAL_SUFFIX)
+
+
+def write_podcast(
+    segments: Iterable[Optional[Audio]],
+    output_path: str,
+    silence_duration: float = 0.7,
+    intro_path: Optional[str] = None,
+    outro_path: Optional[str] = None,
+    target_peak: float = TARGET_PEAK,
+) -> Optional[float]:
+    """
+    Stream ``(audio, sampling_rate)`` segments into ``output_path`` as they arrive.
+
+    ``None`` entries (failed segments) are skipped and ``silence_duration``
+    seconds separate the rest. The file is encoded at the first segment's
+    rate, once that segment arrives, and later segments are resampled to it.
+    Returns the seconds written, or ``None`` when no segment produced audio.
+    """
+    mixer = None
+    try:
+        for segment in segments:
+            if segment is None or not len(segment[0]):
+                continue
+            audio, rate = segment
+            if mixer is None:
+                mixer = StreamingMixer(output_path, rate, target_peak)
+                mixer.append_file(intro_path)
+            else:
+                mixer.append_silence(silence_duration)
+            mixer.append(audio, rate)
+        if mixer is None:
+            return None
+        mixer.append_file(outro_path)
+    except BaseException:
+        if mixer is not None:
+            mixer.close(success=False)
+        raise
+    mixer.close()
+    return mixer.duration
@@ -1,7 +1,10 @@
+import re
 import requests
+import lxml.html
+from lxml import etree
 from bs4 import BeautifulSoup
 import random
-from typing import Dict, List, TypedDict
+from typing import Dict, List, Optional, TypedDict
 
 
 class MetadataDict(TypedDict):
@@ -10,6 +13,7 @@ class MetadataDict(TypedDict):
     og: Dict[str, str]
     twitter: Dict[str, str]
     other_meta: Dict[str, str]
+    canonical_url: str
 
 
 class WebData(TypedDict):
@@ -31,6 +35,36 @@ HEADERS: Dict[str, str] = {
     "Connection": "keep-alive",
     "Upgrade-Insecure-Requests": "1",
 }
+BOILERPLATE_TAGS = ("script", "style", "noscript", "template", "nav", "header", "footer", "aside", "form", "iframe", "svg", "button")
+BLOCK_TAGS = (
+    "p",
+    "div",
+    "section",
+    "article",
+    "main",
+    "li",
+    "ul",
+    "ol",
+    "h1",
+    "h2",
+    "h3",
+    "h4",
+    "h5",
+    "h6",
+    "br",
+    "tr",
+    "blockquote",
+    "pre",
+    "figcaption",
+)
+BOILERPLATE_HINTS = re.compile(
+    r"comment|share|social|related|recommend|promo|sponsor|advert|\bads?\b|cookie|consent|newsletter|subscribe|sidebar|breadcrumb|menu|popup|modal|banner",
+    re.I,
+)
+CONTENT_HINTS = re.compile(r"article|content|entry|main|post|story|body|text", re.I)
+# page-level containers; class names like "has-sidebar" or "menu-open" on these describe the layout, not boilerplate
+STRUCTURAL_TAGS = frozenset(("html", "body", "main", "article"))
+MIN_CONTENT_CHARS = 200
 
 
 def extract_meta_tags(soup: BeautifulSoup) -> MetadataDict:
@@ -40,6 +74,7 @@ def extract_meta_tags(soup: BeautifulSoup) -> MetadataDict:
         "og": {},
         "twitter": {},
         "other_meta": {},
+        "canonical_url": "",
     }
     title_tag = soup.find("title")
     if title_tag:
@@ -58,6 +93,9 @@ def extract_meta_tags(soup: BeautifulSoup) -> MetadataDict:
             metadata["other_meta"][name] = content
             if name == "description":
                 metadata["description"] = content
+    canonical_link = soup.find("link", rel="canonical")
+    if canonical_link:
+        metadata["canonical_url"] = canonical_link.get("href", "").strip()
     return metadata
 
 
@@ -68,3 +106,122 @@ def get_web_data(url: str) -> WebData:
     metadata = extract_meta_tags(soup)
     body = str(soup.find("body"))
     return {"raw_html": body, "metadata": metadata}
+
+
+def extract_web_data(content: bytes, encoding: Optional[str] = None) -> WebData:
+    """lxml counterpart of get_web_data's parsing step; plain function so it can run in a process pool."""
+    metadata: MetadataDict = {
+        "title": "",
+        "description": "",
+        "og": {},
+        "twitter": {},
+        "other_meta": {},
+        "canonical_url": "",
+    }
+    if not content:
+        return {"raw_html": "", "metadata": metadata}
+    try:
+        doc = lxml.html.fromstring(content.decode(encoding, errors="replace") if encoding else content)
+    except ValueError:
+        # unicode input with an XML encoding declaration; let lxml sniff the bytes instead
+        doc = lxml.html.fromstring(content)
+    title_tag = doc.find(".//title")
+    if title_tag is not None:
+        metadata["title"] = title_tag.text_content().strip()
+    for meta in doc.iter("meta"):
+        name = (meta.get("name") or "").lower()
+        prop = (meta.get("property") or "").lower()
+        meta_content = meta.get("content") or ""
+        if prop.startswith("og:"):
+            metadata["og"][prop[3:]] = meta_content
+        elif prop.startswith("twitter:") or name.startswith("twitter:"):
+            twitter_key = prop[8:] if prop.startswith("twitter:") else name[8:]
+            metadata["twitter"][twitter_key] = meta_content
+        elif name in ["description", "keywords", "author", "robots", "viewport"]:
+            metadata["other_meta"][name] = meta_content
+            if name == "description":
+                metadata["description"] = meta_content
+    for link in doc.iter("link"):
+        if (link.get("rel") or "").lower() == "canonical" and link.get("href"):
+            metadata["canonical_url"] = link.get("href").strip()
+            break
+    body = doc.find(".//body")
+    raw_html = lxml.html.tostring(body, encoding="unicode") if body is not None else ""
+    return {"raw_html": raw_html, "metadata": metadata}
+
+
+def _is_boilerplate(element):
+    if element.tag in STRUCTURAL_TAGS:
+        return False
+    tokens = f"{element.get('class', '')} {element.get('id', '')} {element.get('role', '')}".split()
+    # hints are judged per class/id token, so "related-posts" counts as boilerplate despite containing "post";
+    # only a token with a content hint and no boilerplate hint ("post", "entry-content") keeps the element
+    boilerplate = [token for token in tokens if BOILERPLATE_HINTS.search(token)]
+    return bool(boilerplate) and not any(CONTENT_HINTS.search(token) for token in tokens if token not in boilerplate)
+
+
+def _main_content(doc):
+    """Readability-style pick of the element holding most of the paragraph text, or the whole page if nothing stands out."""
+    scores = {}
+    for paragraph in doc.iter("p", "pre", "blockquote"):
+        length = len(paragraph.text_content().strip())
+        if length < 25:
+            continue
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0) + length
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0) + length / 2
+    if not scores:
+        return doc
+    best = max(scores, key=scores.get)
+    return best if scores[best] >= MIN_CONTENT_CHARS else doc
+
+
+def truncate_to_tokens(text, max_tokens):
+    if max_tokens and len(text) / 4 > max_tokens:
+        return text[: max_tokens * 4]
+    return text
+
+
+def _extract_clean_text_bs4(raw_html, max_tokens=8000):
+    soup = BeautifulSoup(raw_html, "html.parser")
+    for element in soup(["script", "style", "nav", "header", "footer", "aside"]):
+        element.decompose()
+    text = soup.get_text(separator="\n", strip=True)
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    return truncate_to_tokens("\n".join(lines), max_tokens)
+
+
+def extract_clean_text(raw_html, max_tokens=8000):
+    """
+    Main article text of ``raw_html`` with navigation, ads and other page chrome removed.
+
+    Parsing is done with lxml; boilerplate tags are dropped, the densest
+    paragraph container is picked, and blocks inside it whose class or id
+    look like sharing widgets, comments or promos are removed. Containers of
+    the picked element are never dropped. Pages lxml cannot parse, or where
+    this leaves less than ``MIN_CONTENT_CHARS``, go through BeautifulSoup
+    instead. ``max_tokens=None`` keeps the full text.
+    """
+    if not raw_html or not raw_html.strip():
+        return ""
+    try:
+        doc = lxml.html.fromstring(raw_html)
+    except (etree.ParserError, ValueError):
+        return _extract_clean_text_bs4(raw_html, max_tokens)
+    etree.strip_elements(doc, *BOILERPLATE_TAGS, etree.Comment, with_tail=False)
+    root = _main_content(doc)
+    for element in [el for el in root.iterdescendants(etree.Element) if _is_boilerplate(el)]:
+        # descendants of an already dropped block are detached with it
+        if element.getparent() is not None:
+            element.drop_tree()
+    for element in root.iter(*BLOCK_TAGS):
+        element.tail = "\n" + (element.tail or "")
+    lines = [line.strip() for line in root.text_content().splitlines() if line.strip()]
+    text = "\n".join(lines)
+    if len(text) < MIN_CONTENT_CHARS:
+        return _extract_clean_text_bs4(raw_html, max_tokens)
+    return truncate_to_tokens(text, max_tokens)
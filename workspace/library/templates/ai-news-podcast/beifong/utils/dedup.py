@@ -0,0 +1,135 @@
+import re
+import hashlib
+from typing import List, Optional, TypedDict
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+import numpy as np
+from utils.crawl_url import extract_clean_text
+
+TRACKING_PARAMS = {
+    "fbclid",
+    "gclid",
+    "dclid",
+    "msclkid",
+    "yclid",
+    "igshid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "ref_src",
+    "ref_url",
+    "referrer",
+    "source",
+    "cmpid",
+    "ito",
+    "ncid",
+    "sr_share",
+    "smid",
+    "guccounter",
+    "guce_referrer",
+    "guce_referrer_sig",
+    "_ga",
+    "_gl",
+    "rss",
+    "outputtype",
+}
+TRACKING_PREFIXES = ("utm_", "mtm_", "pk_", "piwik_", "_hs", "hmb_", "oly_", "vero_", "wt.")
+SHINGLE_SIZE = 3
+MIN_FINGERPRINT_WORDS = 50
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Fingerprint(TypedDict):
+    content_hash: Optional[str]
+    simhash: Optional[int]
+    words: int
+
+
+def canonicalize_url(url: Optional[str], base_url: Optional[str] = None) -> str:
+    """
+    Normalized form of ``url`` used to recognise the same article behind different links.
+
+    Scheme and host are lower-cased (``http`` is treated as ``https`` and a
+    leading ``www.`` is dropped), default ports, fragments, trailing slashes
+    and ``/amp`` suffixes are removed, and tracking parameters are stripped
+    from the query, whose remaining parameters are sorted. Relative URLs (a
+    page's ``rel=canonical``) are resolved against ``base_url``.
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+    host = parts.hostname.lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path or "/")
+    if path.endswith("/amp") or path.endswith("/amp/"):
+        path = path[: path.rindex("/amp")] or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
+
+
+def page_canonical_url(declared: Optional[str], final_url: str) -> str:
+    """
+    Canonical URL of a fetched page: its ``rel=canonical`` link if it has one, else the URL redirects ended at.
+
+    A declared canonical pointing at the site root from an article page is a
+    common CMS misconfiguration and is ignored.
+    """
+    resolved = canonicalize_url(final_url)
+    if declared:
+        candidate = canonicalize_url(declared, base_url=final_url)
+        if urlsplit(candidate).path != "/" or urlsplit(resolved).path == "/":
+            return candidate
+    return resolved
+
+
+def _words(text: str) -> List[str]:
+    return WORD_RE.findall(text.lower())
+
+
+def content_hash(words: List[str]) -> str:
+    return hashlib.sha256(" ".join(words).encode("utf-8")).hexdigest()
+
+
+def simhash(words: List[str], shingle_size: int = SHINGLE_SIZE) -> Optional[int]:
+    """
+    64-bit SimHash over word shingles; texts with few differing shingles land a few bits apart.
+
+    Returns ``None`` for texts shorter than ``MIN_FINGERPRINT_WORDS``, where a
+    handful of shared words would make unrelated pages look alike.
+    """
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return None
+    shingles = {" ".join(words[i : i + shingle_size]) for i in range(len(words) - shingle_size + 1)}
+    digests = b"".join(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest() for shingle in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    value = 0
+    for position in np.flatnonzero(votes > 0):
+        value |= 1 << int(position)
+    return value
+
+
+def fingerprint_text(text: str) -> Fingerprint:
+    """Exact and near-duplicate hashes of ``text``; both are ``None`` for texts too short to tell apart reliably."""
+    words = _words(text)
+    if len(words) < MIN_FINGERPRINT_WORDS:
+        return {"content_hash": None, "simhash": None, "words": len(words)}
+    return {"content_hash": content_hash(words), "simhash": simhash(words), "words": len(words)}
+
+
+def fingerprint_html(raw_html: str) -> Fingerprint:
+    """Fingerprint of a page's cleaned article text; plain function so it can run in a process pool."""
+    return fingerprint_text(extract_clean_text(raw_html, max_tokens=None))
@@ -0,0 +1,159 @@
+import asyncio
+import hashlib
+import random
+from typing import Dict, List, Optional
+import openai
+from openai import AsyncOpenAI
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+MAX_INPUT_TOKENS = 8191
+MAX_BATCH_TOKENS = 100_000
+MAX_BATCH_INPUTS = 256
+MAX_CONCURRENT_REQUESTS = 4
+MAX_RETRIES = 6
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def content_hash(text: str, model: str = EMBEDDING_MODEL) -> str:
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingBatcher:
+    """
+    Packs many texts into each embeddings request (bounded by input count and
+    token budget), runs a bounded number of requests concurrently and retries
+    rate-limit/transient errors with jittered exponential backoff.
+
+    Identical texts are coalesced: within one ``embed`` call they are sent once,
+    and concurrent calls asking for a text already in flight await the same
+    result. Point ``base_url`` at a stub server to measure throughput offline.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = EMBEDDING_MODEL,
+        base_url: Optional[str] = None,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_batch_inputs: int = MAX_BATCH_INPUTS,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
+        max_retries: int = MAX_RETRIES,
+    ):
+        self.model = model
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_inputs = max_batch_inputs
+        self.max_retries = max_retries
+        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        self.requests_sent = 0
+        self.retries = 0
+
+    def _fit(self, text: str):
+        """Return ``(text, token_count)`` truncated to the model's per-input limit."""
+        if self._encoding is None:
+            text = text[: MAX_INPUT_TOKENS * 3]
+            return text, max(1, len(text) // 3)
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) > MAX_INPUT_TOKENS:
+            tokens = tokens[:MAX_INPUT_TOKENS]
+            text = self._encoding.decode(tokens)
+        return text, len(tokens)
+
+    def _pack(self, token_counts: List[int]) -> List[List[int]]:
+        """Group text indices into request batches under the token and input-count limits."""
+        batches, current, current_tokens = [], [], 0
+        for index, tokens in enumerate(token_counts):
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_inputs):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _request(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.requests_sent += 1
+                    response = await self.client.embeddings.create(input=texts, model=self.model)
+                return [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    raise
+                retry_after = None
+                if isinstance(e, openai.APIStatusError):
+                    try:
+                        retry_after = float(e.response.headers.get("retry-after"))
+                    except (TypeError, ValueError):
+                        retry_after = None
+                delay = retry_after if retry_after is not None else min(60, 2**attempt) * (0.5 + random.random())
+                self.retries += 1
+                print(f"Embedding request throttled ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    async def _embed_unique(self, keys: List[str], texts: List[str], futures: Dict[str, asyncio.Future]):
+        fitted = [self._fit(text) for text in texts]
+
+        async def run_batch(indices):
+            try:
+                vectors = await self._request([fitted[i][0] for i in indices])
+                for i, vector in zip(indices, vectors):
+                    futures[keys[i]].set_result(vector)
+            except Exception as e:
+                print(f"Error generating embeddings for batch of {len(indices)}: {str(e)}")
+                for i in indices:
+                    if not futures[keys[i]].done():
+                        futures[keys[i]].set_result(None)
+
+        try:
+            await asyncio.gather(*[run_batch(indices) for indices in self._pack([tokens for _, tokens in fitted])])
+        finally:
+            for key in keys:
+                self._inflight.pop(key, None)
+                if not futures[key].done():
+                    futures[key].set_result(None)
+
+    async def embed(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Embeddings in input order; ``None`` for texts whose batch ultimately failed."""
+        loop = asyncio.get_running_loop()
+        keys = [content_hash(text, self.model) for text in texts]
+        futures: Dict[str, asyncio.Future] = {}
+        new_keys, new_texts = [], []
+        for key, text in zip(keys, texts):
+            if key in futures:
+                continue
+            if key in self._inflight:
+                futures[key] = self._inflight[key]
+                continue
+            future = loop.create_future()
+            futures[key] = future
+            self._inflight[key] = future
+            new_keys.append(key)
+            new_texts.append(text)
+        if new_texts:
+            await self._embed_unique(new_keys, new_texts, futures)
+        return [await futures[key] for key in keys]
+
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,144 @@
+import os
+import time
+import threading
+from typing import List, Optional, Tuple
+import numpy as np
+import faiss
+from db.config import get_faiss_db_path
+
+RELOAD_CHECK_INTERVAL = 2.0
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _read_index(index_path):
+    # IVF inverted lists and flat codes can be memory-mapped; other index types fall back to a normal load
+    try:
+        return faiss.read_index(index_path, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+    except RuntimeError:
+        return faiss.read_index(index_path)
+
+
+class _IndexSnapshot:
+    def __init__(self, index, id_map, signature):
+        self.index = index
+        self.id_map = id_map
+        self.signature = signature
+
+
+class FaissSearchService:
+    """
+    Process-resident FAISS searcher.
+
+    The index is loaded once (memory-mapped where the index type allows it) and
+    the ID map is kept as a NumPy array. The index and mapping files are
+    re-checked at most every ``reload_interval`` seconds. When the indexer
+    replaces them, a fresh snapshot is loaded and swapped in with a single
+    reference assignment, so in-flight searches finish on the snapshot they
+    started with.
+    """
+
+    def __init__(self, index_path=None, mapping_path=None, reload_interval=RELOAD_CHECK_INTERVAL, search_params=None):
+        default_index_path, default_mapping_path = get_faiss_db_path()
+        self.index_path = index_path or default_index_path
+        self.mapping_path = mapping_path or default_mapping_path
+        self.reload_interval = reload_interval
+        self.search_params = search_params or {}
+        self._snapshot: Optional[_IndexSnapshot] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _signature(self):
+        return _file_signature(self.index_path), _file_signature(self.mapping_path)
+
+    def _apply_search_params(self, index):
+        base = faiss.downcast_index(index.index) if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)) else index
+        if isinstance(base, faiss.IndexIVF) and "nprobe" in self.search_params:
+            base.nprobe = self.search_params["nprobe"]
+        if hasattr(base, "hnsw") and "ef" in self.search_params:
+            base.hnsw.efSearch = self.search_params["ef"]
+
+    def _load(self, signature):
+        index = _read_index(self.index_path)
+        self._apply_search_params(index)
+        id_map = None
+        # IndexIDMap variants already return article ids as labels
+        if signature[1] is not None and not isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+            id_map = np.load(self.mapping_path)
+        return _IndexSnapshot(index, id_map, signature)
+
+    def snapshot(self) -> Optional[_IndexSnapshot]:
+        """Current index snapshot, reloading first if the files on disk changed."""
+        now = time.monotonic()
+        current = self._snapshot
+        if current is not None and now - self._last_check < self.reload_interval:
+            return current
+        with self._lock:
+            if self._snapshot is not None and now - self._last_check < self.reload_interval:
+                return self._snapshot
+            self._last_check = now
+            signature = self._signature()
+            if signature[0] is None:
+                return self._snapshot
+            if self._snapshot is None or self._snapshot.signature != signature:
+                try:
+                    self._snapshot = self._load(signature)
+                    print(f"Loaded FAISS index with {self._snapshot.index.ntotal} vectors from {self.index_path}")
+                except Exception as e:
+                    print(f"Error loading FAISS index: {str(e)}")
+            return self._snapshot
+
+    def is_available(self) -> bool:
+        return self.snapshot() is not None
+
+    def search(self, query_vectors, top_k=10) -> List[List[Tuple[int, float]]]:
+        """
+        Batched k-NN search.
+
+        ``query_vectors`` is an ``(n, d)`` array-like; returns one list of
+        ``(article_id, distance)`` per query, nearest first.
+        """
+        snapshot = self.snapshot()
+        if snapshot is None:
+            raise FileNotFoundError(f"FAISS index not found at {self.index_path}")
+        queries = np.ascontiguousarray(np.atleast_2d(np.asarray(query_vectors, dtype=np.float32)))
+        distances, labels = snapshot.index.search(queries, top_k)
+        id_map = snapshot.id_map
+        results = []
+        for row_distances, row_labels in zip(distances, labels):
+            row = []
+            for distance, label in zip(row_distances, row_labels):
+                if label < 0:
+                    continue
+                if id_map is not None:
+                    if label >= len(id_map):
+                        continue
+                    article_id = int(id_map[label])
+                else:
+                    article_id = int(label)
+                row.append((article_id, float(distance)))
+            results.append(row)
+        return results
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_search_service(index_path=None, mapping_path=None) -> FaissSearchService:
+    default_index_path, default_mapping_path = get_faiss_db_path()
+    key = (index_path or default_index_path, mapping_path or default_mapping_path)
+    service = _services.get(key)
+    if service is None:
+        with _services_lock:
+            service = _services.get(key)
+            if service is None:
+                service = FaissSearchService(index_path=key[0], mapping_path=key[1])
+                _services[key] = service
+    return service
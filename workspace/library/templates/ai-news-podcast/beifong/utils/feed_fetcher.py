@@ -0,0 +1,65 @@
+import asyncio
+import random
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+import httpx
+from utils.crawl_url import USER_AGENTS
+
+FEED_ACCEPT = "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.8, */*;q=0.5"
+
+
+class HostLimiter:
+    """Per-host politeness: caps concurrent requests and spaces request starts to the same host."""
+
+    def __init__(self, per_host_limit: int = 2, min_interval: float = 1.0):
+        self.min_interval = min_interval
+        self._semaphores = defaultdict(lambda: asyncio.Semaphore(per_host_limit))
+        self._next_slot: Dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        async with self._semaphores[host]:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_slot.get(host, 0.0))
+            self._next_slot[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+def create_feed_client(max_connections: int = 100, timeout: float = 20.0) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        follow_redirects=True,
+        timeout=httpx.Timeout(timeout),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        headers={"User-Agent": random.choice(USER_AGENTS), "Accept": FEED_ACCEPT},
+    )
+
+
+async def fetch_feed(
+    client: httpx.AsyncClient,
+    feed_url: str,
+    limiter: HostLimiter,
+    global_limit: asyncio.Semaphore,
+    etag: Optional[str] = None,
+    modified: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Conditional GET of a feed. A 304 comes back without a body, so unchanged feeds cost one round trip."""
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if modified:
+        headers["If-Modified-Since"] = modified
+    host = urlparse(feed_url).netloc.lower()
+    async with global_limit:
+        async with limiter.slot(host):
+            response = await client.get(feed_url, headers=headers)
+    return {
+        "status": response.status_code,
+        "content": response.content if response.status_code != 304 else b"",
+        "etag": response.headers.get("etag", etag),
+        "modified": response.headers.get("last-modified", modified),
+    }
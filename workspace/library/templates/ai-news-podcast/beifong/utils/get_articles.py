@@ -3,8 +3,13 @@ import openai
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
+from db.fts import ARTICLES_FTS, ARTICLES_RANK, build_match_query
+from db.hydration import hydrate_articles
+from utils.embedding_batcher import EMBEDDING_MODEL
 
 TOPIC_EXTRACTION_MODEL = "gpt-4o-mini"
+HYBRID_CANDIDATES_FACTOR = 5
+RRF_K = 60
 
 
 def extract_search_terms(prompt: str, api_key: str, max_terms: int = 10) -> list:
@@ -44,7 +49,15 @@ def search_articles(
     from_date: str = None,
     use_categories: bool = True,
     fallback_to_broader: bool = True,
+    mode: str = "keyword",
 ) -> List[Dict[str, Any]]:
+    """
+    Search recent processed articles for a natural-language ``prompt``.
+
+    ``mode="keyword"`` ranks full-text matches of LLM-extracted terms by BM25;
+    ``mode="hybrid"`` additionally embeds the prompt, searches the FAISS index
+    and fuses both rankings with reciprocal rank fusion.
+    """
     if from_date is None:
         from_date = (datetime.now() - timedelta(hours=48)).isoformat()
     terms = extract_search_terms(prompt, api_key)
@@ -56,8 +69,11 @@ def search_articles(
     cursor = conn.cursor()
     results = []
     try:
-        results = _execute_search(cursor, terms, from_date, operator, limit, use_categories)
-        if fallback_to_broader and len(results) < min(5, limit):
+        if mode == "hybrid":
+            results = _execute_hybrid_search(cursor, prompt, terms, from_date, operator, limit, use_categories, api_key)
+        else:
+            results = _execute_search(cursor, terms, from_date, operator, limit, use_categories)
+        if mode != "hybrid" and fallback_to_broader and len(results) < min(5, limit):
             print(f"Initial search returned only {len(results)} results. Trying broader search...")
             if operator == "AND":
                 broader_results = _execute_search(
@@ -71,10 +87,7 @@ def search_articles(
                 if len(broader_results) > len(results):
                     print(f"Broader search found {len(broader_results)} results")
                     results = broader_results
-        if results:
-            _add_source_names(cursor, results)
-        for article in results:
-            article["categories"] = _get_article_categories(cursor, article["id"])
+        hydrate_articles(results, tracking_db_path=db_path)
     except Exception as e:
         print(f"Error searching articles: {e}")
     finally:
@@ -99,6 +112,40 @@ def _execute_search(
             from_date = adjusted_date
         except Exception as e:
             print(f"Warning: Could not adjust date with fallback: {e}")
+    match = build_match_query(terms, operator)
+    if match is None:
+        return []
+    if not _has_table(cursor, ARTICLES_FTS):
+        return _execute_like_search(cursor, terms, from_date, operator, limit, use_categories)
+    matches = f"SELECT rowid AS id, {ARTICLES_RANK} AS rank FROM {ARTICLES_FTS} WHERE {ARTICLES_FTS} MATCH ?"
+    params = [match]
+    rank, group_by = "m.rank", ""
+    if use_categories and operator != "AND":
+        # a category hit ranks below every text hit (bm25 scores are negative)
+        placeholders = ",".join(["?"] * len(terms))
+        matches += f" UNION ALL SELECT article_id, 0 FROM article_categories WHERE category_name IN ({placeholders})"
+        params.extend(str(term).lower() for term in terms)
+        rank, group_by = "MIN(m.rank)", "GROUP BY ca.id"
+    sql = f"""
+        SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
+               ca.source_id, ca.feed_id, {rank} AS rank
+        FROM ({matches}) m
+        JOIN crawled_articles ca ON ca.id = m.id
+        WHERE ca.processed = 1 AND ca.published_date >= ?
+        {group_by}
+        ORDER BY rank, ca.published_date DESC
+        LIMIT ?
+    """
+    params.extend([from_date, limit])
+    cursor.execute(sql, params)
+    results = [dict(row) for row in cursor.fetchall()]
+    for article in results:
+        article.pop("rank", None)
+    return results
+
+
+def _execute_like_search(cursor, terms, from_date, operator, limit, use_categories=True):
+    """Substring scan used when the database predates the FTS index."""
     base_query = """
         SELECT DISTINCT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content, 
                ca.source_id, ca.feed_id
@@ -130,61 +177,52 @@ def _execute_search(
     return [dict(row) for row in cursor.fetchall()]
 
 
-def _add_source_names(cursor, articles):
-    source_ids = {a.get("source_id") for a in articles if a.get("source_id")}
-    feed_ids = {a.get("feed_id") for a in articles if a.get("feed_id")}
-    if not source_ids and not feed_ids:
-        return
-    source_names = {}
-    if source_ids:
-        source_ids = [id for id in source_ids if id is not None]
-        if source_ids:
-            placeholders = ",".join(["?"] * len(source_ids))
-            try:
-                cursor.execute(
-                    f"SELECT id, name FROM sources WHERE id IN ({placeholders})",
-                    list(source_ids),
-                )
-                for row in cursor.fetchall():
-                    source_names[row["id"]] = row["name"]
-            except Exception as e:
-                print(f"Error fetching source names: {e}")
-    if feed_ids:
-        feed_ids = [id for id in feed_ids if id is not None]
-        if feed_ids:
-            placeholders = ",".join(["?"] * len(feed_ids))
-            try:
-                cursor.execute(
-                    f"""
-                    SELECT sf.id, s.name 
-                    FROM source_feeds sf
-                    JOIN sources s ON sf.source_id = s.id
-                    WHERE sf.id IN ({placeholders})
-                """,
-                    list(feed_ids),
-                )
-                for row in cursor.fetchall():
-                    source_names[row["id"]] = row["name"]
-            except Exception as e:
-                print(f"Error fetching feed source names: {e}")
-    for article in articles:
-        source_id = article.get("source_id")
-        feed_id = article.get("feed_id")
-        if source_id and source_id in source_names:
-            article["source_name"] = source_names[source_id]
-        elif feed_id and feed_id in source_names:
-            article["source_name"] = source_names[feed_id]
-        else:
-            article["source_name"] = "Unknown Source"
-
-
-def _get_article_categories(cursor, article_id):
+def _execute_hybrid_search(cursor, prompt, terms, from_date, operator, limit, use_categories, api_key):
+    candidates = limit * HYBRID_CANDIDATES_FACTOR
+    keyword_results = _execute_search(cursor, terms, from_date, operator, candidates, use_categories)
+    semantic_ids = []
     try:
-        cursor.execute(
-            "SELECT category_name FROM article_categories WHERE article_id = ?",
-            (article_id,),
-        )
-        return [row["category_name"] for row in cursor.fetchall()]
+        from utils.faiss_search import get_search_service
+
+        service = get_search_service()
+        if service.is_available():
+            client = openai.OpenAI(api_key=api_key)
+            embedding = client.embeddings.create(input=prompt, model=EMBEDDING_MODEL).data[0].embedding
+            semantic_ids = [article_id for article_id, _ in service.search([embedding], candidates)[0]]
     except Exception as e:
-        print(f"Error fetching article categories: {e}")
-        return []
+        print(f"Semantic leg of hybrid search failed, using keyword results only: {e}")
+    fused = reciprocal_rank_fusion([[article["id"] for article in keyword_results], semantic_ids])
+    by_id = {article["id"]: article for article in keyword_results}
+    missing = [article_id for article_id in fused if article_id not in by_id]
+    if missing:
+        by_id.update({article["id"]: article for article in _fetch_articles(cursor, missing, from_date)})
+    # semantic hits outside the date window or not yet processed are dropped here
+    return [by_id[article_id] for article_id in fused if article_id in by_id][:limit]
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Merge ranked id lists by summed ``1 / (k + rank)``; robust to the incomparable scales of BM25 and L2 distance."""
+    scores = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)
+
+
+def _fetch_articles(cursor, article_ids, from_date):
+    placeholders = ",".join(["?"] * len(article_ids))
+    cursor.execute(
+        f"""
+        SELECT ca.id, ca.title, ca.url, ca.published_date, ca.summary as content,
+               ca.source_id, ca.feed_id
+        FROM crawled_articles ca
+        WHERE ca.id IN ({placeholders}) AND ca.processed = 1 AND ca.published_date >= ?
+        """,
+        [*article_ids, from_date],
+    )
+    return [dict(row) for row in cursor.fetchall()]
+
+
+def _has_table(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,))
+    return cursor.fetchone() is not None
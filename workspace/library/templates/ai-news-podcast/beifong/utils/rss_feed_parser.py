@@ -19,6 +19,8 @@ def parse_feed_entries(entries: List[Dict[str, Any]]) -> List[Dict[str, str]]:
     parsed_entries = []
     for entry in entries:
         content = entry.get("content") or entry.get("description") or ""
+        if isinstance(content, list):
+            content = "\n".join(str(item.get("value", "")) for item in content if isinstance(item, dict))
         published = (
             entry.get("published")
             or entry.get("updated")
@@ -47,10 +49,7 @@ def is_rss_feed(feed_data: Any) -> bool:
     return feed_data.bozo and hasattr(feed_data, "bozo_exception")
 
 
-def get_feed_data(
-    feed_url: str, etag: Optional[str] = None, modified: Optional[Any] = None
-) -> Dict[str, Any]:
-    feed_data = feedparser.parse(feed_url, etag=etag, modified=modified)
+def _build_feed_result(feed_data: Any, etag: Optional[str], modified: Optional[Any], status: int) -> Dict[str, Any]:
     if is_rss_feed(feed_data):
         return {
             "is_rss_feed": False,
@@ -60,9 +59,6 @@ def get_feed_data(
             "current_hash": None,
             "etag": None,
         }
-    status = feed_data.get("status", 200)
-    etag = feed_data.get("etag", None)
-    modified = feed_data.get("modified")
     entries = feed_data.get("entries", [])
     parsed_entries = parse_feed_entries(entries)
     current_hash = get_hash(parsed_entries)
@@ -74,3 +70,23 @@ def get_feed_data(
         "etag": etag,
         "is_rss_feed": True,
     }
+
+
+def get_feed_data(
+    feed_url: str, etag: Optional[str] = None, modified: Optional[Any] = None
+) -> Dict[str, Any]:
+    feed_data = feedparser.parse(feed_url, etag=etag, modified=modified)
+    return _build_feed_result(
+        feed_data,
+        feed_data.get("etag", None),
+        feed_data.get("modified"),
+        feed_data.get("status", 200),
+    )
+
+
+def parse_feed_content(
+    content: bytes, etag: Optional[str] = None, modified: Optional[str] = None, status: int = 200
+) -> Dict[str, Any]:
+    """Parse an already-downloaded feed body (runs in worker processes, so it must stay picklable)."""
+    feed_data = feedparser.parse(content)
+    return _build_feed_result(feed_data, etag, modified, status)
@@ -1,9 +1,11 @@
 # ruff: noqa: E402
 import os
+import threading
+import time
 import warnings
-from typing import List, Any
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 import numpy as np
-import soundfile as sf
+from .audio_mixer import StreamingMixer
 from .translate_podcast import translate_script
 
 os.environ["PYTHONWARNINGS"] = "ignore"
@@ -13,6 +15,11 @@ warnings.filterwarnings("ignore")
 
 from kokoro import KPipeline
 
+KOKORO_VOICES = {"h": {1: "hf_alpha", 2: "hm_omega"}}
+DEFAULT_KOKORO_VOICES = {1: "af_heart", 2: "bm_lewis"}
+KOKORO_RENDER_WINDOW = int(os.environ.get("KOKORO_RENDER_WINDOW", "16"))
+TARGET_PEAK = 0.9
+
 
 class ScriptEntry:
     def __init__(self, text: str, speaker: int):
@@ -20,69 +27,172 @@ class ScriptEntry:
         self.speaker = speaker
 
 
+class KokoroPool:
+    """
+    One warm ``KPipeline`` per language code, shared by everything in the process.
+
+    Pipelines are created on first use and kept for the life of the process,
+    so Celery tasks and ``podcast_generator_processor`` runs after the first
+    pay no model load. Each pipeline has its own lock: concurrent podcasts in
+    the same language take turns a render window at a time, while different
+    languages synthesize in parallel.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pipelines: Dict[str, Tuple[KPipeline, threading.Lock]] = {}
+
+    def get(self, lang_code: str) -> Tuple[KPipeline, threading.Lock]:
+        entry = self._pipelines.get(lang_code)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._pipelines.get(lang_code)
+            if entry is None:
+                start = time.time()
+                entry = (KPipeline(lang_code=lang_code), threading.Lock())
+                self._pipelines[lang_code] = entry
+                print(f"INFO: Loaded Kokoro pipeline '{lang_code}' in {time.time() - start:.1f}s")
+        return entry
+
+    def preload(self, lang_codes: Iterable[str]) -> None:
+        for lang_code in lang_codes:
+            if lang_code:
+                self.get(lang_code)
+
+    def loaded(self) -> List[str]:
+        return list(self._pipelines)
+
+
+kokoro_pool = KokoroPool()
+
+
 def create_slience_audio(silence_duration: float, sampling_rate: int) -> np.ndarray:
     return np.zeros(int(sampling_rate * silence_duration), dtype=np.float32)
 
 
+def voice_for(speaker_id: int, lang_code: str) -> str:
+    return KOKORO_VOICES.get(lang_code, DEFAULT_KOKORO_VOICES)[speaker_id]
+
+
+def _to_float32(audio) -> np.ndarray:
+    if hasattr(audio, "detach"):
+        audio = audio.detach().cpu().numpy()
+    return np.asarray(audio, dtype=np.float32).reshape(-1)
+
+
+def _join_chunks(chunks: List[np.ndarray]) -> np.ndarray:
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return chunks[0] if len(chunks) == 1 else np.concatenate(chunks)
+
+
+def text_to_speech_for_voice(pipeline: KPipeline, text: str, voice: str, speed: float = 1.0) -> np.ndarray:
+    chunks = [_to_float32(audio) for _, _, audio in pipeline(text, voice=voice, speed=speed) if audio is not None]
+    return _join_chunks(chunks)
+
+
 def text_to_speech(pipeline: KPipeline, text: str, speaker_id: int, sampling_rate: int, lang_code: str) -> np.ndarray:
-    if lang_code == "h":
-        voices = {1: "hf_alpha", 2: "hm_omega"}
-    else:
-        voices = {1: "af_heart", 2: "bm_lewis"}
-    voice = voices[speaker_id]
-    audio_chunks = []
-    for _, _, audio in pipeline(text, voice=voice, speed=1.0):
+    """Raw (un-normalized) audio for one line."""
+    return text_to_speech_for_voice(pipeline, text, voice_for(speaker_id, lang_code))
+
+
+def synthesize_lines(pipeline: KPipeline, texts: Sequence[str], voice: str, speed: float = 1.0) -> List[np.ndarray]:
+    """
+    Render several lines for one voice in a single pipeline call.
+
+    The pipeline receives the lines as a list and tags every chunk it yields
+    with the index of the line it came from, so the voice pack is resolved
+    once per batch. Pipelines that do not report ``text_index`` fall back to
+    one call per line.
+    """
+    rendered: List[List[np.ndarray]] = [[] for _ in texts]
+    for result in pipeline(list(texts), voice=voice, speed=speed):
+        index = getattr(result, "text_index", None)
+        if index is None:
+            return [text_to_speech_for_voice(pipeline, text, voice, speed) for text in texts]
+        audio = getattr(result, "audio", None)
         if audio is not None:
-            audio_chunk = np.array(audio, dtype=np.float32)
-            if np.max(np.abs(audio_chunk)) > 0:
-                audio_chunk = audio_chunk / np.max(np.abs(audio_chunk)) * 0.9
-            audio_chunks.append(audio_chunk)
-    if audio_chunks:
-        return np.concatenate(audio_chunks)
-    else:
-        return np.zeros(0, dtype=np.float32)
+            rendered[index].append(_to_float32(audio))
+    return [_join_chunks(chunks) for chunks in rendered]
 
 
-def create_audio_segments(
-    pipeline: KPipeline,
-    script: Any,
-    silence_duration: float,
-    sampling_rate: int,
-    lang_code: str,
-) -> List[np.ndarray]:
-    audio_segments = []
-    silence = create_slience_audio(silence_duration, sampling_rate)
+def _script_lines(script: Any) -> List[Tuple[str, int]]:
     entries = script if isinstance(script, list) else script.entries
+    lines = []
     for entry in entries:
         text = entry["text"] if isinstance(entry, dict) else entry.text
         speaker = entry["speaker"] if isinstance(entry, dict) else entry.speaker
-        segment_audio = text_to_speech(
-            pipeline,
-            text,
-            speaker,
-            sampling_rate=sampling_rate,
-            lang_code=lang_code,
-        )
-        if len(segment_audio) > 0:
-            try:
-                audio_segments.append(segment_audio)
-            except Exception:
-                fallback_silence = create_slience_audio(len(text) * 0.1, sampling_rate)
-                audio_segments.append(fallback_silence)
-            audio_segments.append(silence)
-    return audio_segments
-
-
-def combine_full_segments(audio_segments: List[np.ndarray]) -> np.ndarray:
-    full_audio = np.concatenate(audio_segments)
-    max_amp = np.max(np.abs(full_audio))
-    if max_amp > 0:
-        full_audio = full_audio / max_amp * 0.9
-    return full_audio
-
-
-def write_to_disk(output_path: str, full_audio: np.ndarray, sampling_rate: int) -> None:
-    return sf.write(output_path, full_audio, sampling_rate, subtype="PCM_16")
+        # the pipeline splits on newlines; keep each script entry a single line
+        text = " ".join(str(text or "").split())
+        if text:
+            lines.append((text, speaker))
+    return lines
+
+
+def render_window(pipeline: KPipeline, lines: Sequence[Tuple[str, int]], lang_code: str) -> List[np.ndarray]:
+    """Audio for ``lines`` in script order, synthesized with one pipeline call per voice."""
+    by_voice: Dict[str, List[int]] = {}
+    for index, (_, speaker) in enumerate(lines):
+        by_voice.setdefault(voice_for(speaker, lang_code), []).append(index)
+    audio: List[Optional[np.ndarray]] = [None] * len(lines)
+    for voice, indexes in by_voice.items():
+        texts = [lines[i][0] for i in indexes]
+        try:
+            rendered = synthesize_lines(pipeline, texts, voice)
+        except Exception as e:
+            print(f"WARNING: Kokoro batch for voice {voice} failed ({e}), rendering its lines one at a time")
+            rendered = []
+            for text in texts:
+                try:
+                    rendered.append(text_to_speech_for_voice(pipeline, text, voice))
+                except Exception as line_error:
+                    print(f"ERROR: Kokoro could not render line: {line_error}")
+                    rendered.append(np.zeros(0, dtype=np.float32))
+        for i, segment in zip(indexes, rendered):
+            audio[i] = segment
+    return audio
+
+
+def assemble_window(segments: Sequence[np.ndarray], silence_samples: int) -> np.ndarray:
+    """Copy segments into one preallocated buffer, each followed by ``silence_samples`` of silence."""
+    segments = [segment for segment in segments if segment is not None and len(segment) > 0]
+    buffer = np.zeros(sum(len(segment) + silence_samples for segment in segments), dtype=np.float32)
+    offset = 0
+    for segment in segments:
+        buffer[offset : offset + len(segment)] = segment
+        offset += len(segment) + silence_samples
+    return buffer
+
+
+def render_podcast(
+    script: Any,
+    output_path: str,
+    silence_duration: float,
+    sampling_rate: int,
+    lang_code: str,
+    pool: Optional[KokoroPool] = None,
+) -> float:
+    """
+    Synthesize ``script`` with the pooled pipeline and stream it into ``output_path`` window by window.
+
+    Only one render window is held in memory at a time, and each window is
+    encoded as soon as it is synthesized, so the file can be played while the
+    rest of the show renders. Speech is never boosted; windows are only
+    attenuated once their peak would pass ``TARGET_PEAK``, so quiet and loud
+    lines keep their relative level. Returns the seconds of audio written.
+    """
+    pipeline, lock = (pool or kokoro_pool).get(lang_code)
+    lines = _script_lines(script)
+    silence_samples = int(sampling_rate * silence_duration)
+    with StreamingMixer(output_path, sampling_rate, target_peak=TARGET_PEAK) as mixer:
+        for start in range(0, len(lines), KOKORO_RENDER_WINDOW):
+            with lock:
+                segments = render_window(pipeline, lines[start : start + KOKORO_RENDER_WINDOW], lang_code)
+            mixer.append(assemble_window(segments, silence_samples))
+        if not mixer.frames:
+            raise ValueError("Kokoro produced no audio for this script")
+    return mixer.duration
 
 
 def create_podcast(
@@ -92,7 +202,6 @@ def create_podcast(
     sampling_rate: int = 24_000,
     lang_code: str = "b",
 ) -> str:
-    pipeline = KPipeline(lang_code=lang_code)
     if lang_code != "b":
         if isinstance(script, list):
             script = translate_script(script, lang_code)
@@ -100,11 +209,12 @@ def create_podcast(
             script = translate_script(script.entries, lang_code)
     output_path = os.path.abspath(output_path)
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    audio_segments = create_audio_segments(pipeline, script, silence_duration, sampling_rate, lang_code)
-    full_audio = combine_full_segments(audio_segments)
-    write_to_disk(output_path, full_audio, sampling_rate)
+    start = time.time()
+    duration = render_podcast(script, output_path, silence_duration, sampling_rate, lang_code)
+    elapsed = time.time() - start
+    print(f"INFO: Kokoro rendered {duration:.1f}s of audio in {elapsed:.1f}s (RTF {elapsed / max(duration, 1e-9):.2f})")
     return output_path
 
 
 if __name__ == "__main__":
-    create_podcast("", "output.wav")
\ No newline at end of file
+    create_podcast("", "output.wav")
@@ -0,0 +1,173 @@
+import io
+import os
+import time
+import random
+import hashlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from math import gcd
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import soundfile as sf
+
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join("podcasts", "tts_cache"))
+TTS_MAX_WORKERS = int(os.environ.get("TTS_MAX_WORKERS", "6"))
+MAX_ATTEMPTS = 4
+
+Audio = Tuple[np.ndarray, int]
+
+
+def segment_key(engine: str, voice: str, model: str, text: str) -> str:
+    return hashlib.sha256("\0".join([engine, str(voice), str(model), text]).encode("utf-8")).hexdigest()
+
+
+def decode_audio_bytes(data: bytes, audio_format: str = "mp3") -> Optional[Audio]:
+    """Decode an encoded clip to mono float32 entirely in memory (libsndfile first, pydub/ffmpeg as fallback)."""
+    try:
+        audio, sampling_rate = sf.read(io.BytesIO(data), dtype="float32")
+    except Exception:
+        try:
+            from pydub import AudioSegment
+
+            segment = AudioSegment.from_file(io.BytesIO(data), format=audio_format)
+        except Exception as e:
+            print(f"ERROR: Could not decode {audio_format} audio: {e}")
+            return None
+        audio = np.array(segment.get_array_of_samples(), dtype=np.float32) / float(2 ** (8 * segment.sample_width - 1))
+        if segment.channels > 1:
+            audio = audio.reshape(-1, segment.channels)
+        sampling_rate = segment.frame_rate
+    if audio.ndim == 2:
+        audio = audio.mean(axis=1)
+    return np.ascontiguousarray(audio, dtype=np.float32), sampling_rate
+
+
+def resample(audio: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
+    if orig_sr == target_sr:
+        return audio
+    try:
+        from scipy.signal import resample_poly
+
+        factor = gcd(orig_sr, target_sr)
+        return resample_poly(audio, target_sr // factor, orig_sr // factor).astype(np.float32)
+    except ImportError:
+        positions = np.linspace(0, len(audio) - 1, int(len(audio) * target_sr / orig_sr))
+        return np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+
+class SegmentCache:
+    """Encoded TTS clips on disk, addressed by ``segment_key``; writes are write-then-rename."""
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, audio_format: str = "mp3"):
+        self.cache_dir = cache_dir
+        self.audio_format = audio_format
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{self.audio_format}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"WARNING: Could not cache TTS segment: {e}")
+
+
+def iter_segments(
+    segments: Sequence[Tuple[str, str]],
+    synthesize: Callable[[str, str], bytes],
+    engine: str,
+    model: str,
+    max_workers: int = TTS_MAX_WORKERS,
+    cache: Optional[SegmentCache] = None,
+    audio_format: str = "mp3",
+) -> Iterator[Optional[Audio]]:
+    """
+    Render ``(text, voice)`` segments concurrently and yield decoded audio in input order.
+
+    ``synthesize(text, voice)`` must return the encoded clip. At most
+    ``max_workers`` requests are in flight; failures are retried with backoff
+    and a segment that still fails comes back as ``None``. Clips already
+    rendered for the same engine, voice, model and text are read from the
+    on-disk cache instead of being synthesized again. Each segment is yielded
+    as soon as it and every segment before it are ready, so callers can
+    start writing the show while the rest is still rendering.
+    """
+    cache = cache if cache is not None else SegmentCache(audio_format=audio_format)
+    stats = {"cached": 0, "rendered": 0, "failed": 0}
+
+    def render(index_segment):
+        index, (text, voice) = index_segment
+        if not text or not text.strip():
+            return None
+        key = segment_key(engine, voice, model, text)
+        data = cache.get(key)
+        if data is not None:
+            stats["cached"] += 1
+        else:
+            for attempt in range(MAX_ATTEMPTS):
+                try:
+                    data = synthesize(text, voice)
+                    break
+                except Exception as e:
+                    if attempt == MAX_ATTEMPTS - 1:
+                        print(f"ERROR: TTS failed for segment {index + 1}: {e}")
+                        break
+                    delay = min(30, 2**attempt) * (0.5 + random.random())
+                    print(f"WARNING: TTS error on segment {index + 1} ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+            if not data:
+                stats["failed"] += 1
+                return None
+            cache.put(key, data)
+            stats["rendered"] += 1
+        return decode_audio_bytes(data, audio_format)
+
+    start = time.time()
+    # workers print under the caller's context, so a scheduler run still captures their retries and errors
+    context = contextvars.copy_context()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix=f"tts-{engine}") as executor:
+        yield from executor.map(lambda item: context.copy().run(render, item), enumerate(segments))
+    print(
+        f"INFO: {engine} TTS: {len(segments)} segments in {time.time() - start:.1f}s "
+        f"({stats['rendered']} rendered, {stats['cached']} cached, {stats['failed']} failed)"
+    )
+
+
+def render_segments(
+    segments: Sequence[Tuple[str, str]],
+    synthesize: Callable[[str, str], bytes],
+    engine: str,
+    model: str,
+    max_workers: int = TTS_MAX_WORKERS,
+    cache: Optional[SegmentCache] = None,
+    audio_format: str = "mp3",
+) -> List[Optional[Audio]]:
+    """All of ``iter_segments`` as a list, in input order."""
+    return list(iter_segments(segments, synthesize, engine, model, max_workers, cache, audio_format))
+
+
+def to_common_rate(results: Sequence[Optional[Audio]]) -> Tuple[List[np.ndarray], Optional[int]]:
+    """Drop failed segments and resample the rest to the first segment's rate."""
+    segments, sampling_rate = [], None
+    for result in results:
+        if result is None:
+            continue
+        audio, rate = result
+        if sampling_rate is None:
+            sampling_rate = rate
+        elif rate != sampling_rate:
+            audio = resample(audio, rate, sampling_rate)
+        segments.append(audio)
+    return segments, sampling_rate
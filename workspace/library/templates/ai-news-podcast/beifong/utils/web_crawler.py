@@ -0,0 +1,158 @@
+import time
+import random
+import asyncio
+from collections import Counter
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+import httpx
+from utils.crawl_url import HEADERS, USER_AGENTS
+from utils.feed_fetcher import HostLimiter
+
+MAX_BODY_BYTES = 5 * 1024 * 1024
+ROBOTS_TTL = 6 * 60 * 60
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class CrawlStats:
+    """Throughput counters for a crawl run."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.pages = 0
+        self.bytes = 0
+        self.truncated = 0
+        self.failures = Counter()
+
+    def record_page(self, size: int):
+        self.pages += 1
+        self.bytes += size
+
+    def record_failure(self, reason: str):
+        self.failures[reason] += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "pages": self.pages,
+            "bytes": self.bytes,
+            "elapsed_seconds": round(elapsed, 3),
+            "pages_per_second": round(self.pages / elapsed, 2),
+            "bytes_per_second": round(self.bytes / elapsed, 1),
+            "truncated": self.truncated,
+            "failures_by_reason": dict(self.failures),
+        }
+
+
+class RobotsCache:
+    """robots.txt parsers cached per origin; unreachable robots files allow everything."""
+
+    def __init__(self, client: httpx.AsyncClient, user_agent: str, ttl: float = ROBOTS_TTL):
+        self.client = client
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._parsers: Dict[str, Any] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def allowed(self, url: str) -> bool:
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        async with lock:
+            cached = self._parsers.get(origin)
+            if cached is None or time.monotonic() - cached[1] > self.ttl:
+                cached = (await self._fetch(origin), time.monotonic())
+                self._parsers[origin] = cached
+        parser = cached[0]
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def _fetch(self, origin: str) -> Optional[RobotFileParser]:
+        try:
+            response = await self.client.get(f"{origin}/robots.txt", timeout=10)
+        except httpx.HTTPError:
+            return None
+        if response.status_code >= 400:
+            return None
+        parser = RobotFileParser()
+        parser.parse(response.text.splitlines())
+        return parser
+
+
+class WebCrawler:
+    """
+    Concurrent page fetcher: one pooled keep-alive client, per-host politeness,
+    cached robots.txt and a hard cap on streamed body size.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        per_host_limit: int = 2,
+        host_delay: float = 1.0,
+        max_body_bytes: int = MAX_BODY_BYTES,
+        timeout: float = 15.0,
+        respect_robots: bool = True,
+    ):
+        headers = dict(HEADERS)
+        headers["User-Agent"] = random.choice(USER_AGENTS)
+        self.user_agent = headers["User-Agent"]
+        self.max_body_bytes = max_body_bytes
+        self.respect_robots = respect_robots
+        self.stats = CrawlStats()
+        self._global_limit = asyncio.Semaphore(max_concurrency)
+        self._limiter = HostLimiter(per_host_limit=per_host_limit, min_interval=host_delay)
+        self._client = httpx.AsyncClient(
+            follow_redirects=True,
+            timeout=httpx.Timeout(timeout),
+            limits=httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency),
+            headers=headers,
+        )
+        self._robots = RobotsCache(self._client, self.user_agent)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """Returns ``{"ok", "reason", "content", "encoding", "final_url"}``; failures are also counted in ``stats``."""
+        result = {"ok": False, "reason": None, "content": b"", "encoding": None, "final_url": url}
+        try:
+            if self.respect_robots and not await self._robots.allowed(url):
+                result["reason"] = "robots_disallowed"
+            else:
+                async with self._global_limit:
+                    async with self._limiter.slot(urlparse(url).netloc.lower()):
+                        await self._stream(url, result)
+        except httpx.TimeoutException:
+            result["reason"] = "timeout"
+        except httpx.HTTPError as e:
+            result["reason"] = type(e).__name__
+        if result["ok"]:
+            self.stats.record_page(len(result["content"]))
+        else:
+            self.stats.record_failure(result["reason"] or "unknown")
+        return result
+
+    async def _stream(self, url: str, result: Dict[str, Any]):
+        async with self._client.stream("GET", url) as response:
+            result["final_url"] = str(response.url)
+            if response.status_code >= 400:
+                result["reason"] = f"http_{response.status_code}"
+                return
+            content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+            if content_type and content_type not in HTML_CONTENT_TYPES:
+                result["reason"] = "non_html"
+                return
+            chunks = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= self.max_body_bytes:
+                    self.stats.truncated += 1
+                    break
+            result["content"] = b"".join(chunks)[: self.max_body_bytes]
+            result["encoding"] = response.charset_encoding
+            result["ok"] = True